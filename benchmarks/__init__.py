@@ -0,0 +1,22 @@
+"""Benchmarks for the P1 Monitor client."""
+
+
+def percentiles(timings: list[float]) -> dict[str, float]:
+    """Return the latency percentiles of a benchmark in milliseconds.
+
+    Args:
+    ----
+        timings: The durations of the benchmark rounds in seconds.
+
+    Returns:
+    -------
+        The 50th, 95th and 99th percentile.
+
+    """
+    ordered = sorted(timings)
+    return {
+        f"p{p}_ms": round(
+            ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1e3, 3
+        )
+        for p in (50, 95, 99)
+    }
@@ -0,0 +1,58 @@
+"""Fixtures for the P1Monitor benchmarks."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests import load_fixtures
+
+ROUTES = {
+    "/api/v1/smartmeter": "smartmeter.json",
+    "/api/v1/status": "phases.json",
+    "/api/v1/configuration": "settings.json",
+    "/api/v2/watermeter/day": "watermeter.json",
+}
+
+
+def create_app() -> web.Application:
+    """Return an application serving the fixtures like a P1 Monitor device."""
+
+    def handler(body: str) -> Callable[[web.Request], Awaitable[web.Response]]:
+        async def respond(_: web.Request) -> web.Response:
+            return web.Response(text=body, content_type="application/json")
+
+        return respond
+
+    app = web.Application()
+    for path, fixture in ROUTES.items():
+        app.router.add_get(path, handler(load_fixtures(fixture)))
+    return app
+
+
+@pytest.fixture(name="runner", scope="module")
+def event_loop_runner() -> Iterator[asyncio.Runner]:
+    """Return an event loop that lives as long as the benchmark module."""
+    with asyncio.Runner() as runner:
+        yield runner
+
+
+@pytest.fixture(name="start_servers", scope="module")
+def servers(
+    runner: asyncio.Runner,
+) -> Iterator[Callable[[int], list[TestServer]]]:
+    """Return a function starting local P1 Monitor servers on ephemeral ports."""
+    started: list[TestServer] = []
+
+    def start(count: int) -> list[TestServer]:
+        while len(started) < count:
+            server = TestServer(create_app(), host="127.0.0.1")
+            runner.run(server.start_server())
+            started.append(server)
+        return started[:count]
+
+    yield start
+    for server in started:
+        runner.run(server.close())
@@ -0,0 +1,91 @@
+"""Benchmark the rollups, cost and phase analytics of a long history."""
+
+import json
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from p1monitor import (
+    CostCalculator,
+    PhaseAnalyzer,
+    PhaseSeries,
+    Settings,
+    SmartMeter,
+    SmartMeterSeries,
+    aggregation,
+    energy_rollup,
+)
+from tests import load_fixtures
+
+
+@pytest.fixture(name="week", scope="module")
+def week_series() -> SmartMeterSeries:
+    """Return a week of readings, one per minute."""
+    row = json.loads(load_fixtures("smartmeter_history.json"))[0]
+    rows = [
+        {
+            **row,
+            "TIMESTAMP_UTC": row["TIMESTAMP_UTC"] + 60 * i,
+            "CONSUMPTION_KWH_HIGH": row["CONSUMPTION_KWH_HIGH"] + i / 1000,
+            "CONSUMPTION_W": i % 3000,
+        }
+        for i in range(7 * 24 * 60)
+    ]
+    return SmartMeterSeries.from_dict(rows)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python"])
+def test_energy_rollup(
+    benchmark: BenchmarkFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    week: SmartMeterSeries,
+    backend: str,
+) -> None:
+    """Benchmark hourly rollups with and without NumPy."""
+    if backend == "python":
+        monkeypatch.setattr(aggregation, "np", None)
+    benchmark.group = "energy_rollup week"
+    buckets = benchmark(energy_rollup, week)
+    assert len(buckets) == 7 * 24 + 1
+
+
+@pytest.mark.parametrize("method", ["add", "extend"])
+def test_cost(benchmark: BenchmarkFixture, week: SmartMeterSeries, method: str) -> None:
+    """Benchmark pricing a week of readings one by one and as one batch."""
+    settings = Settings.from_dict(json.loads(load_fixtures("settings.json")))
+    readings = [
+        SmartMeter.from_row(
+            {"TIMESTAMP_UTC": timestamp}
+            | {key: week.columns[name][i] for name, key in week.FIELDS.items()}
+        )
+        for i, timestamp in enumerate(week.timestamps)
+    ]
+
+    def price() -> CostCalculator:
+        calculator = CostCalculator(settings)
+        if method == "extend":
+            calculator.extend(week)
+        else:
+            for reading in readings:
+                calculator.add(reading)
+        return calculator
+
+    benchmark.group = "cost week"
+    assert len(benchmark(price).buckets) == 8
+
+
+def test_phase_analyzer(benchmark: BenchmarkFixture) -> None:
+    """Benchmark the phase analytics of a day of samples, one every 10 seconds."""
+    rows = json.loads(load_fixtures("phases_history.json"))
+    series = PhaseSeries.from_dict(
+        {**row, "TIMESTAMP_UTC": rows[0]["TIMESTAMP_UTC"] + 10 * i}
+        for i, row in enumerate(rows[i % len(rows)] for i in range(8640))
+    )
+
+    def analyze() -> PhaseAnalyzer:
+        analyzer = PhaseAnalyzer()
+        analyzer.extend(series)
+        return analyzer
+
+    benchmark.group = "phase analyzer day"
+    assert benchmark(analyze).count == 8640 * 5 // 6
@@ -0,0 +1,37 @@
+"""Benchmark the JSON decoding backends."""
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from p1monitor import Phases, SmartMeter
+from p1monitor.decoding import BACKENDS, select_loads
+from tests import load_fixtures
+
+PARSERS: dict[str, Callable[[Any], Any]] = {
+    "smartmeter.json": SmartMeter.from_dict,
+    "phases.json": Phases.from_dict,
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("fixture", ["smartmeter.json", "phases.json"])
+def test_decode(benchmark: BenchmarkFixture, backend: str, fixture: str) -> None:
+    """Benchmark decoding a response body."""
+    loads = select_loads(backend)
+    data = load_fixtures(fixture).encode()
+    benchmark.group = f"decode {fixture}"
+    benchmark(loads, data)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("fixture", ["smartmeter.json", "phases.json"])
+def test_decode_parse(benchmark: BenchmarkFixture, backend: str, fixture: str) -> None:
+    """Benchmark decoding a response body and building the data object."""
+    loads = select_loads(backend)
+    parser = PARSERS[fixture]
+    data = load_fixtures(fixture).encode()
+    benchmark.group = f"decode and parse {fixture}"
+    benchmark(lambda: parser(loads(data)))
@@ -0,0 +1,26 @@
+"""Benchmarks for importing the P1 Monitor package."""
+
+import subprocess
+import sys
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "pass",
+        "import p1monitor",
+        "from p1monitor import P1MonitorError",
+        "from p1monitor import P1Monitor",
+    ],
+)
+def test_import(benchmark: BenchmarkFixture, statement: str) -> None:
+    """Benchmark starting Python and running an import in a fresh process."""
+
+    def start() -> None:
+        subprocess.run([sys.executable, "-c", statement], check=True)  # noqa: S603
+
+    benchmark.group = "import"
+    benchmark(start)
@@ -0,0 +1,91 @@
+"""Benchmark building the data objects from decoded responses."""
+
+import json
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from p1monitor import Phases, Settings, SmartMeter, WaterMeter
+from tests import load_fixtures
+
+MODELS: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    "smartmeter": ("smartmeter.json", SmartMeter.from_dict),
+    "phases": ("phases.json", Phases.from_dict),
+    "settings": ("settings.json", Settings.from_dict),
+    "watermeter": ("watermeter.json", WaterMeter.from_dict),
+}
+
+ID_KEYS = {"phases": "STATUS_ID", "settings": "CONFIGURATION_ID"}
+
+
+def enlarge(model: str, data: list[dict[str, Any]], size: int) -> list[Any]:
+    """Return a response with many more rows than the fixture.
+
+    Status and configuration responses grow with entries the models do not
+    use, history responses with repeated readings.
+
+    Args:
+    ----
+        model: The name of the model the response is parsed into.
+        data: The rows of the fixture.
+        size: The number of rows to return.
+
+    Returns:
+    -------
+        The enlarged response.
+
+    """
+    if model in ID_KEYS:
+        key = ID_KEYS[model]
+        filler = [{**data[0], key: 1000 + i} for i in range(max(0, size - len(data)))]
+        return filler + data
+    return (data * (size // len(data) + 1))[:size]
+
+
+@pytest.mark.parametrize("size", [0, 1000])
+@pytest.mark.parametrize("model", MODELS)
+def test_from_dict(benchmark: BenchmarkFixture, model: str, size: int) -> None:
+    """Benchmark a from_dict method on the fixture and an enlarged response."""
+    fixture, parser = MODELS[model]
+    data = json.loads(load_fixtures(fixture))
+    if size:
+        data = enlarge(model, data, size)
+    benchmark.group = f"from_dict {model}"
+    benchmark(parser, data)
+
+
+@pytest.mark.parametrize("method", ["from_row", "from_rows"])
+@pytest.mark.parametrize("model", ["smartmeter", "watermeter"])
+def test_from_rows(benchmark: BenchmarkFixture, model: str, method: str) -> None:
+    """Benchmark converting a history response per row and in one batch."""
+    data = enlarge(model, json.loads(load_fixtures(f"{model}_history.json")), 1000)
+    parser = SmartMeter if model == "smartmeter" else WaterMeter
+    benchmark.group = f"from_rows {model}"
+    if method == "from_rows":
+        benchmark(parser.from_rows, data)
+    else:
+        benchmark(lambda: [parser.from_row(row) for row in data])
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_memory(benchmark: BenchmarkFixture, model: str) -> None:
+    """Benchmark building many data objects, and measure their size."""
+    fixture, parser = MODELS[model]
+    data = json.loads(load_fixtures(fixture))
+    count = 10000
+
+    def build() -> list[Any]:
+        return [parser(data) for _ in range(count)]
+
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+
+    benchmark.group = "memory"
+    benchmark.extra_info["bytes_per_object"] = round(size / count)
+    benchmark(build)
@@ -0,0 +1,294 @@
+"""Benchmark requests to a local P1 Monitor server."""
+
+import asyncio
+import itertools
+import random
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from time import perf_counter
+
+import pytest
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.test_utils import TestServer
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from p1monitor import (
+    AdaptiveTimeouts,
+    P1Monitor,
+    P1MonitorCollector,
+    P1MonitorFleet,
+    SyncP1Monitor,
+)
+from p1monitor.simulator import RECORD_INTERVAL, P1MonitorSimulator
+from tests import load_fixtures, serve
+
+from . import percentiles
+from .conftest import create_app
+
+
+@pytest.mark.parametrize("change_detection", [True, False])
+@pytest.mark.parametrize("uri", ["v1/smartmeter", "v1/status"])
+def test_request(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    start_servers: Callable[[int], list[TestServer]],
+    uri: str,
+    *,
+    change_detection: bool,
+) -> None:
+    """Benchmark the latency of single requests, one at a time."""
+    (server,) = start_servers(1)
+    client = P1Monitor(
+        host="127.0.0.1", port=server.port or 80, change_detection=change_detection
+    )
+    params = {"json": "object", "limit": 1}
+    timings: list[float] = []
+
+    def request() -> None:
+        started = perf_counter()
+        runner.run(client._request(uri, params=params))
+        timings.append(perf_counter() - started)
+
+    benchmark.group = f"request {uri}"
+    benchmark(request)
+    benchmark.extra_info.update(percentiles(timings))
+    runner.run(client.close())
+
+
+@pytest.mark.parametrize("devices", [10, 100])
+def test_fleet(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    start_servers: Callable[[int], list[TestServer]],
+    devices: int,
+) -> None:
+    """Benchmark polling the smart meter of many devices concurrently."""
+    servers = start_servers(devices)
+    fleet = P1MonitorFleet([("127.0.0.1", server.port or 80) for server in servers])
+
+    async def poll() -> int:
+        return len([result async for result in fleet.poll("smartmeter")])
+
+    timings: list[float] = []
+
+    def request() -> int:
+        started = perf_counter()
+        count = runner.run(poll())
+        timings.append(perf_counter() - started)
+        return count
+
+    benchmark.group = "fleet smartmeter"
+    assert benchmark(request) == devices
+    benchmark.extra_info["requests_per_second"] = round(
+        devices * len(timings) / sum(timings)
+    )
+    runner.run(fleet.close())
+
+
+@pytest.mark.parametrize("connection", ["kept_alive", "new"])
+def test_connection(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    connection: str,
+) -> None:
+    """Benchmark a poll over a kept alive connection and over a new one.
+
+    With the default aiohttp connector, a device polled less often than its
+    15 second keep-alive gets a new connection, and after 10 seconds a new
+    DNS lookup, for every poll. The 'new' case measures that cost.
+    """
+    server = TestServer(create_app(), host="localhost")
+    runner.run(server.start_server())
+
+    async def create_session() -> ClientSession | None:
+        if connection == "kept_alive":
+            return None
+        return ClientSession(
+            connector=TCPConnector(force_close=True, use_dns_cache=False)
+        )
+
+    session = runner.run(create_session())
+    client = P1Monitor(
+        host="localhost",
+        port=server.port or 80,
+        session=session,
+        change_detection=False,
+    )
+    timings: list[float] = []
+
+    def request() -> None:
+        started = perf_counter()
+        runner.run(client._request("v1/smartmeter"))
+        timings.append(perf_counter() - started)
+
+    benchmark.group = "connection"
+    benchmark(request)
+    benchmark.extra_info.update(percentiles(timings))
+    runner.run(client.close())
+    if session is not None:
+        runner.run(session.close())
+    runner.run(server.close())
+
+
+@pytest.mark.parametrize("latency", [0.0, 0.05])
+def test_simulated_fleet(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    latency: float,
+) -> None:
+    """Benchmark polling 1000 simulated devices with evolving readings."""
+    simulator = P1MonitorSimulator(devices=1000, latency=latency, seed=1)
+    runner.run(simulator.start())
+    fleet = P1MonitorFleet(simulator.hosts, limit=200, limit_per_host=1)
+
+    async def poll() -> list[str]:
+        return [
+            type(result.error).__name__
+            async for result in fleet.poll("smartmeter")
+            if result.error is not None
+        ]
+
+    timings: list[float] = []
+
+    def request() -> list[str]:
+        started = perf_counter()
+        errors = runner.run(poll())
+        timings.append(perf_counter() - started)
+        return errors
+
+    benchmark.group = "simulated fleet smartmeter"
+    assert benchmark(request) == []
+    benchmark.extra_info["requests_per_second"] = round(
+        1000 * len(timings) / sum(timings)
+    )
+    runner.run(fleet.close())
+    runner.run(simulator.close())
+
+
+@pytest.mark.parametrize("hedge", ["hedged", "single"])
+def test_tail_latency(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    hedge: str,
+) -> None:
+    """Benchmark the tail latency of a device that stalls 3% of its requests."""
+    stalls = random.Random(1)  # noqa: S311
+    body = load_fixtures("smartmeter.json")
+
+    async def respond(_: web.Request) -> web.Response:
+        if stalls.random() < 0.03:
+            await asyncio.sleep(0.1)
+        return web.Response(text=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/api/v1/smartmeter", respond)
+    server = TestServer(app, host="127.0.0.1")
+    runner.run(server.start_server())
+    client = P1Monitor(
+        host="127.0.0.1",
+        port=server.port or 80,
+        change_detection=False,
+        timeouts=AdaptiveTimeouts(hedge=hedge == "hedged"),
+    )
+    timings: list[float] = []
+
+    def request() -> None:
+        started = perf_counter()
+        runner.run(client._request("v1/smartmeter"))
+        timings.append(perf_counter() - started)
+
+    # Learn the latency of the device before hedging starts
+    for _ in range(200):
+        request()
+    timings.clear()
+
+    benchmark.group = "tail latency"
+    benchmark(request)
+    benchmark.extra_info.update(percentiles(timings))
+    runner.run(client.close())
+    runner.run(server.close())
+
+
+@pytest.mark.parametrize("mode", ["stream", "poll"])
+def test_stream(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    mode: str,
+) -> None:
+    """Benchmark receiving 100 smart meter and phase updates."""
+    # Every request finds a new reading on the device
+    clock = itertools.count(1633132800, RECORD_INTERVAL).__next__
+    simulator = P1MonitorSimulator(latency=0.002, seed=1, clock=clock)
+    runner.run(simulator.start())
+    client = P1Monitor(*simulator.hosts[0])
+
+    async def updates() -> int:
+        received = 0
+        if mode == "poll":
+            for _ in range(100):
+                await client.smartmeter()
+                await client.phases()
+                received += 2
+            return received
+        async with aclosing(client.stream(interval=0)) as stream:
+            async for _ in stream:
+                received += 1
+                if received == 200:
+                    break
+        return received
+
+    benchmark.group = "stream 200 updates"
+    assert benchmark(lambda: runner.run(updates())) == 200
+    runner.run(client.close())
+    runner.run(simulator.close())
+
+
+@pytest.mark.parametrize("mode", ["sync client", "asyncio.run"])
+def test_threads(benchmark: BenchmarkFixture, mode: str) -> None:
+    """Benchmark 8 worker threads requesting 200 smart meter readings."""
+
+    def isolated(host: str, port: int) -> None:
+        async def request() -> None:
+            async with P1Monitor(host, port) as client:
+                await client.smartmeter()
+
+        asyncio.run(request())
+
+    with (
+        serve(P1MonitorSimulator(devices=8, latency=0.002, seed=1)) as simulator,
+        SyncP1Monitor() as client,
+        ThreadPoolExecutor(8) as executor,
+    ):
+        hosts = simulator.hosts * 25
+        request = client.smartmeter if mode == "sync client" else isolated
+
+        def requests() -> int:
+            return len(list(executor.map(request, *zip(*hosts, strict=True))))
+
+        benchmark.group = "threads 200 requests"
+        assert benchmark(requests) == 200
+
+
+@pytest.mark.parametrize("mode", ["collector", "fleet"])
+def test_collector(
+    benchmark: BenchmarkFixture,
+    runner: asyncio.Runner,
+    mode: str,
+) -> None:
+    """Benchmark collecting the smart meter values of 1000 simulated devices."""
+    with serve(P1MonitorSimulator(devices=1000, seed=1)) as simulator:
+        collector = P1MonitorCollector(
+            simulator.hosts, limit=200, limit_per_host=1, processes=2
+        )
+
+        async def collect() -> int:
+            if mode == "fleet":
+                results = [r async for r in collector.fleet.poll("smartmeter")]
+                return sum(result.error is None for result in results)
+            batches = [batch async for batch in collector.collect("smartmeter")]
+            return sum(len(batch.devices) for batch in batches)
+
+        benchmark.group = "collect 1000 devices"
+        assert benchmark(lambda: runner.run(collect())) == 1000
+        runner.run(collector.close())
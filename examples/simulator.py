@@ -0,0 +1,25 @@
+# pylint: disable=W0621
+"""Asynchronous Python client for the P1 Monitor API."""
+
+import asyncio
+
+from p1monitor import P1MonitorFleet
+from p1monitor.simulator import P1MonitorSimulator
+
+
+async def main() -> None:
+    """Show example on polling simulated P1 Monitor devices."""
+    async with (
+        P1MonitorSimulator(devices=10, latency=0.05, error_rate=0.1) as simulator,
+        P1MonitorFleet(simulator.hosts) as fleet,
+    ):
+        print("--- P1 Monitor | Simulator ---")
+        async for result in fleet.poll("smartmeter"):
+            if result.error is not None:
+                print(f"Port {result.port}: {result.error}")
+            else:
+                print(f"Port {result.port}: {result.data.power_consumption} W")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,132 @@
 """Asynchronous Python client for the P1 Monitor API."""
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .exceptions import P1MonitorConnectionError, P1MonitorError, P1MonitorNoDataError
-from .models import Phases, Settings, SmartMeter, WaterMeter
-from .p1monitor import P1Monitor
+
+if TYPE_CHECKING:
+    from .aggregation import EnergyBucket, WaterBucket, energy_rollup, water_rollup
+    from .balance import PhaseAnalyzer, PhaseEvent
+    from .cache import ResponseCache
+    from .collector import CollectedBatch, P1MonitorCollector
+    from .cost import Cost, CostCalculator
+    from .fleet import FleetResult, P1MonitorFleet
+    from .history import CallbackCheckpoints, Checkpoints, FileCheckpoints, HistorySync
+    from .instrumentation import Histogram, Instrumentation
+    from .models import Phases, Settings, SmartMeter, Snapshot, WaterMeter
+    from .p1monitor import P1Monitor
+    from .scheduler import P1MonitorScheduler, PollResult
+    from .series import PhaseSeries, SmartMeterSeries, TimeSeries, WaterMeterSeries
+    from .store import ReadingStore
+    from .sync import SyncP1Monitor
+    from .timeouts import AdaptiveTimeouts
+
+# The module of every other name, imported on first use. Importing them all
+# would load aiohttp, yarl and NumPy when only the package is imported.
+_LAZY = {
+    "AdaptiveTimeouts": "timeouts",
+    "CallbackCheckpoints": "history",
+    "Checkpoints": "history",
+    "CollectedBatch": "collector",
+    "Cost": "cost",
+    "CostCalculator": "cost",
+    "EnergyBucket": "aggregation",
+    "FileCheckpoints": "history",
+    "FleetResult": "fleet",
+    "Histogram": "instrumentation",
+    "HistorySync": "history",
+    "Instrumentation": "instrumentation",
+    "P1Monitor": "p1monitor",
+    "P1MonitorCollector": "collector",
+    "P1MonitorFleet": "fleet",
+    "P1MonitorScheduler": "scheduler",
+    "PhaseAnalyzer": "balance",
+    "PhaseEvent": "balance",
+    "PhaseSeries": "series",
+    "Phases": "models",
+    "PollResult": "scheduler",
+    "ReadingStore": "store",
+    "ResponseCache": "cache",
+    "Settings": "models",
+    "SmartMeter": "models",
+    "SmartMeterSeries": "series",
+    "Snapshot": "models",
+    "SyncP1Monitor": "sync",
+    "TimeSeries": "series",
+    "WaterBucket": "aggregation",
+    "WaterMeter": "models",
+    "WaterMeterSeries": "series",
+    "energy_rollup": "aggregation",
+    "water_rollup": "aggregation",
+}
 
 __all__ = [
+    "AdaptiveTimeouts",
+    "CallbackCheckpoints",
+    "Checkpoints",
+    "CollectedBatch",
+    "Cost",
+    "CostCalculator",
+    "EnergyBucket",
+    "FileCheckpoints",
+    "FleetResult",
+    "Histogram",
+    "HistorySync",
+    "Instrumentation",
     "P1Monitor",
+    "P1MonitorCollector",
     "P1MonitorConnectionError",
     "P1MonitorError",
+    "P1MonitorFleet",
     "P1MonitorNoDataError",
+    "P1MonitorScheduler",
+    "PhaseAnalyzer",
+    "PhaseEvent",
+    "PhaseSeries",
     "Phases",
+    "PollResult",
+    "ReadingStore",
+    "ResponseCache",
     "Settings",
     "SmartMeter",
+    "SmartMeterSeries",
+    "Snapshot",
+    "SyncP1Monitor",
+    "TimeSeries",
+    "WaterBucket",
     "WaterMeter",
+    "WaterMeterSeries",
+    "energy_rollup",
+    "water_rollup",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import a name from its module on first use.
+
+    Args:
+    ----
+        name: The name of the package attribute.
+
+    Returns:
+    -------
+        The class or function of that name.
+
+    Raises:
+    ------
+        AttributeError: The package has no such attribute.
+
+    """
+    module = _LAZY.get(name)
+    if module is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Return the names of the package, including the ones not imported yet."""
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,344 @@
+"""Energy and water rollups of multi-row P1 Monitor responses."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from .models import EnergyTariff, SmartMeter, WaterMeter
+from .series import SmartMeterSeries, TimeSeries, WaterMeterSeries
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# Counter fields per tariff, in kWh
+CONSUMPTION_COUNTERS = {
+    EnergyTariff.HIGH: "energy_consumption_high",
+    EnergyTariff.LOW: "energy_consumption_low",
+}
+PRODUCTION_COUNTERS = {
+    EnergyTariff.HIGH: "energy_production_high",
+    EnergyTariff.LOW: "energy_production_low",
+}
+POWER_FIELDS = ("power_consumption", "power_production")
+
+
+@dataclass(slots=True)
+class EnergyBucket:
+    """Object representing the energy usage within a single time bucket."""
+
+    start: datetime
+
+    consumption: dict[EnergyTariff, float] = field(default_factory=dict)
+    production: dict[EnergyTariff, float] = field(default_factory=dict)
+
+    power_consumption_peak: float | None = None
+    power_consumption_mean: float | None = None
+    power_production_peak: float | None = None
+    power_production_mean: float | None = None
+
+
+@dataclass(slots=True)
+class WaterBucket:
+    """Object representing the water usage within a single time bucket."""
+
+    start: datetime
+    consumption: float
+
+
+def energy_rollup(
+    data: SmartMeterSeries | Iterable[SmartMeter],
+    seconds: int = 3600,
+    offset: int = 0,
+) -> list[EnergyBucket]:
+    """Return the energy usage and power per time bucket.
+
+    The energy per tariff is the increase of the kWh counters. The increase
+    between two readings counts for the bucket of the later reading. When a
+    counter decreases, for example after the meter was replaced, it is
+    assumed to have restarted at zero. Power is the peak and the mean of the
+    readings within the bucket.
+
+    Args:
+    ----
+        data: The readings in chronological order, as a series or as
+            SmartMeter objects like the history methods return them.
+        seconds: The length of a bucket, for example 86400 for daily.
+        offset: UTC offset in seconds the buckets are aligned to, for
+            example 3600 to have daily buckets start at midnight CET.
+
+    Returns:
+    -------
+        An EnergyBucket for every bucket containing readings, oldest first.
+
+    """
+    series: TimeSeries
+    if isinstance(data, SmartMeterSeries):
+        series = data
+    else:
+        series = _collect(SmartMeterSeries(), data)
+    counters = [*CONSUMPTION_COUNTERS.values(), *PRODUCTION_COUNTERS.values()]
+    starts, totals, peaks, means = _rollup(
+        series, dict.fromkeys(counters, math.nan), POWER_FIELDS, seconds, offset
+    )
+
+    buckets = []
+    for i, start in enumerate(starts):
+        increase = {
+            name: total[i] for name, total in zip(counters, totals, strict=True)
+        }
+        consumption_peak, production_peak = (_value(peak[i]) for peak in peaks)
+        consumption_mean, production_mean = (_value(mean[i]) for mean in means)
+        buckets.append(
+            EnergyBucket(
+                start=datetime.fromtimestamp(start, tz=UTC),
+                consumption={
+                    tariff: increase[name]
+                    for tariff, name in CONSUMPTION_COUNTERS.items()
+                },
+                production={
+                    tariff: increase[name]
+                    for tariff, name in PRODUCTION_COUNTERS.items()
+                },
+                power_consumption_peak=consumption_peak,
+                power_consumption_mean=consumption_mean,
+                power_production_peak=production_peak,
+                power_production_mean=production_mean,
+            )
+        )
+    return buckets
+
+
+def water_rollup(
+    data: WaterMeterSeries | Iterable[WaterMeter],
+    seconds: int = 86400,
+    offset: int = 0,
+) -> list[WaterBucket]:
+    """Return the water usage in liters per time bucket.
+
+    The usage is the increase of the total consumption counter, with the
+    same attribution and reset handling as energy_rollup.
+
+    Args:
+    ----
+        data: The readings in chronological order, as a series or as
+            WaterMeter objects like the history methods return them.
+        seconds: The length of a bucket, daily by default.
+        offset: UTC offset in seconds the buckets are aligned to.
+
+    Returns:
+    -------
+        A WaterBucket for every bucket containing readings, oldest first.
+
+    """
+    series: TimeSeries
+    if isinstance(data, WaterMeterSeries):
+        series = data
+    else:
+        series = _collect(WaterMeterSeries(), data)
+    starts, (totals,), _, _ = _rollup(
+        series, {"consumption_total": math.nan}, (), seconds, offset
+    )
+    return [
+        WaterBucket(
+            start=datetime.fromtimestamp(start, tz=UTC),
+            consumption=total * 1000,
+        )
+        for start, total in zip(starts, totals, strict=True)
+    ]
+
+
+def _collect(series: TimeSeries, data: Iterable[Any]) -> TimeSeries:
+    """Collect data objects into a series, in a single pass.
+
+    Args:
+    ----
+        series: The empty series to collect the readings into.
+        data: Data objects with the fields of the series.
+
+    Returns:
+    -------
+        The series. Data objects without a timestamp are left out.
+
+    """
+    columns = [(series.columns[name].append, name) for name in series.FIELDS]
+    for reading in data:
+        if reading.timestamp is None:
+            continue
+        series.timestamps.append(int(reading.timestamp.timestamp()))
+        for append, name in columns:
+            value = getattr(reading, name)
+            append(math.nan if value is None else value)
+    return series
+
+
+def _rollup(
+    series: TimeSeries,
+    counters: dict[str, float],
+    gauges: Sequence[str],
+    seconds: int,
+    offset: int,
+) -> tuple[list[int], list[list[float]], list[list[float]], list[list[float]]]:
+    """Compute the counter increases and gauge peaks and means per bucket.
+
+    Args:
+    ----
+        series: The readings in chronological order.
+        counters: The fields that only increase apart from resets, with
+            their last value before the series, NaN when unknown. The values
+            are updated to the last value in the series, so a following
+            series continues where this one ends.
+        gauges: The fields measuring a momentary value.
+        seconds: The length of a bucket.
+        offset: UTC offset in seconds the buckets are aligned to.
+
+    Returns:
+    -------
+        The bucket starts, and per bucket the increase of every counter and
+        the peak and mean of every gauge, NaN when a gauge has no values.
+
+    """
+    if np is not None:
+        return _rollup_numpy(series, counters, gauges, seconds, offset)
+
+    starts: list[int] = []
+    totals: list[list[float]] = [[] for _ in counters]
+    peaks: list[list[float]] = [[] for _ in gauges]
+    sums: list[list[float]] = [[] for _ in gauges]
+    counts: list[list[int]] = [[] for _ in gauges]
+    counter_columns = [series.columns[name] for name in counters]
+    previous = list(counters.values())
+    gauge_columns = [series.columns[name] for name in gauges]
+
+    for i, timestamp in enumerate(series.timestamps):
+        bucket = timestamp - (timestamp + offset) % seconds
+        if not starts or starts[-1] != bucket:
+            starts.append(bucket)
+            for total in totals:
+                total.append(0.0)
+            for peak, total, count in zip(peaks, sums, counts, strict=True):
+                peak.append(math.nan)
+                total.append(0.0)
+                count.append(0)
+
+        for c, values in enumerate(counter_columns):
+            value = values[i]
+            if math.isnan(value):
+                continue
+            if not math.isnan(previous[c]):
+                increase = value - previous[c]
+                totals[c][-1] += value if increase < 0 else increase
+            previous[c] = value
+
+        for g, values in enumerate(gauge_columns):
+            value = values[i]
+            if math.isnan(value):
+                continue
+            # Also true while the peak is still NaN
+            if not value <= peaks[g][-1]:
+                peaks[g][-1] = value
+            sums[g][-1] += value
+            counts[g][-1] += 1
+
+    counters.update(zip(counters, previous, strict=True))
+    means = [
+        [
+            total / count if count else math.nan
+            for total, count in zip(s, n, strict=True)
+        ]
+        for s, n in zip(sums, counts, strict=True)
+    ]
+    return starts, totals, peaks, means
+
+
+def _rollup_numpy(
+    series: TimeSeries,
+    counters: dict[str, float],
+    gauges: Sequence[str],
+    seconds: int,
+    offset: int,
+) -> tuple[list[int], list[list[float]], list[list[float]], list[list[float]]]:
+    """Compute the rollup with vectorized NumPy kernels.
+
+    Args:
+    ----
+        series: The readings in chronological order.
+        counters: The fields that only increase apart from resets, with
+            their last value before the series, updated to the last value in
+            the series.
+        gauges: The fields measuring a momentary value.
+        seconds: The length of a bucket.
+        offset: UTC offset in seconds the buckets are aligned to.
+
+    Returns:
+    -------
+        The bucket starts, and per bucket the increase of every counter and
+        the peak and mean of every gauge.
+
+    """
+    if not series.timestamps:
+        return [], [[] for _ in counters], [[] for _ in gauges], [[] for _ in gauges]
+    timestamps = np.frombuffer(series.timestamps, dtype=np.int64)
+    buckets = timestamps - (timestamps + offset) % seconds
+    first = np.r_[True, buckets[1:] != buckets[:-1]]
+    starts = np.flatnonzero(first)
+    index = np.cumsum(first) - 1
+
+    totals = []
+    for name, previous in counters.items():
+        readings = np.frombuffer(series.columns[name], dtype=np.float64)
+        positions = index
+        missing = np.isnan(readings)
+        if missing.any():
+            present = np.flatnonzero(~missing)
+            readings = readings[present]
+            positions = index[present]
+        if math.isnan(previous):
+            positions = positions[1:]
+        else:
+            readings = np.r_[previous, readings]
+        if len(readings):
+            counters[name] = float(readings[-1])
+        increase = np.diff(readings)
+        increase = np.where(increase < 0, readings[1:], increase)
+        totals.append(np.bincount(positions, weights=increase, minlength=len(starts)))
+
+    peaks = []
+    means = []
+    for name in gauges:
+        values = np.frombuffer(series.columns[name], dtype=np.float64)
+        missing = np.isnan(values)
+        peaks.append(np.fmax.reduceat(values, starts))
+        total = np.add.reduceat(np.where(missing, 0.0, values), starts)
+        count = np.add.reduceat((~missing).astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means.append(np.where(count > 0, total / count, np.nan))
+
+    return (
+        buckets[starts].tolist(),
+        [total.tolist() for total in totals],
+        [peak.tolist() for peak in peaks],
+        [mean.tolist() for mean in means],
+    )
+
+
+def _value(value: float) -> float | None:
+    """Return a rollup value, or None when it is missing.
+
+    Args:
+    ----
+        value: The value, NaN when missing.
+
+    Returns:
+    -------
+        The value, or None.
+
+    """
+    return None if math.isnan(value) else value
@@ -0,0 +1,295 @@
+"""Streaming phase imbalance, over-current and voltage sag analytics."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import Phases
+    from .series import PhaseSeries
+
+OVER_CURRENT = "over_current"
+VOLTAGE_SAG = "voltage_sag"
+
+PHASES = (1, 2, 3)
+
+# The keys of the over-current and voltage sag events per phase
+KEYS = (
+    tuple((OVER_CURRENT, phase) for phase in PHASES),
+    tuple((VOLTAGE_SAG, phase) for phase in PHASES),
+)
+
+
+@dataclass(slots=True)
+class PhaseEvent:
+    """Object representing a period a phase was outside its limits.
+
+    For an over-current event the extreme is the highest current in
+    amperes, for a voltage sag the lowest voltage.
+    """
+
+    kind: str
+    phase: int
+    start: datetime
+    end: datetime
+    extreme: float
+    samples: int = 1
+
+
+class PhaseAnalyzer:
+    """Incremental phase imbalance, over-current and voltage sag detection.
+
+    Samples are added in chronological order, from phases() while polling or
+    as a PhaseSeries from phases_series(). Every sample costs a constant
+    amount of work, nothing before it is kept apart from the running totals
+    and the events that are still active.
+
+    The imbalance is the largest deviation of a phase from the mean load of
+    the phases, as a fraction of that mean (the NEMA definition). The load
+    of a phase is its consumed plus produced power, as the meter reports
+    the current in whole amperes only. An over-current event lasts while the
+    current of a phase is above `current_limit`, a voltage sag while the
+    voltage is below `sag` times `nominal_voltage`. Missing values neither
+    start nor end an event. A phase at 0 V is not connected, single-phase
+    meters report their missing phases that way, and is left out.
+
+    Create one analyzer per device.
+    """
+
+    __slots__ = (
+        "_active",
+        "_imbalance_sum",
+        "count",
+        "current_limit",
+        "events",
+        "heaviest",
+        "imbalance",
+        "imbalance_peak",
+        "sag_voltage",
+    )
+
+    def __init__(
+        self,
+        *,
+        current_limit: float = 25.0,
+        nominal_voltage: float = 230.0,
+        sag: float = 0.9,
+    ) -> None:
+        """Initialize the analyzer.
+
+        Args:
+        ----
+            current_limit: The current in amperes a phase may carry, for
+                example the rating of the main fuse.
+            nominal_voltage: The nominal voltage of the grid.
+            sag: The fraction of the nominal voltage below which the voltage
+                sags, 0.9 by EN 50160.
+
+        """
+        self.current_limit = current_limit
+        self.sag_voltage = nominal_voltage * sag
+        self.count = 0
+        self.imbalance: float | None = None
+        self.imbalance_peak: float | None = None
+        self.heaviest: int | None = None
+        self.events: list[PhaseEvent] = []
+        self._imbalance_sum = 0.0
+        self._active: dict[tuple[str, int], PhaseEvent] = {}
+
+    @property
+    def imbalance_mean(self) -> float | None:
+        """Return the mean imbalance of the samples with two or more phases."""
+        return self._imbalance_sum / self.count if self.count else None
+
+    @property
+    def active(self) -> list[PhaseEvent]:
+        """Return the events that have not ended yet."""
+        return list(self._active.values())
+
+    def add(
+        self, phases: Phases, timestamp: datetime | None = None
+    ) -> list[PhaseEvent]:
+        """Add a single sample.
+
+        Args:
+        ----
+            phases: The Phases data object of the sample.
+            timestamp: The moment of the sample, now by default.
+
+        Returns:
+        -------
+            The events that ended with this sample.
+
+        """
+        nan = math.nan
+        return self._sample(
+            (timestamp or datetime.now(UTC)).timestamp(),
+            (
+                nan if (value := phases.voltage_phase_l1) is None else value,
+                nan if (value := phases.voltage_phase_l2) is None else value,
+                nan if (value := phases.voltage_phase_l3) is None else value,
+            ),
+            (
+                nan if (value := phases.current_phase_l1) is None else value,
+                nan if (value := phases.current_phase_l2) is None else value,
+                nan if (value := phases.current_phase_l3) is None else value,
+            ),
+            (
+                _load(phases.power_consumed_phase_l1, phases.power_produced_phase_l1),
+                _load(phases.power_consumed_phase_l2, phases.power_produced_phase_l2),
+                _load(phases.power_consumed_phase_l3, phases.power_produced_phase_l3),
+            ),
+        )
+
+    def extend(self, series: PhaseSeries) -> list[PhaseEvent]:
+        """Add a batch of samples.
+
+        Args:
+        ----
+            series: Samples in chronological order, newer than the samples
+                added before.
+
+        Returns:
+        -------
+            The events that ended within the batch.
+
+        """
+        columns = series.columns
+        ended = []
+        for timestamp, v1, v2, v3, a1, a2, a3, c1, c2, c3, p1, p2, p3 in zip(
+            series.timestamps,
+            *(columns[f"voltage_phase_l{phase}"] for phase in PHASES),
+            *(columns[f"current_phase_l{phase}"] for phase in PHASES),
+            *(columns[f"power_consumed_phase_l{phase}"] for phase in PHASES),
+            *(columns[f"power_produced_phase_l{phase}"] for phase in PHASES),
+            strict=True,
+        ):
+            ended += self._sample(
+                timestamp, (v1, v2, v3), (a1, a2, a3), (c1 + p1, c2 + p2, c3 + p3)
+            )
+        return ended
+
+    def _sample(
+        self,
+        timestamp: float,
+        voltages: tuple[float, float, float],
+        currents: tuple[float, float, float],
+        loads: tuple[float, float, float],
+    ) -> list[PhaseEvent]:
+        """Update the analytics with a single sample, NaN when missing.
+
+        Args:
+        ----
+            timestamp: The moment of the sample, as UTC epoch seconds.
+            voltages: The voltage per phase.
+            currents: The current per phase.
+            loads: The consumed plus produced power per phase.
+
+        Returns:
+        -------
+            The events that ended with this sample.
+
+        """
+        ended = []
+        present = []
+        active = self._active
+        isnan = math.isnan
+        for over_current, sag, voltage, current, load in zip(
+            *KEYS, voltages, currents, loads, strict=True
+        ):
+            # Single-phase meters report the missing phases at 0 V
+            if voltage == 0:
+                continue
+            # Only a value outside the limits or an active event needs work
+            if (
+                (current > self.current_limit or over_current in active)
+                and not isnan(current)
+                and (event := self._track(over_current, timestamp, current))
+            ):
+                ended.append(event)
+            if (
+                (voltage < self.sag_voltage or sag in active)
+                and not isnan(voltage)
+                and (event := self._track(sag, timestamp, voltage))
+            ):
+                ended.append(event)
+            if not isnan(load):
+                present.append(load)
+
+        if len(present) < 2:
+            self.imbalance = self.heaviest = None
+            return ended
+        mean = math.fsum(present) / len(present)
+        peak = max(present)
+        imbalance = max(peak - mean, mean - min(present)) / mean if mean else 0.0
+        self.imbalance = imbalance
+        self.heaviest = loads.index(peak) + 1
+        if self.imbalance_peak is None or imbalance > self.imbalance_peak:
+            self.imbalance_peak = imbalance
+        self._imbalance_sum += imbalance
+        self.count += 1
+        return ended
+
+    def _track(
+        self, key: tuple[str, int], timestamp: float, value: float
+    ) -> PhaseEvent | None:
+        """Start, extend or end the event of a phase.
+
+        Only called for a value outside the limit or while the event is
+        active, so without an active event a new one starts.
+
+        Args:
+        ----
+            key: The kind of event and the phase.
+            timestamp: The moment of the sample, as UTC epoch seconds.
+            value: The current or voltage of the phase.
+
+        Returns:
+        -------
+            The event when it ended with this sample.
+
+        """
+        kind = key[0]
+        event = self._active.get(key)
+        if event is None:
+            moment = datetime.fromtimestamp(timestamp, tz=UTC)
+            self._active[key] = PhaseEvent(
+                kind=kind, phase=key[1], start=moment, end=moment, extreme=value
+            )
+            return None
+        if kind == OVER_CURRENT:
+            outside = value > self.current_limit
+        else:
+            outside = value < self.sag_voltage
+        if not outside:
+            del self._active[key]
+            self.events.append(event)
+            return event
+        event.end = datetime.fromtimestamp(timestamp, tz=UTC)
+        event.samples += 1
+        if kind == OVER_CURRENT:
+            event.extreme = max(event.extreme, value)
+        else:
+            event.extreme = min(event.extreme, value)
+        return None
+
+
+def _load(consumed: int | None, produced: int | None) -> float:
+    """Return the load of a phase, NaN when it is unknown.
+
+    Args:
+    ----
+        consumed: The consumed power of the phase in W.
+        produced: The produced power of the phase in W.
+
+    Returns:
+    -------
+        The consumed plus produced power.
+
+    """
+    if consumed is None or produced is None:
+        return math.nan
+    return float(consumed + produced)
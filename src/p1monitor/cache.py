@@ -0,0 +1,156 @@
+"""Response cache and change detection for P1 Monitor."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import TYPE_CHECKING, Any
+
+from aiohttp.hdrs import IF_MODIFIED_SINCE, IF_NONE_MATCH
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+DEFAULT_TTLS: dict[str, float] = {
+    "v1/smartmeter": 1.0,
+    "v1/status": 1.0,
+    "v2/watermeter/day": 10.0,
+    "v1/configuration": 3600.0,
+}
+
+
+class ResponseCache:
+    """Size bounded cache of decoded responses, with a time to live per endpoint.
+
+    Concurrent requests for the same endpoint share a single request to the
+    device, so a burst of callers results in one round trip. Responses are
+    keyed by host and port, so one cache can be shared between clients.
+    """
+
+    __slots__ = ("_entries", "_pending", "maxsize", "ttls")
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        maxsize: int = 128,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+        ----
+            ttls: Time to live in seconds per request URI, for example
+                {'v1/configuration': 86400}. Merged with DEFAULT_TTLS, a TTL
+                of 0 disables caching for that URI.
+            maxsize: Maximum number of responses to keep, the least recently
+                used response is evicted first.
+
+        """
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._pending: dict[Hashable, asyncio.Task[Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    async def get(
+        self,
+        host: str,
+        port: int,
+        uri: str,
+        params: dict[str, Any] | None,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return a cached response, or fetch and cache it.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor the response belongs to.
+            port: The port of the P1 Monitor the response belongs to.
+            uri: Request URI, without '/api/', for example, 'v1/status'
+            params: Extra options of the request, part of the cache key.
+            fetch: Coroutine function requesting the response from the device.
+
+        Returns:
+        -------
+            The decoded response from the P1 Monitor API.
+
+        """
+        ttl = self.ttls.get(uri)
+        if not ttl:
+            return await fetch()
+
+        key = (host, port, uri, tuple(sorted((params or {}).items())))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, data = entry
+            if expires > monotonic():
+                self._entries.move_to_end(key)
+                return data
+            del self._entries[key]
+
+        if key not in self._pending:
+            self._pending[key] = asyncio.create_task(self._fetch(key, ttl, fetch))
+        # Shielded, so a cancelled caller does not cancel the shared request
+        return await asyncio.shield(self._pending[key])
+
+    async def _fetch(
+        self,
+        key: Hashable,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Fetch a response and store it in the cache.
+
+        Args:
+        ----
+            key: The cache key of the response.
+            ttl: Time to live of the response in seconds.
+            fetch: Coroutine function requesting the response from the device.
+
+        Returns:
+        -------
+            The decoded response from the P1 Monitor API.
+
+        """
+        try:
+            data = await fetch()
+        finally:
+            del self._pending[key]
+        self._entries[key] = (monotonic() + ttl, data)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return data
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+
+
+@dataclass(slots=True)
+class Revision:
+    """Object representing the last seen version of a response."""
+
+    checksum: int
+    data: Any
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def conditions(self) -> dict[str, str]:
+        """Return the headers for a conditional request on this revision.
+
+        Returns
+        -------
+            The If-None-Match and If-Modified-Since headers, when the device
+            sent the matching validators.
+
+        """
+        headers: dict[str, str] = {}
+        if self.etag is not None:
+            headers[IF_NONE_MATCH] = self.etag
+        if self.last_modified is not None:
+            headers[IF_MODIFIED_SINCE] = self.last_modified
+        return headers
@@ -0,0 +1,325 @@
+"""Collecting the latest values of a large P1 Monitor fleet in worker processes."""
+
+from __future__ import annotations
+
+import asyncio
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, Self, cast
+
+from .decoding import loads
+from .exceptions import P1MonitorError, P1MonitorNoDataError
+from .fleet import FleetResult, P1MonitorFleet
+from .series import SmartMeterSeries, TimeSeries, WaterMeterSeries
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
+
+    from aiohttp import ClientSession
+
+SERIES: dict[str, type[TimeSeries]] = {
+    "smartmeter": SmartMeterSeries,
+    "watermeter": WaterMeterSeries,
+}
+
+# Timestamps are shared as int64 and values as float64
+ITEM_SIZE = 8
+
+
+@dataclass(slots=True)
+class CollectedBatch:
+    """Object representing the latest values of a batch of devices.
+
+    Row i of the series holds the values of devices[i], the totals are the
+    sums of every field over the batch. Devices without values are in the
+    errors, with the error of their request or response.
+    """
+
+    endpoint: str
+    devices: list[tuple[str, int]]
+    series: TimeSeries
+    totals: dict[str, float]
+
+    errors: list[FleetResult] = field(default_factory=list)
+
+
+@dataclass
+class P1MonitorCollector:
+    """Class for polling many P1 Monitor devices, decoding in worker processes.
+
+    The requests are sent on the event loop over the shared session of a
+    P1MonitorFleet, within its limits. The response bodies are decoded and
+    aggregated by a pool of worker processes, `batch_size` devices at a
+    time, so the event loop only moves bytes. The workers write the columns
+    of a batch into shared memory, only the bodies and a few numbers per
+    batch are pickled between the processes.
+    """
+
+    hosts: Sequence[str | tuple[str, int]]
+    port: int = 80
+    request_timeout: float = 10.0
+    limit: int = 100
+    limit_per_host: int = 2
+    session: ClientSession | None = None
+    processes: int | None = None
+    batch_size: int = 500
+
+    def __post_init__(self) -> None:
+        """Prepare the fleet doing the requests."""
+        self._devices = [
+            (host, self.port) if isinstance(host, str) else host for host in self.hosts
+        ]
+        self.fleet = P1MonitorFleet(
+            self._devices,
+            request_timeout=self.request_timeout,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            session=self.session,
+        )
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def collect(
+        self, endpoint: str = "smartmeter"
+    ) -> AsyncIterator[CollectedBatch]:
+        """Collect the latest values of every device, in batches.
+
+        A batch is filled in the order the devices answer and is returned as
+        soon as it is decoded, while the other requests continue.
+
+        Args:
+        ----
+            endpoint: The P1Monitor method the values are for, either
+                'smartmeter' or 'watermeter'.
+
+        Yields:
+        ------
+            A CollectedBatch for every `batch_size` devices.
+
+        Raises:
+        ------
+            ValueError: The endpoint is not supported.
+
+        """
+        if endpoint not in SERIES:
+            msg = f"Unknown endpoint: {endpoint}, expected one of {[*SERIES]}"
+            raise ValueError(msg)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.processes)
+
+        downloads = [
+            asyncio.ensure_future(self._download(host, port, endpoint))
+            for host, port in self._devices
+        ]
+        decoding: set[asyncio.Future[CollectedBatch]] = set()
+        batch: list[tuple[str, int, bytes | P1MonitorError]] = []
+        try:
+            for download in asyncio.as_completed(downloads):
+                batch.append(await download)
+                if len(batch) == self.batch_size:
+                    decoding.add(asyncio.ensure_future(self._decode(endpoint, batch)))
+                    batch = []
+                for task in [task for task in decoding if task.done()]:
+                    decoding.discard(task)
+                    yield task.result()
+            if batch:
+                decoding.add(asyncio.ensure_future(self._decode(endpoint, batch)))
+            for task in asyncio.as_completed(decoding):
+                yield await task
+        finally:
+            pending: list[asyncio.Future[Any]] = [*downloads, *decoding]
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _download(
+        self, host: str, port: int, endpoint: str
+    ) -> tuple[str, int, bytes | P1MonitorError]:
+        """Request the latest values of a single device.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor.
+            port: The port of the P1 Monitor.
+            endpoint: The P1Monitor method the values are for.
+
+        Returns:
+        -------
+            The device with its response body, or the error of the request.
+
+        """
+        try:
+            return host, port, await self.fleet.raw(host, port, endpoint)
+        except P1MonitorError as exception:
+            return host, port, exception
+
+    async def _decode(
+        self, endpoint: str, batch: list[tuple[str, int, bytes | P1MonitorError]]
+    ) -> CollectedBatch:
+        """Decode a batch of response bodies in a worker process.
+
+        Args:
+        ----
+            endpoint: The P1Monitor method the values are for.
+            batch: The devices with their response body or request error.
+
+        Returns:
+        -------
+            The values of the batch, read from the shared memory.
+
+        """
+        series_type = SERIES[endpoint]
+        received = [
+            (host, port) for host, port, body in batch if isinstance(body, bytes)
+        ]
+        bodies = [body for _, _, body in batch if isinstance(body, bytes)]
+        errors = [
+            FleetResult(host, port, endpoint, error=body)
+            for host, port, body in batch
+            if not isinstance(body, bytes)
+        ]
+        if not bodies:
+            totals = dict.fromkeys(series_type.FIELDS, 0.0)
+            return CollectedBatch(endpoint, [], series_type(), totals, errors)
+
+        # Room for a timestamp and every field of every body
+        memory = SharedMemory(
+            create=True, size=ITEM_SIZE * len(bodies) * (1 + len(series_type.FIELDS))
+        )
+        try:
+            (
+                positions,
+                failures,
+                totals,
+            ) = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _decode_columns, endpoint, memory.name, bodies
+            )
+            series = _read(series_type, memory, len(bodies), len(positions))
+        finally:
+            memory.close()
+            memory.unlink()
+        errors += [
+            FleetResult(*received[position], endpoint, error=error)
+            for position, error in failures
+        ]
+        devices = [received[position] for position in positions]
+        return CollectedBatch(endpoint, devices, series, totals, errors)
+
+    async def close(self) -> None:
+        """Close open client session and stop the worker processes."""
+        await self.fleet.close()
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown)
+            self._executor = None
+
+    async def __aenter__(self) -> Self:
+        """Async enter.
+
+        Returns
+        -------
+            The P1MonitorCollector object.
+
+        """
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        await self.close()
+
+
+def _decode_columns(
+    endpoint: str, name: str, bodies: list[bytes]
+) -> tuple[list[int], list[tuple[int, P1MonitorError]], dict[str, float]]:
+    """Decode response bodies into columns in shared memory, in a worker process.
+
+    The memory holds one region per column, each with room for every body:
+    the timestamps first, then the fields in the order of the series.
+
+    Args:
+    ----
+        endpoint: The P1Monitor method the values are for.
+        name: The name of the shared memory block.
+        bodies: The JSON response bodies from the P1 Monitor API.
+
+    Returns:
+    -------
+        The positions of the bodies written as rows, the positions of the
+        bodies that could not be decoded with their error, and the sum of
+        every field.
+
+    """
+    rows: list[dict[str, Any]] = []
+    positions = []
+    failures: list[tuple[int, P1MonitorError]] = []
+    for position, body in enumerate(bodies):
+        try:
+            data = loads(body)
+        except ValueError:
+            msg = "Unexpected response from the P1 Monitor device"
+            failures.append((position, P1MonitorError(msg)))
+            continue
+        if not data:
+            msg = "No data received from P1 Monitor"
+            failures.append((position, P1MonitorNoDataError(msg)))
+            continue
+        if (
+            not isinstance(data, list)
+            or not isinstance(data[0], dict)
+            or "TIMESTAMP_UTC" not in data[0]
+        ):
+            msg = "Unexpected response from the P1 Monitor device"
+            failures.append((position, P1MonitorError(msg)))
+            continue
+        rows.append(data[0])
+        positions.append(position)
+
+    series = SERIES[endpoint].from_dict(rows)
+    region = ITEM_SIZE * len(bodies)
+    size = ITEM_SIZE * len(rows)
+    columns: list[array[Any]] = [series.timestamps, *series.columns.values()]
+    memory = SharedMemory(name)
+    try:
+        buffer = cast("memoryview", memory.buf)
+        for index, column in enumerate(columns):
+            start = index * region
+            buffer[start : start + size] = memoryview(column).cast("B")
+    finally:
+        memory.close()
+    totals = {column: series.sum(column) for column in series.columns}
+    return positions, failures, totals
+
+
+def _read(
+    series_type: type[TimeSeries], memory: SharedMemory, capacity: int, count: int
+) -> TimeSeries:
+    """Copy the columns written by a worker process into a series.
+
+    Args:
+    ----
+        series_type: The series class of the endpoint.
+        memory: The shared memory written by the worker.
+        capacity: The number of rows every region has room for.
+        count: The number of rows that were written.
+
+    Returns:
+    -------
+        A series with the rows, independent of the shared memory.
+
+    """
+    buffer = cast("memoryview", memory.buf)
+    region = ITEM_SIZE * capacity
+    size = ITEM_SIZE * count
+    timestamps = array("q")
+    timestamps.frombytes(buffer[:size])
+    columns = {}
+    for index, name in enumerate(series_type.FIELDS, start=1):
+        columns[name] = array("d")
+        columns[name].frombytes(buffer[index * region : index * region + size])
+    return series_type(timestamps, columns)
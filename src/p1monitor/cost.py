@@ -0,0 +1,171 @@
+"""Energy and gas cost of P1 Monitor readings."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from .aggregation import (
+    CONSUMPTION_COUNTERS,
+    PRODUCTION_COUNTERS,
+    _collect,
+    _rollup,
+)
+from .models import EnergyTariff, Settings, SmartMeter
+from .series import SmartMeterSeries, TimeSeries
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+COUNTERS = (
+    *CONSUMPTION_COUNTERS.values(),
+    *PRODUCTION_COUNTERS.values(),
+    "gas_consumption",
+)
+
+
+@dataclass(slots=True)
+class Cost:
+    """Object representing the cost of the energy and gas used in a period."""
+
+    start: datetime
+
+    consumption: dict[EnergyTariff, float] = field(
+        default_factory=lambda: dict.fromkeys(EnergyTariff, 0.0)
+    )
+    production: dict[EnergyTariff, float] = field(
+        default_factory=lambda: dict.fromkeys(EnergyTariff, 0.0)
+    )
+    gas: float = 0.0
+
+    @property
+    def total(self) -> float:
+        """Return the cost of consumption and gas, minus the feed-in revenue."""
+        return (
+            math.fsum(self.consumption.values())
+            + self.gas
+            - math.fsum(self.production.values())
+        )
+
+
+class CostCalculator:
+    """Incremental cost of smart meter readings, using the prices of Settings.
+
+    Readings are added in chronological order, alone or in batches. Only the
+    increase of the counters since the previous reading is priced, so adding
+    a reading does not recompute what came before. The consumed energy and
+    gas are priced at the consumption prices, the produced (fed-in) energy
+    at the production prices, per tariff. A price that is not set counts as
+    zero. A counter that decreases is treated as restarted at zero.
+
+    Create one calculator per meter. Batches are computed with NumPy when
+    it is installed.
+    """
+
+    __slots__ = ("_previous", "buckets", "offset", "prices", "running", "seconds")
+
+    def __init__(
+        self,
+        settings: Settings,
+        seconds: int = 86400,
+        offset: int = 0,
+    ) -> None:
+        """Initialize the calculator.
+
+        Args:
+        ----
+            settings: The prices configured on the P1 Monitor.
+            seconds: The length of the cost buckets, daily by default.
+            offset: UTC offset in seconds the buckets are aligned to, for
+                example 3600 to have daily buckets start at midnight CET.
+
+        """
+        self.prices = [
+            settings.energy_consumption_price_high or 0.0,
+            settings.energy_consumption_price_low or 0.0,
+            settings.energy_production_price_high or 0.0,
+            settings.energy_production_price_low or 0.0,
+            settings.gas_consumption_price or 0.0,
+        ]
+        self.seconds = seconds
+        self.offset = offset
+        self.buckets: list[Cost] = []
+        self.running: Cost | None = None
+        self._previous = dict.fromkeys(COUNTERS, math.nan)
+
+    def add(self, reading: SmartMeter) -> None:
+        """Add a single reading.
+
+        Args:
+        ----
+            reading: A reading newer than the readings added before. A
+                reading without a timestamp is ignored.
+
+        """
+        if reading.timestamp is None:
+            return
+        timestamp = int(reading.timestamp.timestamp())
+        costs = []
+        for name, price in zip(COUNTERS, self.prices, strict=True):
+            value = getattr(reading, name)
+            increase = 0.0
+            if value is not None:
+                previous = self._previous[name]
+                if not math.isnan(previous):
+                    increase = value - previous
+                    if increase < 0:
+                        increase = value
+                self._previous[name] = value
+            costs.append(increase * price)
+        self._book(timestamp - (timestamp + self.offset) % self.seconds, costs)
+
+    def extend(self, data: SmartMeterSeries | Iterable[SmartMeter]) -> None:
+        """Add a batch of readings.
+
+        Args:
+        ----
+            data: Readings in chronological order, newer than the readings
+                added before, as a series or as SmartMeter objects.
+
+        """
+        series: TimeSeries
+        if isinstance(data, SmartMeterSeries):
+            series = data
+        else:
+            series = _collect(SmartMeterSeries(), data)
+        starts, totals, _, _ = _rollup(
+            series, self._previous, (), self.seconds, self.offset
+        )
+        for i, start in enumerate(starts):
+            self._book(
+                start,
+                [
+                    total[i] * price
+                    for total, price in zip(totals, self.prices, strict=True)
+                ],
+            )
+
+    def _book(self, start: int, costs: list[float]) -> None:
+        """Add costs to a bucket and to the running total.
+
+        Args:
+        ----
+            start: The start of the bucket, as UTC epoch seconds.
+            costs: The cost of every counter, in the order of COUNTERS.
+
+        """
+        bucket = self.buckets[-1] if self.buckets else None
+        if bucket is None or bucket.start.timestamp() != start:
+            bucket = Cost(start=datetime.fromtimestamp(start, tz=UTC))
+            self.buckets.append(bucket)
+        if self.running is None:
+            self.running = Cost(start=bucket.start)
+        high, low, production_high, production_low, gas = costs
+        for cost in (bucket, self.running):
+            cost.consumption[EnergyTariff.HIGH] += high
+            cost.consumption[EnergyTariff.LOW] += low
+            cost.production[EnergyTariff.HIGH] += production_high
+            cost.production[EnergyTariff.LOW] += production_low
+            cost.gas += gas
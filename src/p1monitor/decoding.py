@@ -0,0 +1,120 @@
+"""Incremental JSON decoding for P1 Monitor responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import P1MonitorError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator, Callable
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def select_loads(backend: str | None = None) -> Callable[[bytes], Any]:
+    """Return the function decoding a complete JSON response body.
+
+    Args:
+    ----
+        backend: One of 'orjson', 'msgspec' or 'json'. By default the fastest
+            installed backend is used, in that order.
+
+    Returns:
+    -------
+        A function decoding bytes into Python objects.
+
+    Raises:
+    ------
+        ValueError: The backend is unknown or not installed.
+
+    """
+    if backend is None:
+        backend = next(
+            name
+            for name, module in zip(BACKENDS, (orjson, msgspec, json), strict=True)
+            if module is not None
+        )
+    if backend == "orjson" and orjson is not None:
+        return orjson.loads
+    if backend == "msgspec" and msgspec is not None:
+        return msgspec.json.decode
+    if backend == "json":
+        return json.loads
+    msg = f"JSON backend {backend} is not installed, expected one of {BACKENDS}"
+    raise ValueError(msg)
+
+
+loads = select_loads()
+
+
+async def iter_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Decode the objects of a JSON list while its bytes are being received.
+
+    Only the object that is currently being received is buffered, so the
+    memory use does not grow with the length of the list. The P1 Monitor
+    API returns rows as objects, other items are rejected.
+
+    Args:
+    ----
+        chunks: The raw bytes of the JSON list, in arbitrary pieces.
+
+    Yields:
+    ------
+        Each object of the JSON list.
+
+    Raises:
+    ------
+        P1MonitorError: The response is not a (complete) JSON list of objects.
+
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    async for chunk in chunks:
+        buffer += text.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    msg = "Unexpected response from the P1 Monitor device"
+                    raise P1MonitorError(msg, {"response": buffer[:100]})
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            if buffer[pos] != "{":
+                msg = "Unexpected item in the response from the P1 Monitor device"
+                raise P1MonitorError(msg, {"response": buffer[pos : pos + 100]})
+            try:
+                item, pos = _DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            yield item
+        buffer = buffer[pos:]
+
+    msg = "Incomplete response from the P1 Monitor device"
+    raise P1MonitorError(msg, {"response": buffer[:100]})
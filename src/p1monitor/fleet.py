@@ -0,0 +1,234 @@
+"""Asynchronous Python client for polling a fleet of P1 Monitor devices."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Self
+
+from aiohttp import ClientSession, TCPConnector
+
+from .exceptions import P1MonitorError
+from .models import SNAPSHOT_ENDPOINTS, Snapshot
+from .p1monitor import P1Monitor
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
+
+    from .timeouts import AdaptiveTimeouts
+
+ENDPOINTS = (*SNAPSHOT_ENDPOINTS, "snapshot")
+
+
+@dataclass(slots=True)
+class FleetResult:
+    """Object representing the response of a single device in a fleet."""
+
+    host: str
+    port: int
+    endpoint: str
+
+    data: Any = None
+    error: P1MonitorError | None = None
+
+
+@dataclass
+class P1MonitorFleet:
+    """Class for polling many P1 Monitor devices over one shared session."""
+
+    hosts: Sequence[str | tuple[str, int]]
+    port: int = 80
+    request_timeout: float = 10.0
+    limit: int = 100
+    limit_per_host: int = 2
+    session: ClientSession | None = None
+    timeouts: AdaptiveTimeouts | None = None
+
+    _close_session: bool = False
+    _clients: dict[tuple[str, int], P1Monitor] = field(default_factory=dict)
+    _semaphores: dict[tuple[str, int], asyncio.Semaphore] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Prepare the shared limits of the fleet."""
+        self._devices = [
+            (host, self.port) if isinstance(host, str) else host for host in self.hosts
+        ]
+        self._limiter = asyncio.Semaphore(self.limit)
+
+    def client(self, host: str, port: int | None = None) -> P1Monitor:
+        """Return the client of a single device, sharing the fleet session.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor.
+            port: The port of the P1 Monitor, defaults to the fleet port.
+
+        Returns:
+        -------
+            The P1Monitor object of the device.
+
+        """
+        key = (host, self.port if port is None else port)
+        if key not in self._clients:
+            if self.session is None:
+                self.session = ClientSession(
+                    connector=TCPConnector(
+                        limit=self.limit,
+                        limit_per_host=self.limit_per_host,
+                    )
+                )
+                self._close_session = True
+            self._clients[key] = P1Monitor(
+                host=key[0],
+                port=key[1],
+                request_timeout=self.request_timeout,
+                session=self.session,
+                timeouts=self.timeouts,
+            )
+        return self._clients[key]
+
+    async def request(self, host: str, port: int, endpoint: str) -> FleetResult:
+        """Request an endpoint of a single device, within the fleet limits.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor.
+            port: The port of the P1 Monitor.
+            endpoint: The P1Monitor method to call, for example 'smartmeter'.
+
+        Returns:
+        -------
+            A FleetResult with either the data or the error of the device.
+
+        Raises:
+        ------
+            ValueError: The endpoint is not supported.
+
+        """
+        if endpoint not in ENDPOINTS:
+            msg = f"Unknown endpoint: {endpoint}, expected one of {ENDPOINTS}"
+            raise ValueError(msg)
+
+        try:
+            if endpoint == "snapshot":
+                # Every request of a snapshot takes its own slot in the limits
+                results = await asyncio.gather(
+                    *(self._limited(host, port, name) for name in SNAPSHOT_ENDPOINTS),
+                    return_exceptions=True,
+                )
+                data: Any = Snapshot.from_results(results)
+            else:
+                data = await self._limited(host, port, endpoint)
+        except P1MonitorError as exception:
+            return FleetResult(host, port, endpoint, error=exception)
+        return FleetResult(host, port, endpoint, data=data)
+
+    async def raw(self, host: str, port: int, endpoint: str) -> bytes:
+        """Request the undecoded latest values of a device, within the fleet limits.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor.
+            port: The port of the P1 Monitor.
+            endpoint: The P1Monitor method the values are for, for example
+                'smartmeter'.
+
+        Returns:
+        -------
+            The JSON response body from the P1 Monitor API.
+
+        """
+        body: bytes = await self._limited(host, port, "raw", endpoint)
+        return body
+
+    async def _limited(self, host: str, port: int, endpoint: str, *args: Any) -> Any:
+        """Call a single endpoint of a device within the fleet limits.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor.
+            port: The port of the P1 Monitor.
+            endpoint: The P1Monitor method to call, for example 'smartmeter'.
+            *args: The arguments of the method.
+
+        Returns:
+        -------
+            The data object returned by the P1Monitor method.
+
+        """
+        client = self.client(host, port)
+        key = (host, port)
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.limit_per_host)
+        async with self._limiter, self._semaphores[key]:
+            return await getattr(client, endpoint)(*args)
+
+    async def poll(self, endpoint: str = "smartmeter") -> AsyncIterator[FleetResult]:
+        """Poll an endpoint of every device in the fleet.
+
+        At most `limit` requests are in flight at any moment, and at most
+        `limit_per_host` per device, also when the session is provided by the
+        caller. A 'snapshot' counts as four requests. Results are returned as
+        soon as each device answers, not in the order of `hosts`.
+
+        Args:
+        ----
+            endpoint: The P1Monitor method to call, for example 'smartmeter'.
+
+        Yields:
+        ------
+            A FleetResult for every device in the fleet.
+
+        """
+        devices = iter(self._devices)
+        results: asyncio.Queue[FleetResult | Exception] = asyncio.Queue(self.limit)
+
+        async def worker() -> None:
+            for host, port in devices:
+                try:
+                    result: FleetResult | Exception = await self.request(
+                        host, port, endpoint
+                    )
+                except Exception as exception:  # noqa: BLE001
+                    result = exception
+                await results.put(result)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.limit, len(self._devices)))
+        ]
+        try:
+            for _ in self._devices:
+                result = await results.get()
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Close open client session."""
+        if self.session and self._close_session:
+            await self.session.close()
+
+    async def __aenter__(self) -> Self:
+        """Async enter.
+
+        Returns
+        -------
+            The P1MonitorFleet object.
+
+        """
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        await self.close()
@@ -0,0 +1,283 @@
+"""Incremental history synchronisation for P1 Monitor."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from contextlib import aclosing
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import AsyncGenerator, AsyncIterator, Callable
+
+    from .models import SmartMeter, WaterMeter
+    from .p1monitor import P1Monitor
+
+
+class Checkpoints:
+    """In memory checkpoints, the last synchronised timestamp per endpoint.
+
+    Subclass it and override get and set to keep the checkpoints elsewhere.
+    """
+
+    __slots__ = ("_checkpoints",)
+
+    def __init__(self) -> None:
+        """Initialize without checkpoints."""
+        self._checkpoints: dict[tuple[str, str], int] = {}
+
+    async def get(self, host: str, endpoint: str) -> int | None:
+        """Return the checkpoint of an endpoint.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+
+        Returns:
+        -------
+            The TIMESTAMP_UTC of the last synchronised row, or None when the
+            endpoint was never synchronised.
+
+        """
+        return self._checkpoints.get((host, endpoint))
+
+    async def set(self, host: str, endpoint: str, timestamp: int) -> None:
+        """Store the checkpoint of an endpoint.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+            timestamp: The TIMESTAMP_UTC of the last synchronised row.
+
+        """
+        self._checkpoints[host, endpoint] = timestamp
+
+
+class FileCheckpoints(Checkpoints):
+    """Checkpoints kept in a JSON file, so a sync continues after a restart."""
+
+    __slots__ = ("_loaded", "path")
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize the checkpoints.
+
+        Args:
+        ----
+            path: The JSON file holding the checkpoints, created when missing.
+
+        """
+        super().__init__()
+        self.path = Path(path)
+        self._loaded = False
+
+    async def get(self, host: str, endpoint: str) -> int | None:
+        """Return the checkpoint of an endpoint, reading the file once.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+
+        Returns:
+        -------
+            The TIMESTAMP_UTC of the last synchronised row, or None when the
+            endpoint was never synchronised.
+
+        """
+        if not self._loaded:
+            if self.path.exists():
+                for key, timestamp in json.loads(self.path.read_text()).items():
+                    host_, _, endpoint_ = key.rpartition("/")
+                    self._checkpoints[host_, endpoint_] = timestamp
+            self._loaded = True
+        return await super().get(host, endpoint)
+
+    async def set(self, host: str, endpoint: str, timestamp: int) -> None:
+        """Store the checkpoint of an endpoint and write the file.
+
+        The file is replaced atomically, so it is never left half written.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+            timestamp: The TIMESTAMP_UTC of the last synchronised row.
+
+        """
+        await self.get(host, endpoint)
+        await super().set(host, endpoint, timestamp)
+        checkpoints = {
+            f"{host_}/{endpoint_}": value
+            for (host_, endpoint_), value in self._checkpoints.items()
+        }
+        temporary = self.path.with_name(f".{self.path.name}.tmp")
+        temporary.write_text(json.dumps(checkpoints, indent=2, sort_keys=True))
+        temporary.replace(self.path)
+
+
+class CallbackCheckpoints(Checkpoints):
+    """Checkpoints loaded and saved by callables, for example in a database."""
+
+    __slots__ = ("load", "save")
+
+    def __init__(
+        self,
+        load: Callable[[str, str], Any],
+        save: Callable[[str, str, int], Any],
+    ) -> None:
+        """Initialize the checkpoints.
+
+        Args:
+        ----
+            load: Called with the host and endpoint, returns the checkpoint or
+                None. It may be a coroutine function.
+            save: Called with the host, endpoint and checkpoint. It may be a
+                coroutine function.
+
+        """
+        super().__init__()
+        self.load = load
+        self.save = save
+
+    async def get(self, host: str, endpoint: str) -> int | None:
+        """Return the checkpoint of an endpoint from the load callable.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+
+        Returns:
+        -------
+            The TIMESTAMP_UTC of the last synchronised row, or None when the
+            endpoint was never synchronised.
+
+        """
+        timestamp = self.load(host, endpoint)
+        if inspect.isawaitable(timestamp):
+            timestamp = await timestamp
+        return cast("int | None", timestamp)
+
+    async def set(self, host: str, endpoint: str, timestamp: int) -> None:
+        """Pass the checkpoint of an endpoint to the save callable.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+            timestamp: The TIMESTAMP_UTC of the last synchronised row.
+
+        """
+        result = self.save(host, endpoint, timestamp)
+        if inspect.isawaitable(result):
+            await result
+
+
+class HistorySync:
+    """Fetch only the history rows a previous sync has not returned yet.
+
+    The TIMESTAMP_UTC of the last handled row is kept per host and endpoint.
+    The next sync starts right after it, so the device only sends the new
+    rows, whatever the size of its history. A row counts as handled once
+    the next row is requested or the iteration ends. A row whose handling
+    raised, or after which the iteration was stopped, is returned again by
+    the next sync. The checkpoint is stored when the iteration ends or the
+    generator is closed, close it with contextlib.aclosing when stopping
+    early.
+    """
+
+    __slots__ = ("checkpoints", "client", "page_size")
+
+    def __init__(
+        self,
+        client: P1Monitor,
+        checkpoints: Checkpoints | None = None,
+        page_size: int = 1000,
+    ) -> None:
+        """Initialize the sync.
+
+        Args:
+        ----
+            client: The client of the P1 Monitor to synchronise.
+            checkpoints: Where to keep the checkpoints, in memory by default.
+            page_size: Number of rows to request from the device per page.
+
+        """
+        self.client = client
+        self.checkpoints = checkpoints if checkpoints is not None else Checkpoints()
+        self.page_size = page_size
+
+    def smartmeter(self, limit: int | None = None) -> AsyncGenerator[SmartMeter]:
+        """Get the smart meter readings since the previous sync, oldest first.
+
+        Args:
+        ----
+            limit: Maximum number of readings to return, the rest is returned
+                by the next sync.
+
+        Returns:
+        -------
+            An async generator of a SmartMeter data object for each new
+            reading.
+
+        """
+        return self._sync("smartmeter", self.client.smartmeter_history, limit)
+
+    def watermeter(self, limit: int | None = None) -> AsyncGenerator[WaterMeter]:
+        """Get the daily water meter values since the previous sync, oldest first.
+
+        Args:
+        ----
+            limit: Maximum number of days to return, the rest is returned by
+                the next sync.
+
+        Returns:
+        -------
+            An async generator of a WaterMeter data object for each new day.
+
+        """
+        return self._sync("watermeter", self.client.watermeter_history, limit)
+
+    async def _sync(
+        self,
+        endpoint: str,
+        history: Callable[..., AsyncIterator[Any]],
+        limit: int | None,
+    ) -> AsyncGenerator[Any]:
+        """Yield the rows after the checkpoint and move the checkpoint along.
+
+        The checkpoint only moves past a row when the consumer asks for the
+        next one, so a row is never skipped when handling it failed.
+
+        Args:
+        ----
+            endpoint: The history endpoint, 'smartmeter' or 'watermeter'.
+            history: The history method of the client for the endpoint.
+            limit: Maximum number of rows to return.
+
+        Yields:
+        ------
+            The data object of each row after the checkpoint.
+
+        """
+        host = self.client.host
+        checkpoint = latest = await self.checkpoints.get(host, endpoint)
+        # Timestamps are whole seconds, so the sync starts right after the
+        # checkpoint and rows that were returned before are never repeated.
+        start = None
+        if checkpoint is not None:
+            start = datetime.fromtimestamp(checkpoint + 1, tz=UTC)
+        try:
+            readings = history(start=start, limit=limit, page_size=self.page_size)
+            async with aclosing(cast("AsyncGenerator[Any]", readings)):
+                async for reading in readings:
+                    yield reading
+                    latest = int(cast("datetime", reading.timestamp).timestamp())
+        finally:
+            if latest is not None and latest != checkpoint:
+                await self.checkpoints.set(host, endpoint, latest)
@@ -0,0 +1,311 @@
+"""Request and parse instrumentation for P1 Monitor."""
+
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import TraceConfig
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from types import SimpleNamespace
+
+    from aiohttp import (
+        ClientSession,
+        TraceConnectionCreateEndParams,
+        TraceConnectionCreateStartParams,
+        TraceDnsResolveHostEndParams,
+        TraceDnsResolveHostStartParams,
+        TraceRequestEndParams,
+        TraceRequestHeadersSentParams,
+    )
+
+    Exporter = Callable[[str, str, str, float], None]
+
+BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PHASES = ("dns", "connect", "first_byte", "body", "decode", "parse")
+
+
+class Histogram:
+    """Latency histogram with fixed bucket bounds in seconds."""
+
+    __slots__ = ("bounds", "count", "counts", "sum")
+
+    def __init__(self, bounds: Iterable[float] = BUCKETS) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+        ----
+            bounds: The upper bounds of the buckets, in ascending order. One
+                more bucket is kept for values above the last bound.
+
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a single measurement.
+
+        Args:
+        ----
+            value: The measured duration in seconds.
+
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile, interpolating within the matching bucket.
+
+        Args:
+        ----
+            q: The quantile, for example 0.95.
+
+        Returns:
+        -------
+            The estimated duration in seconds, NaN without measurements. For
+            values above the last bound, the last bound is returned.
+
+        """
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]  # pragma: no cover
+
+    def decay(self) -> None:
+        """Halve the weight of the measurements so far, keeping their mean.
+
+        Buckets are rounded up, so a bucket with a single measurement in the
+        tail is not dropped at once.
+        """
+        count = self.count
+        self.counts = [(value + 1) // 2 for value in self.counts]
+        self.count = sum(self.counts)
+        if count:
+            self.sum *= self.count / count
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the measurements, NaN without measurements."""
+        return self.sum / self.count if self.count else float("nan")
+
+
+class Instrumentation:
+    """Latency histograms per host, endpoint and phase of a request.
+
+    The phases are 'dns', 'connect', 'first_byte' (request sent until the
+    response headers arrive), 'body', 'decode' and 'parse'. The connect
+    phase covers the DNS lookup of a new connection as well. Every
+    measurement is also passed to the exporters, for example to feed a
+    Prometheus or OpenTelemetry histogram.
+    """
+
+    __slots__ = ("buckets", "exporters", "histograms")
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = BUCKETS,
+        exporters: Iterable[Exporter] = (),
+    ) -> None:
+        """Initialize the instrumentation.
+
+        Args:
+        ----
+            buckets: The upper bounds of the histogram buckets in seconds.
+            exporters: Functions called with the host, endpoint, phase and
+                duration in seconds of every measurement.
+
+        """
+        self.buckets = tuple(buckets)
+        self.exporters = list(exporters)
+        self.histograms: dict[tuple[str, str, str], Histogram] = {}
+
+    def observe(self, host: str, endpoint: str, phase: str, seconds: float) -> None:
+        """Record the duration of a single phase of a request.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The request URI, for example 'v1/smartmeter'.
+            phase: The phase of the request, one of PHASES.
+            seconds: The measured duration.
+
+        """
+        key = (host, endpoint, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        for exporter in self.exporters:
+            exporter(host, endpoint, phase, seconds)
+
+    @contextmanager
+    def measure(self, host: str, endpoint: str, phase: str) -> Iterator[None]:
+        """Record the duration of the enclosed block.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The request URI, for example 'v1/smartmeter'.
+            phase: The phase of the request, one of PHASES.
+
+        Yields:
+        ------
+            Nothing, the block is timed.
+
+        """
+        started = perf_counter()
+        yield
+        self.observe(host, endpoint, phase, perf_counter() - started)
+
+    def trace_config(self) -> TraceConfig:
+        """Return the aiohttp tracing hooks measuring the network phases.
+
+        Add it to the trace_configs of a ClientSession that is passed to the
+        P1Monitor client. When the client creates its own session, it is
+        added automatically.
+
+        Returns
+        -------
+            A TraceConfig recording the dns, connect and first_byte phases.
+
+        """
+        config = TraceConfig()
+        config.on_dns_resolvehost_start.append(self._on_dns_start)
+        config.on_dns_resolvehost_end.append(self._on_dns_end)
+        config.on_connection_create_start.append(self._on_connect_start)
+        config.on_connection_create_end.append(self._on_connect_end)
+        config.on_request_headers_sent.append(self._on_headers_sent)
+        config.on_request_end.append(self._on_request_end)
+        config.freeze()
+        return config
+
+    def _mark(self, context: SimpleNamespace, name: str) -> None:
+        """Store the current time in the trace context.
+
+        Args:
+        ----
+            context: The trace context of the request.
+            name: The name of the moment.
+
+        """
+        setattr(context, name, asyncio.get_running_loop().time())
+
+    def _since(self, context: SimpleNamespace, name: str, phase: str) -> None:
+        """Record the time since a moment stored in the trace context.
+
+        Args:
+        ----
+            context: The trace context of the request.
+            name: The name of the moment the phase started.
+            phase: The phase to record.
+
+        """
+        request = context.trace_request_ctx
+        started = getattr(context, name, None)
+        if request is None or started is None:
+            return
+        self.observe(
+            request["host"],
+            request["endpoint"],
+            phase,
+            asyncio.get_running_loop().time() - started,
+        )
+
+    async def _on_dns_start(
+        self,
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceDnsResolveHostStartParams,
+    ) -> None:
+        self._mark(context, "dns")
+
+    async def _on_dns_end(
+        self,
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceDnsResolveHostEndParams,
+    ) -> None:
+        self._since(context, "dns", "dns")
+
+    async def _on_connect_start(
+        self,
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceConnectionCreateStartParams,
+    ) -> None:
+        self._mark(context, "connect")
+
+    async def _on_connect_end(
+        self,
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceConnectionCreateEndParams,
+    ) -> None:
+        self._since(context, "connect", "connect")
+
+    async def _on_headers_sent(
+        self,
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceRequestHeadersSentParams,
+    ) -> None:
+        self._mark(context, "sent")
+
+    async def _on_request_end(
+        self,
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceRequestEndParams,
+    ) -> None:
+        self._since(context, "sent", "first_byte")
+
+    def summary(self) -> dict[tuple[str, str, str], dict[str, Any]]:
+        """Return the count and latency percentiles of every histogram.
+
+        Returns
+        -------
+            The count, mean, p50, p95 and p99 in seconds, per host, endpoint
+            and phase.
+
+        """
+        return {
+            key: {
+                "count": histogram.count,
+                "mean": histogram.mean,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+            for key, histogram in self.histograms.items()
+        }
@@ -2,9 +2,22 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from enum import StrEnum
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import P1MonitorError, P1MonitorNoDataError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+SNAPSHOT_ENDPOINTS = ("smartmeter", "phases", "watermeter", "settings")
+
+SERVICE_KEYS: dict[str, tuple[str, str]] = {
+    "conf": ("CONFIGURATION_ID", "PARAMETER"),
+    "status": ("STATUS_ID", "STATUS"),
+}
 
 
 class EnergyTariff(StrEnum):
@@ -16,7 +29,11 @@ class EnergyTariff(StrEnum):
     HIGH = "high"
 
 
-@dataclass
+# TARIFCODE of the API per tariff period, any other code is the low tariff
+ENERGY_TARIFFS: dict[Any, EnergyTariff] = {"P": EnergyTariff.HIGH}
+
+
+@dataclass(slots=True)
 class SmartMeter:
     """Object representing an SmartMeter response from P1 Monitor."""
 
@@ -31,6 +48,8 @@ class SmartMeter:
     energy_production_high: float | None
     energy_production_low: float | None
 
+    timestamp: datetime | None = None
+
     @staticmethod
     def from_dict(data: dict[str | int, Any]) -> SmartMeter:
         """Return SmartMeter object from the P1 Monitor API response.
@@ -44,24 +63,21 @@ class SmartMeter:
             A SmartMeter object.
 
         """
+        return SmartMeter.from_row(data[0])
 
-        def energy_tariff(tariff: str) -> EnergyTariff:
-            """Return API energy_tariff information.
-
-            Args:
-            ----
-                tariff: The provided tariff code from the API.
+    @staticmethod
+    def from_row(data: dict[str, Any]) -> SmartMeter:
+        """Return SmartMeter object from a single row of the P1 Monitor API.
 
-            Returns:
-            -------
-                The energy tariff period class.
+        Args:
+        ----
+            data: A single reading from the P1 Monitor API response.
 
-            """
-            if tariff == "P":
-                return EnergyTariff.HIGH
-            return EnergyTariff.LOW
+        Returns:
+        -------
+            A SmartMeter object.
 
-        data = data[0]
+        """
         return SmartMeter(
             gas_consumption=data.get("CONSUMPTION_GAS_M3"),
             power_consumption=data.get("CONSUMPTION_W"),
@@ -70,11 +86,50 @@ class SmartMeter:
             power_production=data.get("PRODUCTION_W"),
             energy_production_high=data.get("PRODUCTION_KWH_HIGH"),
             energy_production_low=data.get("PRODUCTION_KWH_LOW"),
-            energy_tariff_period=energy_tariff(str(data.get("TARIFCODE"))),
+            energy_tariff_period=ENERGY_TARIFFS.get(
+                data.get("TARIFCODE"), EnergyTariff.LOW
+            ),
+            timestamp=to_datetime(data.get("TIMESTAMP_UTC")),
         )
 
+    @staticmethod
+    def from_rows(data: Iterable[dict[str, Any]]) -> list[SmartMeter]:
+        """Return a SmartMeter object for every row of a P1 Monitor API response.
+
+        The lookups that do not depend on the row are resolved once for the
+        whole response, which makes it faster than calling from_row per row.
+
+        Args:
+        ----
+            data: The rows of the P1 Monitor API response.
+
+        Returns:
+        -------
+            A list of SmartMeter objects, in the order of the rows.
 
-@dataclass
+        """
+        tariff = ENERGY_TARIFFS.get
+        low = EnergyTariff.LOW
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            SmartMeter(
+                get("CONSUMPTION_GAS_M3"),
+                tariff(get("TARIFCODE"), low),
+                get("CONSUMPTION_W"),
+                get("CONSUMPTION_KWH_HIGH"),
+                get("CONSUMPTION_KWH_LOW"),
+                get("PRODUCTION_W"),
+                get("PRODUCTION_KWH_HIGH"),
+                get("PRODUCTION_KWH_LOW"),
+                None
+                if (utc := get("TIMESTAMP_UTC")) is None
+                else fromtimestamp(utc, UTC),
+            )
+            for get in (row.get for row in data)
+        ]
+
+
+@dataclass(slots=True)
 class Settings:
     """Object representing an Settings response from P1 Monitor."""
 
@@ -99,16 +154,17 @@ class Settings:
             A Settings object.
 
         """
+        values = PositionIndex.from_dict(data, "conf")
         return Settings(
-            gas_consumption_price=search(15, data, "conf"),
-            energy_consumption_price_low=search(1, data, "conf"),
-            energy_consumption_price_high=search(2, data, "conf"),
-            energy_production_price_low=search(3, data, "conf"),
-            energy_production_price_high=search(4, data, "conf"),
+            gas_consumption_price=values.get(15),
+            energy_consumption_price_low=values.get(1),
+            energy_consumption_price_high=values.get(2),
+            energy_production_price_low=values.get(3),
+            energy_production_price_high=values.get(4),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Phases:
     """Object representing an Phases response from P1 Monitor."""
 
@@ -141,23 +197,24 @@ class Phases:
             A Phases object.
 
         """
+        values = PositionIndex.from_dict(data, "status")
         return Phases(
-            voltage_phase_l1=search(103, data, "status"),
-            voltage_phase_l2=search(104, data, "status"),
-            voltage_phase_l3=search(105, data, "status"),
-            current_phase_l1=search(100, data, "status"),
-            current_phase_l2=search(101, data, "status"),
-            current_phase_l3=search(102, data, "status"),
-            power_consumed_phase_l1=convert(search(74, data, "status")),
-            power_consumed_phase_l2=convert(search(75, data, "status")),
-            power_consumed_phase_l3=convert(search(76, data, "status")),
-            power_produced_phase_l1=convert(search(77, data, "status")),
-            power_produced_phase_l2=convert(search(78, data, "status")),
-            power_produced_phase_l3=convert(search(79, data, "status")),
+            voltage_phase_l1=values.get(103),
+            voltage_phase_l2=values.get(104),
+            voltage_phase_l3=values.get(105),
+            current_phase_l1=values.get(100),
+            current_phase_l2=values.get(101),
+            current_phase_l3=values.get(102),
+            power_consumed_phase_l1=convert(values.get(74)),
+            power_consumed_phase_l2=convert(values.get(75)),
+            power_consumed_phase_l3=convert(values.get(76)),
+            power_produced_phase_l1=convert(values.get(77)),
+            power_produced_phase_l2=convert(values.get(78)),
+            power_produced_phase_l3=convert(values.get(79)),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class WaterMeter:
     """Object representing an WaterMeter response from P1 Monitor."""
 
@@ -165,6 +222,8 @@ class WaterMeter:
     consumption_total: float | None
     pulse_count: int | None
 
+    timestamp: datetime | None = None
+
     @staticmethod
     def from_dict(data: dict[str | int, Any]) -> WaterMeter:
         """Return WaterMeter object from the P1 Monitor API response.
@@ -178,17 +237,147 @@ class WaterMeter:
             A WaterMeter object.
 
         """
-        data = data[0]
+        return WaterMeter.from_row(data[0])
+
+    @staticmethod
+    def from_row(data: dict[str, Any]) -> WaterMeter:
+        """Return WaterMeter object from a single row of the P1 Monitor API.
+
+        Args:
+        ----
+            data: A single reading from the P1 Monitor API response.
+
+        Returns:
+        -------
+            A WaterMeter object.
+
+        """
         return WaterMeter(
             consumption_day=data.get("WATERMETER_CONSUMPTION_LITER"),
             consumption_total=data.get("WATERMETER_CONSUMPTION_TOTAL_M3"),
             pulse_count=data.get("WATERMETER_PULS_COUNT"),
+            timestamp=to_datetime(data.get("TIMESTAMP_UTC")),
         )
 
+    @staticmethod
+    def from_rows(data: Iterable[dict[str, Any]]) -> list[WaterMeter]:
+        """Return a WaterMeter object for every row of a P1 Monitor API response.
+
+        Args:
+        ----
+            data: The rows of the P1 Monitor API response.
+
+        Returns:
+        -------
+            A list of WaterMeter objects, in the order of the rows.
+
+        """
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            WaterMeter(
+                get("WATERMETER_CONSUMPTION_LITER"),
+                get("WATERMETER_CONSUMPTION_TOTAL_M3"),
+                get("WATERMETER_PULS_COUNT"),
+                None
+                if (utc := get("TIMESTAMP_UTC")) is None
+                else fromtimestamp(utc, UTC),
+            )
+            for get in (row.get for row in data)
+        ]
+
+
+@dataclass(slots=True)
+class Snapshot:
+    """Object representing the combined responses from P1 Monitor."""
+
+    smartmeter: SmartMeter | None = None
+    phases: Phases | None = None
+    watermeter: WaterMeter | None = None
+    settings: Settings | None = None
+
+    errors: dict[str, P1MonitorError] = field(default_factory=dict)
+
+    @staticmethod
+    def from_results(results: list[Any]) -> Snapshot:
+        """Return Snapshot object from the results of the separate requests.
+
+        Args:
+        ----
+            results: The result or raised exception of every endpoint, in the
+                order of SNAPSHOT_ENDPOINTS.
+
+        Returns:
+        -------
+            A Snapshot object.
+
+        """
+        values: dict[str, Any] = {}
+        errors: dict[str, P1MonitorError] = {}
+        for name, result in zip(SNAPSHOT_ENDPOINTS, results, strict=True):
+            if isinstance(result, P1MonitorError):
+                errors[name] = result
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                values[name] = result
+        return Snapshot(**values, errors=errors)
+
+
+@dataclass(frozen=True, slots=True)
+class PositionIndex:
+    """Lookup table of position ID to value for a status/configuration response."""
+
+    id_key: str
+    values: dict[int, Any]
+
+    @staticmethod
+    def from_dict(data: Any, service: str) -> PositionIndex:
+        """Index the JSON list from the P1 Monitor API in a single pass.
+
+        Args:
+        ----
+            data: The JSON list which is requested from the API.
+            service: Type of dataclass, either 'conf' or 'status'.
+
+        Returns:
+        -------
+            A PositionIndex object.
+
+        """
+        id_key, value_key = SERVICE_KEYS[service]
+        return PositionIndex(
+            id_key=id_key,
+            values={item[id_key]: item[value_key] for item in data},
+        )
+
+    def get(self, position: int) -> float:
+        """Return the value of a position ID.
+
+        Args:
+        ----
+            position: The position ID number.
+
+        Returns:
+        -------
+            The value that corresponds to the specified position.
+
+        Raises:
+        ------
+            P1MonitorNoDataError: The position ID is not in the response.
+
+        """
+        try:
+            return float(self.values[position])
+        except KeyError as exception:
+            msg = f"No {self.id_key} {position} in the P1 Monitor response"
+            raise P1MonitorNoDataError(msg) from exception
+
 
 def search(position: int, data: Any, service: str) -> float:
     """Find the correct value in the json data file.
 
+    Prefer building a PositionIndex once when reading multiple positions.
+
     Args:
     ----
         position: The position ID number.
@@ -200,13 +389,24 @@ def search(position: int, data: Any, service: str) -> float:
         The value that corresponds to the specified position.
 
     """
-    value: float
-    for i in data:
-        if service == "conf" and i["CONFIGURATION_ID"] == position:
-            value = float(i["PARAMETER"])
-        elif service == "status" and i["STATUS_ID"] == position:
-            value = float(i["STATUS"])
-    return value
+    return PositionIndex.from_dict(data, service).get(position)
+
+
+def to_datetime(value: int | None) -> datetime | None:
+    """Convert a UTC epoch timestamp from the API to a datetime.
+
+    Args:
+    ----
+        value: The timestamp in seconds since the epoch.
+
+    Returns:
+    -------
+        A timezone aware datetime, or None when there is no timestamp.
+
+    """
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, tz=UTC)
 
 
 def convert(value: float) -> int:
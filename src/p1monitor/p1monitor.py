@@ -4,18 +4,99 @@ from __future__ import annotations
 
 import asyncio
 import socket
-from dataclasses import dataclass
-from importlib import metadata
-from typing import Any, Self
-
-from aiohttp import ClientError, ClientSession
-from aiohttp.hdrs import METH_GET
+from contextlib import AbstractContextManager, aclosing, nullcontext
+from dataclasses import dataclass, field
+from functools import cache, partial
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Self, TypeVar, cast
+
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+    TCPConnector,
+)
+from aiohttp.hdrs import ETAG, LAST_MODIFIED, METH_GET
 from yarl import URL
 
+from .cache import Revision
+from .decoding import iter_array, loads
 from .exceptions import P1MonitorConnectionError, P1MonitorError, P1MonitorNoDataError
-from .models import Phases, Settings, SmartMeter, WaterMeter
+from .models import (
+    SNAPSHOT_ENDPOINTS,
+    Phases,
+    Settings,
+    SmartMeter,
+    Snapshot,
+    WaterMeter,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, AsyncIterator, Callable, Sequence
+    from datetime import datetime
+
+    from .cache import ResponseCache
+    from .instrumentation import Instrumentation
+    from .series import PhaseSeries, SmartMeterSeries, WaterMeterSeries
+    from .timeouts import AdaptiveTimeouts
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+STREAM_ENDPOINTS = ("smartmeter", "phases")
+
+# The request of the latest values, per endpoint method
+LATEST_REQUESTS: dict[str, tuple[str, dict[str, Any]]] = {
+    "smartmeter": ("v1/smartmeter", {"json": "object", "limit": 1}),
+    "phases": ("v1/status", {"json": "object"}),
+    "watermeter": ("v2/watermeter/day", {"json": "object", "limit": 1}),
+    "settings": ("v1/configuration", {"json": "object"}),
+}
+
+T = TypeVar("T")
+
+_UNMEASURED: AbstractContextManager[None] = nullcontext()
+
+
+@cache
+def default_headers() -> dict[str, str]:
+    """Return the headers of every request.
+
+    The version in the User-Agent is looked up on the first request, as
+    reading the package metadata slows down importing the package.
+
+    Returns
+    -------
+        The headers, shared by all clients, so not to be modified.
+
+    """
+    from importlib import metadata  # noqa: PLC0415
+
+    return {
+        "User-Agent": f"PythonP1Monitor/{metadata.version(__package__)}",
+        "Accept": "application/json, text/plain, */*",
+    }
+
+
+def __getattr__(name: str) -> Any:
+    """Return the version of the package as VERSION, looked up on first use.
 
-VERSION = metadata.version(__package__)
+    Args:
+    ----
+        name: The name of the module attribute.
+
+    Returns:
+    -------
+        The installed version of the package.
+
+    Raises:
+    ------
+        AttributeError: The module has no such attribute.
+
+    """
+    if name == "VERSION":
+        return default_headers()["User-Agent"].removeprefix("PythonP1Monitor/")
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
 
 
 @dataclass
@@ -26,28 +107,52 @@ class P1Monitor:
     port: int = 80
     request_timeout: float = 10.0
     session: ClientSession | None = None
+    cache: ResponseCache | None = None
+    change_detection: bool = True
+    json_loads: Callable[[bytes], Any] = loads
+    instrumentation: Instrumentation | None = None
+    keepalive_timeout: float = 60.0
+    limit_per_host: int = 4
+    dns_cache_ttl: int = 300
+    timeouts: AdaptiveTimeouts | None = None
 
     _close_session: bool = False
+    _revisions: dict[tuple[str, str], Revision] = field(default_factory=dict)
+    _models: dict[Callable[[Any], Any], tuple[Any, Any]] = field(default_factory=dict)
 
-    async def _request(
+    def __post_init__(self) -> None:
+        """Prepare the parts of a request that are the same for every call."""
+        self._base_url = URL.build(
+            scheme="http",
+            host=self.host,
+            port=int(self.port),
+            path="/api/",
+        )
+        self._urls: dict[str, URL] = {}
+
+    async def _send(
         self,
         uri: str,
         *,
         method: str = METH_GET,
         params: dict[str, Any] | None = None,
-    ) -> Any:
-        """Handle a request to a P1 Monitor device.
+        headers: dict[str, str] | None = None,
+        request_timeout: float | None = None,
+    ) -> ClientResponse:
+        """Send a request to a P1 Monitor device and validate the response.
 
         Args:
         ----
             uri: Request URI, without '/api/', for example, 'status'
             method: HTTP Method to use.
             params: Extra options to improve or limit the response.
+            headers: Extra headers, for example for a conditional request.
+            request_timeout: Seconds to wait for the response headers,
+                overriding the request_timeout of the client.
 
         Returns:
         -------
-            A Python dictionary (JSON decoded) with the response from
-            the P1 Monitor API.
+            The response from the P1 Monitor API, with the body not yet read.
 
         Raises:
         ------
@@ -56,29 +161,37 @@ class P1Monitor:
             P1MonitorError: Received an unexpected response from the P1 Monitor API.
 
         """
-        url = URL.build(
-            scheme="http",
-            host=self.host,
-            port=int(self.port),
-            path="/api/",
-        ).join(URL(uri))
-
-        headers = {
-            "User-Agent": f"PythonP1Monitor/{VERSION}",
-            "Accept": "application/json, text/plain, */*",
-        }
+        url = self._urls.get(uri)
+        if url is None:
+            url = self._urls[uri] = self._base_url.join(URL(uri))
+        defaults = default_headers()
+        headers = {**defaults, **headers} if headers else defaults
 
         if self.session is None:
-            self.session = ClientSession()
+            # Keep the connection to the device open between polls, and the
+            # resolved address of mDNS hostnames like p1mon.local cached
+            self.session = ClientSession(
+                connector=TCPConnector(
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                ),
+                trace_configs=[self.instrumentation.trace_config()]
+                if self.instrumentation is not None
+                else None,
+            )
             self._close_session = True
 
         try:
-            async with asyncio.timeout(self.request_timeout):
+            async with asyncio.timeout(request_timeout or self.request_timeout):
                 response = await self.session.request(
                     method,
                     url,
                     params=params,
                     headers=headers,
+                    trace_request_ctx={"host": self.host, "endpoint": uri}
+                    if self.instrumentation is not None
+                    else None,
                 )
                 response.raise_for_status()
 
@@ -88,12 +201,19 @@ class P1Monitor:
                 msg,
             ) from exception
         except (ClientError, socket.gaierror) as exception:
-            if "watermeter" in uri and response.status == 404:
+            if (
+                "watermeter" in uri
+                and isinstance(exception, ClientResponseError)
+                and exception.status == 404
+            ):
                 msg = "No water meter is connected to P1 Monitor device"
                 raise P1MonitorConnectionError(msg) from exception
             msg = "Error occurred while communicating with P1 Monitor device"
             raise P1MonitorConnectionError(msg) from exception
 
+        if response.status == HTTPStatus.NOT_MODIFIED:
+            return response
+
         content_type = response.headers.get("Content-Type", "")
         if "application/json" not in content_type:
             text = await response.text()
@@ -103,7 +223,261 @@ class P1Monitor:
                 {"Content-Type": content_type, "response": text},
             )
 
-        return await response.json()
+        return response
+
+    async def _request(
+        self,
+        uri: str,
+        *,
+        method: str = METH_GET,
+        params: dict[str, Any] | None = None,
+    ) -> Any:
+        """Handle a request to a P1 Monitor device.
+
+        Args:
+        ----
+            uri: Request URI, without '/api/', for example, 'status'
+            method: HTTP Method to use.
+            params: Extra options to improve or limit the response.
+
+        Returns:
+        -------
+            A Python dictionary (JSON decoded) with the response from
+            the P1 Monitor API.
+
+        """
+        if self.cache is not None and method == METH_GET:
+            return await self.cache.get(
+                self.host,
+                int(self.port),
+                uri,
+                params,
+                partial(self._fetch, uri, method=method, params=params),
+            )
+        return await self._fetch(uri, method=method, params=params)
+
+    async def _fetch(
+        self,
+        uri: str,
+        *,
+        method: str = METH_GET,
+        params: dict[str, Any] | None = None,
+    ) -> Any:
+        """Request and decode a response from a P1 Monitor device.
+
+        Args:
+        ----
+            uri: Request URI, without '/api/', for example, 'status'
+            method: HTTP Method to use.
+            params: Extra options to improve or limit the response.
+
+        Returns:
+        -------
+            The JSON decoded response from the P1 Monitor API. When change
+            detection is enabled and the response did not change since the
+            previous request, the previously decoded object is returned.
+
+        """
+        if not self.change_detection or method != METH_GET:
+            response = await self._send_adaptive(uri, method=method, params=params)
+            with self._measure(uri, "body"):
+                body = await response.read()
+            with self._measure(uri, "decode"):
+                return self.json_loads(body)
+
+        key = (uri, str(sorted((params or {}).items())))
+        revision = self._revisions.get(key)
+        response = await self._send_adaptive(
+            uri,
+            params=params,
+            headers=revision.conditions() if revision else None,
+        )
+        if revision is not None and response.status == HTTPStatus.NOT_MODIFIED:
+            response.release()
+            return revision.data
+
+        # Without validators from the device, compare a hash of the body
+        with self._measure(uri, "body"):
+            body = await response.read()
+        checksum = hash(body)
+        if revision is not None and revision.checksum == checksum:
+            return revision.data
+
+        with self._measure(uri, "decode"):
+            data = self.json_loads(body)
+        self._revisions[key] = Revision(
+            checksum=checksum,
+            data=data,
+            etag=response.headers.get(ETAG),
+            last_modified=response.headers.get(LAST_MODIFIED),
+        )
+        return data
+
+    async def _send_adaptive(
+        self,
+        uri: str,
+        *,
+        method: str = METH_GET,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> ClientResponse:
+        """Send a request with the adaptive timeouts, when they are enabled.
+
+        Args:
+        ----
+            uri: Request URI, without '/api/', for example, 'status'
+            method: HTTP Method to use, only GET requests are hedged.
+            params: Extra options to improve or limit the response.
+            headers: Extra headers, for example for a conditional request.
+
+        Returns:
+        -------
+            The response from the P1 Monitor API, with the body not yet read.
+
+        """
+        if self.timeouts is None or method != METH_GET:
+            return await self._send(uri, method=method, params=params, headers=headers)
+        return await self.timeouts.send(
+            self.host,
+            int(self.port),
+            lambda timeout: self._send(
+                uri, params=params, headers=headers, request_timeout=timeout
+            ),
+        )
+
+    def _measure(self, uri: str, phase: str) -> AbstractContextManager[None]:
+        """Time a phase of a request, when instrumentation is enabled.
+
+        Args:
+        ----
+            uri: Request URI, without '/api/', for example, 'v1/smartmeter'
+            phase: The phase of the request, for example 'decode'.
+
+        Returns:
+        -------
+            A context manager recording the duration of its block.
+
+        """
+        if self.instrumentation is None:
+            return _UNMEASURED
+        return self.instrumentation.measure(self.host, uri, phase)
+
+    def _parse(self, uri: str, data: Any, parser: Callable[[Any], T]) -> T:
+        """Build a data object, reusing the previous one for an unchanged response.
+
+        Args:
+        ----
+            uri: Request URI the data was requested from.
+            data: The JSON decoded response from the P1 Monitor API.
+            parser: The from_dict method of the data object.
+
+        Returns:
+        -------
+            The data object built from the response.
+
+        """
+        previous = self._models.get(parser)
+        if previous is not None and previous[0] is data:
+            return cast("T", previous[1])
+        with self._measure(uri, "parse"):
+            model = parser(data)
+        self._models[parser] = (data, model)
+        return model
+
+    async def _stream(
+        self,
+        uri: str,
+        *,
+        params: dict[str, Any] | None = None,
+    ) -> AsyncGenerator[Any]:
+        """Handle a request and decode the JSON list in the response incrementally.
+
+        Args:
+        ----
+            uri: Request URI, without '/api/', for example, 'v1/smartmeter'
+            params: Extra options to improve or limit the response.
+
+        Yields:
+        ------
+            Each item of the JSON list as soon as it has been received.
+
+        """
+        response = await self._send(uri, params=params)
+        async with response:
+            async for item in iter_array(response.content.iter_any()):
+                yield item
+
+    async def _history(
+        self,
+        uri: str,
+        *,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int | None,
+        page_size: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Page through the historical rows of an endpoint in chronological order.
+
+        Args:
+        ----
+            uri: Request URI, without '/api/', for example, 'v1/smartmeter'
+            start: Only return rows from this moment on.
+            end: Only return rows up to and including this moment.
+            limit: Maximum number of rows to return in total.
+            page_size: Number of rows to request from the device per page.
+
+        Yields:
+        ------
+            Each row of the history, oldest first.
+
+        Raises:
+        ------
+            P1MonitorError: A full page contained no new rows, so paging
+                cannot continue without skipping part of the range.
+
+        """
+        # The device filters the start time on its own local time, which is
+        # assumed to be the local time of this client. It only limits what
+        # the device sends, the range itself is enforced on TIMESTAMP_UTC.
+        starttime = start.astimezone().strftime(TIME_FORMAT) if start else None
+        last_seen = -1
+        returned = 0
+        while limit is None or returned < limit:
+            params: dict[str, Any] = {
+                "json": "object",
+                "limit": page_size,
+                "sort": "asc",
+            }
+            if starttime is not None:
+                params["starttime"] = starttime
+
+            received = new = 0
+            async with aclosing(self._stream(uri, params=params)) as rows:
+                async for row in rows:
+                    received += 1
+                    # The start time is inclusive, skip rows of the previous page
+                    if row["TIMESTAMP_UTC"] <= last_seen:
+                        continue
+                    new += 1
+                    last_seen = row["TIMESTAMP_UTC"]
+                    starttime = row["TIMESTAMP_lOCAL"]
+                    if start is not None and last_seen < start.timestamp():
+                        continue
+                    if end is not None and last_seen > end.timestamp():
+                        return
+                    returned += 1
+                    yield row
+                    if limit is not None and returned >= limit:
+                        return
+
+            if received < page_size:
+                return
+            if new == 0:
+                msg = (
+                    f"More than {page_size} rows of the P1 Monitor history share "
+                    f"the same local time, increase the page size to continue"
+                )
+                raise P1MonitorError(msg, {"starttime": starttime})
 
     async def smartmeter(self) -> SmartMeter:
         """Get the latest values from you smart meter.
@@ -117,7 +491,77 @@ class P1Monitor:
             "v1/smartmeter",
             params={"json": "object", "limit": 1},
         )
-        return SmartMeter.from_dict(data)
+        return self._parse("v1/smartmeter", data, SmartMeter.from_dict)
+
+    async def smartmeter_history(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[SmartMeter]:
+        """Get the historical values from your smart meter, oldest first.
+
+        The history is requested in pages and every page is decoded while it
+        is being received, so large ranges never sit in memory all at once.
+
+        Args:
+        ----
+            start: Only return readings from this moment on.
+            end: Only return readings up to and including this moment.
+            limit: Maximum number of readings to return.
+            page_size: Number of readings to request from the device per page.
+
+        Yields:
+        ------
+            A SmartMeter data object for each reading in the range.
+
+        """
+        async for row in self._history(
+            "v1/smartmeter",
+            start=start,
+            end=end,
+            limit=limit,
+            page_size=page_size,
+        ):
+            yield SmartMeter.from_row(row)
+
+    async def smartmeter_series(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        page_size: int = 1000,
+    ) -> SmartMeterSeries:
+        """Get the historical values from your smart meter as a columnar series.
+
+        Args:
+        ----
+            start: Only return readings from this moment on.
+            end: Only return readings up to and including this moment.
+            limit: Maximum number of readings to return.
+            page_size: Number of readings to request from the device per page.
+
+        Returns:
+        -------
+            A SmartMeterSeries with the readings in the range, oldest first.
+
+        """
+        # The series load NumPy, which only the series methods need
+        from .series import SmartMeterSeries  # noqa: PLC0415
+
+        series = SmartMeterSeries()
+        async for row in self._history(
+            "v1/smartmeter",
+            start=start,
+            end=end,
+            limit=limit,
+            page_size=page_size,
+        ):
+            series.append(row)
+        return series
 
     async def settings(self) -> Settings:
         """Receive the set price values for energy and gas.
@@ -128,7 +572,7 @@ class P1Monitor:
 
         """
         data = await self._request("v1/configuration", params={"json": "object"})
-        return Settings.from_dict(data)
+        return self._parse("v1/configuration", data, Settings.from_dict)
 
     async def phases(self) -> Phases:
         """Receive data from all phases on your smart meter.
@@ -139,7 +583,42 @@ class P1Monitor:
 
         """
         data = await self._request("v1/status", params={"json": "object"})
-        return Phases.from_dict(data)
+        return self._parse("v1/status", data, Phases.from_dict)
+
+    async def phases_series(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        page_size: int = 1000,
+    ) -> PhaseSeries:
+        """Get the historical voltage, current and power per phase as a series.
+
+        Args:
+        ----
+            start: Only return readings from this moment on.
+            end: Only return readings up to and including this moment.
+            limit: Maximum number of readings to return.
+            page_size: Number of readings to request from the device per page.
+
+        Returns:
+        -------
+            A PhaseSeries with the readings in the range, oldest first.
+
+        """
+        from .series import PhaseSeries  # noqa: PLC0415
+
+        series = PhaseSeries()
+        async for row in self._history(
+            "v1/phase",
+            start=start,
+            end=end,
+            limit=limit,
+            page_size=page_size,
+        ):
+            series.append(row)
+        return series
 
     async def watermeter(self) -> WaterMeter:
         """Get the latest values from you water meter.
@@ -160,7 +639,195 @@ class P1Monitor:
         if data == []:
             msg = "No data received from P1 Monitor"
             raise P1MonitorNoDataError(msg)
-        return WaterMeter.from_dict(data)
+        return self._parse("v2/watermeter/day", data, WaterMeter.from_dict)
+
+    async def watermeter_history(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        page_size: int = 1000,
+    ) -> AsyncIterator[WaterMeter]:
+        """Get the daily values from your water meter, oldest first.
+
+        Args:
+        ----
+            start: Only return days from this moment on.
+            end: Only return days up to and including this moment.
+            limit: Maximum number of days to return.
+            page_size: Number of days to request from the device per page.
+
+        Yields:
+        ------
+            A WaterMeter data object for each day in the range.
+
+        """
+        async for row in self._history(
+            "v2/watermeter/day",
+            start=start,
+            end=end,
+            limit=limit,
+            page_size=page_size,
+        ):
+            yield WaterMeter.from_row(row)
+
+    async def watermeter_series(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int | None = None,
+        page_size: int = 1000,
+    ) -> WaterMeterSeries:
+        """Get the daily values from your water meter as a columnar series.
+
+        Args:
+        ----
+            start: Only return days from this moment on.
+            end: Only return days up to and including this moment.
+            limit: Maximum number of days to return.
+            page_size: Number of days to request from the device per page.
+
+        Returns:
+        -------
+            A WaterMeterSeries with the days in the range, oldest first.
+
+        """
+        from .series import WaterMeterSeries  # noqa: PLC0415
+
+        series = WaterMeterSeries()
+        async for row in self._history(
+            "v2/watermeter/day",
+            start=start,
+            end=end,
+            limit=limit,
+            page_size=page_size,
+        ):
+            series.append(row)
+        return series
+
+    async def snapshot(self) -> Snapshot:
+        """Get the smart meter, phases, water meter and settings at once.
+
+        The four requests are sent concurrently. When one of them fails, the
+        error is reported in the result instead of aborting the others.
+
+        Returns
+        -------
+            A Snapshot data object with the responses from the P1 Monitor API.
+
+        """
+        results = await asyncio.gather(
+            *(getattr(self, name)() for name in SNAPSHOT_ENDPOINTS),
+            return_exceptions=True,
+        )
+        return Snapshot.from_results(results)
+
+    async def raw(self, endpoint: str) -> bytes:
+        """Get the latest values of an endpoint without decoding them.
+
+        For decoding elsewhere, for example in the worker processes of the
+        P1MonitorCollector. The cache and change detection are not used.
+
+        Args:
+        ----
+            endpoint: The P1Monitor method the values are for, one of
+                'smartmeter', 'phases', 'watermeter' or 'settings'.
+
+        Returns:
+        -------
+            The JSON response body from the P1 Monitor API.
+
+        Raises:
+        ------
+            ValueError: The endpoint is not supported.
+
+        """
+        if endpoint not in LATEST_REQUESTS:
+            msg = f"Unknown endpoint: {endpoint}, expected one of {[*LATEST_REQUESTS]}"
+            raise ValueError(msg)
+        uri, params = LATEST_REQUESTS[endpoint]
+        response = await self._send_adaptive(uri, params=params)
+        with self._measure(uri, "body"):
+            return await response.read()
+
+    async def stream(
+        self,
+        interval: float = 1.0,
+        endpoints: Sequence[str] = STREAM_ENDPOINTS,
+    ) -> AsyncGenerator[SmartMeter | Phases]:
+        """Stream the smart meter and phase values as they change.
+
+        Every endpoint is requested at a fixed interval in its own task, over
+        the kept alive connections of the session, independent of how fast
+        the readings are consumed. Unchanged responses are not yielded. When
+        the consumer falls behind, only the latest value of every endpoint
+        is kept, older values are dropped instead of buffered.
+
+        Args:
+        ----
+            interval: Seconds between two requests of an endpoint, 1 second
+                matches the telegram rate of a DSMR 5 meter.
+            endpoints: The methods to stream, 'smartmeter' and 'phases'.
+
+        Yields:
+        ------
+            A SmartMeter or Phases data object for every change.
+
+        Raises:
+        ------
+            ValueError: An unknown endpoint is requested.
+
+        """
+        for endpoint in endpoints:
+            if endpoint not in STREAM_ENDPOINTS:
+                msg = (
+                    f"Unknown endpoint: {endpoint}, expected one of {STREAM_ENDPOINTS}"
+                )
+                raise ValueError(msg)
+
+        latest: dict[str, SmartMeter | Phases] = {}
+        ready = asyncio.Event()
+
+        async def produce(endpoint: str) -> None:
+            method = getattr(self, endpoint)
+            loop = asyncio.get_running_loop()
+            previous = None
+            tick = loop.time()
+            while True:
+                model = await method()
+                if model != previous:
+                    # Overwrites a value the consumer did not take yet
+                    latest[endpoint] = previous = model
+                    ready.set()
+                tick += interval
+                delay = tick - loop.time()
+                if delay < 0:
+                    # Requests take longer than the interval, do not catch up
+                    tick -= delay
+                await asyncio.sleep(max(delay, 0))
+
+        tasks = [asyncio.create_task(produce(endpoint)) for endpoint in endpoints]
+        try:
+            while True:
+                waiter = asyncio.ensure_future(ready.wait())
+                await asyncio.wait(
+                    {waiter, *tasks}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not waiter.done():
+                    waiter.cancel()
+                    # Only reached when a request failed
+                    next(task for task in tasks if task.done()).result()
+                ready.clear()
+                models = list(latest.values())
+                latest.clear()
+                for model in models:
+                    yield model
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     async def close(self) -> None:
         """Close open client session."""
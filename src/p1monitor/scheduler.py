@@ -0,0 +1,178 @@
+"""Polling scheduler for P1 Monitor."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import math
+import random
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import P1MonitorConnectionError, P1MonitorError
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+    from .p1monitor import P1Monitor
+
+DEFAULT_INTERVALS: dict[str, float] = {
+    "smartmeter": 5.0,
+    "phases": 5.0,
+    "watermeter": 60.0,
+    "settings": 3600.0,
+}
+
+
+@dataclass(slots=True)
+class PollResult:
+    """Object representing the outcome of a single poll of an endpoint."""
+
+    endpoint: str
+
+    data: Any = None
+    error: P1MonitorError | None = None
+    skipped: int = 0
+
+
+@dataclass
+class P1MonitorScheduler:
+    """Class for polling the endpoints of a P1 Monitor at their own interval."""
+
+    client: P1Monitor
+    intervals: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_INTERVALS))
+    jitter: float = 0.1
+    backoff_max: float = 300.0
+    callback: Callable[[PollResult], Awaitable[None] | None] | None = None
+    queue_size: int = 100
+
+    async def run(self) -> None:
+        """Poll the endpoints until cancelled, passing every result to the callback.
+
+        Raises
+        ------
+            ValueError: No callback is set.
+
+        """
+        if self.callback is None:
+            msg = "A callback is required to run the scheduler"
+            raise ValueError(msg)
+        await self._run(self._emit)
+
+    async def results(self) -> AsyncIterator[PollResult]:
+        """Poll the endpoints and return the results as they come in.
+
+        The endpoints are polled as long as the iterator is consumed. When the
+        consumer falls behind and the queue is full, ticks are skipped instead
+        of requests piling up.
+
+        Yields
+        ------
+            A PollResult for every poll of an endpoint.
+
+        """
+        queue: asyncio.Queue[PollResult] = asyncio.Queue(self.queue_size)
+
+        async def emit(result: PollResult) -> None:
+            await self._emit(result)
+            await queue.put(result)
+
+        task = asyncio.create_task(self._run(emit))
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    # Only reached when polling stopped with an exception
+                    task.result()
+                yield getter.result()
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self, emit: Callable[[PollResult], Awaitable[None]]) -> None:
+        """Poll every endpoint in its own task.
+
+        Args:
+        ----
+            emit: Coroutine function receiving every result.
+
+        """
+        async with asyncio.TaskGroup() as group:
+            for endpoint, interval in self.intervals.items():
+                group.create_task(self._poll(endpoint, interval, emit))
+
+    async def _poll(
+        self,
+        endpoint: str,
+        interval: float,
+        emit: Callable[[PollResult], Awaitable[None]],
+    ) -> None:
+        """Poll a single endpoint forever.
+
+        Args:
+        ----
+            endpoint: The P1Monitor method to call, for example 'smartmeter'.
+            interval: Seconds between two polls.
+            emit: Coroutine function receiving every result.
+
+        """
+        loop = asyncio.get_running_loop()
+        failures = 0
+        skipped = 0
+        # Spread the first polls, so a fleet does not start in lockstep
+        next_run = loop.time() + random.uniform(0, interval * self.jitter)  # noqa: S311
+        while True:
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+            started = loop.time()
+            result = PollResult(endpoint, skipped=skipped)
+            try:
+                result.data = await getattr(self.client, endpoint)()
+            except P1MonitorError as exception:
+                result.error = exception
+            await emit(result)
+
+            if isinstance(result.error, P1MonitorConnectionError):
+                failures += 1
+                next_run = loop.time() + self.backoff(interval, failures)
+                skipped = 0
+                continue
+
+            failures = 0
+            # Skip the ticks that passed while the device was slow to answer
+            behind = loop.time() - (started + interval)
+            skipped = max(0, math.ceil(behind / interval)) if interval else 0
+            next_run = started + interval * (1 + skipped)
+            next_run += random.uniform(0, interval * self.jitter)  # noqa: S311
+
+    def backoff(self, interval: float, failures: int) -> float:
+        """Return the delay before the next poll after failed connections.
+
+        Args:
+        ----
+            interval: The regular interval of the endpoint.
+            failures: The number of failed connections in a row.
+
+        Returns:
+        -------
+            The exponentially increasing delay, with jitter, at most
+            backoff_max seconds.
+
+        """
+        delay = min(self.backoff_max, interval * 2.0**failures)
+        return delay * random.uniform(1 - self.jitter, 1)  # noqa: S311
+
+    async def _emit(self, result: PollResult) -> None:
+        """Pass a result to the callback, when there is one.
+
+        Args:
+        ----
+            result: The outcome of a poll.
+
+        """
+        if self.callback is None:
+            return
+        outcome = self.callback(result)
+        if inspect.isawaitable(outcome):
+            await outcome
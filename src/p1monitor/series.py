@@ -0,0 +1,348 @@
+"""Columnar time series for multi-row P1 Monitor responses."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any, ClassVar, Self
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+AGGREGATIONS = ("first", "last", "sum", "mean", "min", "max")
+
+
+class TimeSeries:
+    """Columnar series of readings, with one compact typed array per field.
+
+    Timestamps are stored as UTC epoch seconds and values as floats, where
+    a missing value is stored as NaN. The calculations use NumPy when it is
+    installed and fall back to plain Python loops otherwise.
+    """
+
+    FIELDS: ClassVar[dict[str, str]] = {}
+
+    __slots__ = ("columns", "timestamps")
+
+    def __init__(
+        self,
+        timestamps: array[int] | None = None,
+        columns: dict[str, array[float]] | None = None,
+    ) -> None:
+        """Initialize a series, empty when no arrays are provided.
+
+        Args:
+        ----
+            timestamps: The UTC epoch timestamps of the readings.
+            columns: The values of the readings, per field name.
+
+        """
+        self.timestamps = timestamps if timestamps is not None else array("q")
+        self.columns = columns or {name: array("d") for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Iterable[dict[str, Any]]) -> Self:
+        """Return a series from a multi-row P1 Monitor API response.
+
+        Args:
+        ----
+            data: The rows of the P1 Monitor API response.
+
+        Returns:
+        -------
+            A series with one entry per row.
+
+        """
+        series = cls()
+        # Resolve the columns once for the whole response, not once per row
+        timestamps = series.timestamps.append
+        columns = [
+            (series.columns[name].append, key) for name, key in cls.FIELDS.items()
+        ]
+        nan = math.nan
+        for row in data:
+            timestamps(row["TIMESTAMP_UTC"])
+            for append, key in columns:
+                value = row.get(key)
+                append(nan if value is None else value)
+        return series
+
+    def append(self, row: dict[str, Any]) -> None:
+        """Append a single row of the P1 Monitor API response.
+
+        Args:
+        ----
+            row: A single reading from the P1 Monitor API response.
+
+        """
+        self.timestamps.append(row["TIMESTAMP_UTC"])
+        for name, key in self.FIELDS.items():
+            value = row.get(key)
+            self.columns[name].append(math.nan if value is None else value)
+
+    def __len__(self) -> int:
+        """Return the number of readings in the series."""
+        return len(self.timestamps)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the field names of the series."""
+        return iter(self.columns)
+
+    def __getitem__(self, name: str) -> Any:
+        """Return the values of a field.
+
+        Args:
+        ----
+            name: The field name, for example 'power_consumption'.
+
+        Returns:
+        -------
+            A copy of the values, as a NumPy array when NumPy is installed.
+
+        """
+        if np is None:
+            return array("d", self.columns[name])
+        return self._view(name).copy()
+
+    def _view(self, name: str) -> Any:
+        """Return a NumPy view on the values of a field, without copying.
+
+        The view blocks appending to the series as long as it exists, so it
+        must not outlive the calculation it is used for.
+
+        Args:
+        ----
+            name: The field name.
+
+        Returns:
+        -------
+            A read-only NumPy array sharing memory with the series.
+
+        """
+        view = np.frombuffer(self.columns[name], dtype=np.float64)
+        view.flags.writeable = False
+        return view
+
+    def sum(self, name: str) -> float:
+        """Return the sum of a field, ignoring missing values.
+
+        Args:
+        ----
+            name: The field name.
+
+        Returns:
+        -------
+            The sum of all values.
+
+        """
+        if np is not None:
+            return float(np.nansum(self._view(name)))
+        return _aggregate(list(self.columns[name]), "sum")
+
+    def mean(self, name: str) -> float:
+        """Return the mean of a field, ignoring missing values.
+
+        Args:
+        ----
+            name: The field name.
+
+        Returns:
+        -------
+            The mean of all values, NaN when there are none.
+
+        """
+        if np is not None:
+            values = self._view(name)
+            if np.isnan(values).all():
+                return math.nan
+            return float(np.nanmean(values))
+        return _aggregate(list(self.columns[name]), "mean")
+
+    def diff(self, name: str) -> Any:
+        """Return the difference between consecutive values of a field.
+
+        Args:
+        ----
+            name: The field name, for example 'energy_consumption_high'.
+
+        Returns:
+        -------
+            The differences, one shorter than the series.
+
+        """
+        if np is not None:
+            return np.diff(self._view(name))
+        values = self.columns[name]
+        return array("d", (b - a for a, b in pairwise(values)))
+
+    def resample(self, seconds: int, how: str = "last", offset: int = 0) -> Self:
+        """Return a series with the readings grouped into fixed time buckets.
+
+        The readings are expected in chronological order, as returned by the
+        history methods of the P1Monitor class. Buckets are aligned to UTC,
+        so daily buckets start at midnight UTC unless an offset is given.
+
+        Args:
+        ----
+            seconds: The length of a bucket, for example 3600 for hourly.
+            how: How the values in a bucket are combined, one of
+                'first', 'last', 'sum', 'mean', 'min' or 'max'.
+            offset: UTC offset in seconds the buckets are aligned to, for
+                example 3600 to have daily buckets start at midnight CET.
+                This is a fixed offset, it does not follow daylight saving.
+
+        Returns:
+        -------
+            A series with one entry per bucket, timestamped at the bucket start.
+
+        Raises:
+        ------
+            ValueError: An unknown aggregation is requested.
+
+        """
+        if how not in AGGREGATIONS:
+            msg = f"Unknown aggregation: {how}, expected one of {AGGREGATIONS}"
+            raise ValueError(msg)
+        if not self.timestamps:
+            return type(self)()
+        if np is not None:
+            return self._resample_numpy(seconds, how, offset)
+
+        starts = array("q")
+        groups: list[list[int]] = []
+        for i, timestamp in enumerate(self.timestamps):
+            bucket = timestamp - (timestamp + offset) % seconds
+            if not starts or starts[-1] != bucket:
+                starts.append(bucket)
+                groups.append([])
+            groups[-1].append(i)
+
+        columns = {}
+        for name, values in self.columns.items():
+            columns[name] = array(
+                "d",
+                (_aggregate([values[i] for i in group], how) for group in groups),
+            )
+        return type(self)(starts, columns)
+
+    def _resample_numpy(self, seconds: int, how: str, offset: int) -> Self:
+        """Resample the series with vectorized NumPy kernels.
+
+        Args:
+        ----
+            seconds: The length of a bucket.
+            how: How the values in a bucket are combined.
+            offset: UTC offset in seconds the buckets are aligned to.
+
+        Returns:
+        -------
+            A series with one entry per bucket.
+
+        """
+        timestamps = np.frombuffer(self.timestamps, dtype=np.int64)
+        buckets = timestamps - (timestamps + offset) % seconds
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)]
+
+        columns = {}
+        for name in self.columns:
+            values = self._view(name)
+            if how == "first":
+                result = values[starts]
+            elif how == "last":
+                result = values[ends - 1]
+            elif how == "min":
+                result = np.fmin.reduceat(values, starts)
+            elif how == "max":
+                result = np.fmax.reduceat(values, starts)
+            else:
+                missing = np.isnan(values)
+                result = np.add.reduceat(np.where(missing, 0.0, values), starts)
+                if how == "mean":
+                    counts = np.add.reduceat((~missing).astype(np.int64), starts)
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        result = np.where(counts > 0, result / counts, np.nan)
+            columns[name] = array("d", result.astype(np.float64).tobytes())
+        return type(self)(array("q", buckets[starts].tobytes()), columns)
+
+
+def _aggregate(values: list[float], how: str) -> float:
+    """Combine the values of a single bucket, ignoring missing values.
+
+    Args:
+    ----
+        values: The values in the bucket.
+        how: How the values are combined.
+
+    Returns:
+    -------
+        The combined value, NaN when there are no values.
+
+    """
+    if how == "first":
+        return values[0]
+    if how == "last":
+        return values[-1]
+    present = [value for value in values if not math.isnan(value)]
+    if how == "sum":
+        return math.fsum(present)
+    if not present:
+        return math.nan
+    if how == "mean":
+        return math.fsum(present) / len(present)
+    return min(present) if how == "min" else max(present)
+
+
+class SmartMeterSeries(TimeSeries):
+    """Columnar series of SmartMeter readings from P1 Monitor."""
+
+    FIELDS: ClassVar[dict[str, str]] = {
+        "gas_consumption": "CONSUMPTION_GAS_M3",
+        "power_consumption": "CONSUMPTION_W",
+        "energy_consumption_high": "CONSUMPTION_KWH_HIGH",
+        "energy_consumption_low": "CONSUMPTION_KWH_LOW",
+        "power_production": "PRODUCTION_W",
+        "energy_production_high": "PRODUCTION_KWH_HIGH",
+        "energy_production_low": "PRODUCTION_KWH_LOW",
+    }
+
+    __slots__ = ()
+
+
+class WaterMeterSeries(TimeSeries):
+    """Columnar series of WaterMeter readings from P1 Monitor."""
+
+    FIELDS: ClassVar[dict[str, str]] = {
+        "consumption_day": "WATERMETER_CONSUMPTION_LITER",
+        "consumption_total": "WATERMETER_CONSUMPTION_TOTAL_M3",
+        "pulse_count": "WATERMETER_PULS_COUNT",
+    }
+
+    __slots__ = ()
+
+
+class PhaseSeries(TimeSeries):
+    """Columnar series of per-phase readings from P1 Monitor."""
+
+    FIELDS: ClassVar[dict[str, str]] = {
+        "voltage_phase_l1": "L1_V",
+        "voltage_phase_l2": "L2_V",
+        "voltage_phase_l3": "L3_V",
+        "current_phase_l1": "L1_A",
+        "current_phase_l2": "L2_A",
+        "current_phase_l3": "L3_A",
+        "power_consumed_phase_l1": "CONSUMPTION_L1_W",
+        "power_consumed_phase_l2": "CONSUMPTION_L2_W",
+        "power_consumed_phase_l3": "CONSUMPTION_L3_W",
+        "power_produced_phase_l1": "PRODUCTION_L1_W",
+        "power_produced_phase_l2": "PRODUCTION_L2_W",
+        "power_produced_phase_l3": "PRODUCTION_L3_W",
+    }
+
+    __slots__ = ()
@@ -0,0 +1,446 @@
+"""Local P1 Monitor simulator for load and integration tests."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import socket
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import time
+from typing import TYPE_CHECKING, Any, Self
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Seconds between the readings a device records, like a P1 Monitor does
+RECORD_INTERVAL = 10
+
+PHASE_LABELS = {
+    74: "Huidige KW verbruik L1 (21.7.0)",
+    75: "Huidige KW verbruik L2 (41.7.0)",
+    76: "Huidige KW verbruik L3 (61.7.0)",
+    77: "Huidige KW levering L1 (22.7.0)",
+    78: "Huidige KW levering L2 (42.7.0)",
+    79: "Huidige KW levering L3 (62.7.0)",
+    100: "Huidige Amperage L1 (31.7.0)",
+    101: "Huidige Amperage L2 (51.7.0)",
+    102: "Huidige Amperage L3 (71.7.0)",
+    103: "Huidige Voltage L1 (32.7.0)",
+    104: "Huidige Voltage L2 (52.7.0)",
+    105: "Huidige Voltage L3 (72.7.0)",
+}
+
+PRICES = {
+    1: ("Verbruik tarief elektriciteit dal/nacht in euro.", "0.22311"),
+    2: ("Verbruik tarief elektriciteit piek/dag in euro.", "0.24388"),
+    3: ("Geleverd tarief elektriciteit dal/nacht in euro.", "0.22311"),
+    4: ("Geleverd tarief elektriciteit piek/dag in euro.", "0.24388"),
+    15: ("Verbruik tarief gas in euro.", "0.86687"),
+}
+
+
+class SimulatedDevice:
+    """Evolving meter readings of a single simulated P1 Monitor.
+
+    Power consumption follows a random walk around a base load, solar
+    production follows the sun, and the energy, gas and water counters
+    integrate them. A reading is recorded every RECORD_INTERVAL seconds of
+    wall clock time, computed when the device is asked for data.
+    """
+
+    __slots__ = (
+        "consumption",
+        "counters",
+        "days",
+        "gas",
+        "gas_rate",
+        "history",
+        "phases",
+        "power",
+        "production",
+        "random",
+        "readings",
+        "requests",
+        "solar",
+        "timestamp",
+        "water_day",
+        "water_total",
+        "watermeter",
+    )
+
+    def __init__(
+        self,
+        rng: random.Random,
+        now: float,
+        history: int = 60,
+        *,
+        watermeter: bool = True,
+    ) -> None:
+        """Initialize a device and record its history up to now.
+
+        Args:
+        ----
+            rng: The random generator of the device.
+            now: The current UTC epoch time.
+            history: The number of recorded readings the device keeps.
+            watermeter: Whether a water meter is connected.
+
+        """
+        self.random = rng
+        self.watermeter = watermeter
+        self.requests = 0
+        self.history = max(history, 1)
+        self.power = rng.uniform(200, 800)
+        self.consumption = self.power
+        self.production = 0.0
+        self.solar = rng.choice((0.0, 2500.0, 4000.0))
+        self.phases = rng.choice((1, 3))
+        self.gas_rate = rng.uniform(0.05, 0.3)
+        # Consumption high, low and production high, low in kWh
+        self.counters = [rng.uniform(1000, 9000) for _ in range(4)]
+        self.gas = rng.uniform(1000, 5000)
+        self.water_total = rng.uniform(100, 2000)
+        self.water_day = 0.0
+        self.readings: deque[tuple[Any, ...]] = deque(maxlen=self.history)
+        self.days: deque[tuple[int, float, float]] = deque(maxlen=31)
+        self.timestamp = int(now) - int(now) % RECORD_INTERVAL
+        self.timestamp -= self.history * RECORD_INTERVAL
+        self.advance(now)
+
+    def advance(self, now: float) -> None:
+        """Record the readings up to now.
+
+        Args:
+        ----
+            now: The current UTC epoch time.
+
+        """
+        steps = int(now - self.timestamp) // RECORD_INTERVAL
+        if steps <= 0:
+            return
+        # After a long idle time, only the readings that are kept are recorded
+        skipped = steps - self.history
+        if skipped > 0:
+            self._step(skipped * RECORD_INTERVAL, record=False)
+            steps -= skipped
+        for _ in range(steps):
+            self._step(RECORD_INTERVAL)
+
+    def _step(self, seconds: int, *, record: bool = True) -> None:
+        """Move the meters forward in time.
+
+        Args:
+        ----
+            seconds: The time to move forward.
+            record: Whether to record a reading at the new time.
+
+        """
+        rng = self.random
+        self.timestamp += seconds
+        local = datetime.fromtimestamp(self.timestamp)  # noqa: DTZ006
+
+        self.power = min(8000.0, max(100.0, self.power + rng.gauss(0, 150)))
+        sun = max(0.0, math.sin(math.pi * (local.hour + local.minute / 60 - 6) / 12))
+        self.production = self.solar * sun * rng.uniform(0.8, 1.0)
+        net = self.power - self.production
+        self.consumption = max(0.0, net)
+        high = 7 <= local.hour < 23 and local.weekday() < 5
+        tariff = 0 if high else 1
+        self.counters[tariff] += self.consumption * seconds / 3_600_000
+        self.counters[tariff + 2] += max(0.0, -net) * seconds / 3_600_000
+        self.gas += self.gas_rate * seconds / 3600 * rng.uniform(0, 2)
+
+        midnight = int(local.replace(hour=0, minute=0, second=0).timestamp())
+        if not self.days or self.days[-1][0] != midnight:
+            self.days.append((midnight, 0.0, self.water_total))
+        if rng.random() < seconds / 600:
+            liters = float(rng.randint(1, 40))
+            self.water_total += liters / 1000
+            day, used, _ = self.days[-1]
+            self.days[-1] = (day, used + liters, self.water_total)
+
+        if record:
+            self.readings.append(
+                (
+                    self.timestamp,
+                    local.strftime(TIME_FORMAT),
+                    "P" if high else "D",
+                    round(self.consumption),
+                    round(max(0.0, -net)),
+                    *(round(counter, 3) for counter in self.counters),
+                    round(self.gas, 3),
+                )
+            )
+
+    def smartmeter(self) -> list[dict[str, Any]]:
+        """Return the recorded readings as v1/smartmeter rows, oldest first."""
+        return [
+            {
+                "CONSUMPTION_GAS_M3": gas,
+                "CONSUMPTION_KWH_HIGH": high,
+                "CONSUMPTION_KWH_LOW": low,
+                "CONSUMPTION_W": consumption,
+                "PRODUCTION_KWH_HIGH": production_high,
+                "PRODUCTION_KWH_LOW": production_low,
+                "PRODUCTION_W": production,
+                "RECORD_IS_PROCESSED": 0,
+                "TARIFCODE": tariff,
+                "TIMESTAMP_UTC": timestamp,
+                "TIMESTAMP_lOCAL": local,
+            }
+            for (
+                timestamp,
+                local,
+                tariff,
+                consumption,
+                production,
+                high,
+                low,
+                production_high,
+                production_low,
+                gas,
+            ) in self.readings
+        ]
+
+    def status(self) -> list[dict[str, Any]]:
+        """Return the current phase values as v1/status rows."""
+        values: dict[int, float] = dict.fromkeys(PHASE_LABELS, 0.0)
+        for phase in range(self.phases):
+            voltage = round(self.random.gauss(230, 2), 1)
+            consumption = self.consumption / self.phases / 1000
+            production = self.production / self.phases / 1000
+            values[74 + phase] = round(consumption, 3)
+            values[77 + phase] = round(production, 3)
+            values[100 + phase] = float(
+                round(max(consumption, production) * 1000 / voltage)
+            )
+            values[103 + phase] = voltage
+        return [
+            {
+                "LABEL": label,
+                "SECURITY": 0,
+                "STATUS": str(values[key]),
+                "STATUS_ID": key,
+            }
+            for key, label in PHASE_LABELS.items()
+        ]
+
+    def watermeter_days(self) -> list[dict[str, Any]]:
+        """Return the water usage per day as v2/watermeter/day rows, oldest first."""
+        return [
+            {
+                "TIMEPERIOD_ID": 13,
+                "TIMESTAMP_UTC": day,
+                "TIMESTAMP_lOCAL": datetime.fromtimestamp(day).strftime(  # noqa: DTZ006
+                    TIME_FORMAT
+                ),
+                "WATERMETER_CONSUMPTION_LITER": used,
+                "WATERMETER_CONSUMPTION_TOTAL_M3": round(total, 3),
+                "WATERMETER_PULS_COUNT": used,
+            }
+            for day, used, total in self.days
+        ]
+
+
+@dataclass
+class P1MonitorSimulator:
+    """Local aiohttp server emulating many P1 Monitor devices.
+
+    Every device listens on its own ephemeral port of the same host and
+    serves /api/v1/smartmeter, /api/v1/status, /api/v1/configuration and
+    /api/v2/watermeter/day with evolving readings.
+    """
+
+    devices: int = 1
+    host: str = "127.0.0.1"
+    latency: float = 0.0
+    error_rate: float = 0.0
+    watermeter: float = 1.0
+    history: int = 60
+    seed: int | None = None
+    clock: Callable[[], float] = time
+
+    _runner: web.AppRunner | None = None
+    _devices: dict[int, SimulatedDevice] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Prepare the random generator of the latency and errors."""
+        self._random = random.Random(self.seed)  # noqa: S311
+
+    @property
+    def hosts(self) -> list[tuple[str, int]]:
+        """Return the host and port of every device."""
+        return [(self.host, port) for port in self._devices]
+
+    def device(self, port: int) -> SimulatedDevice:
+        """Return the simulated device listening on a port.
+
+        Args:
+        ----
+            port: The port of the device.
+
+        Returns:
+        -------
+            The simulated device.
+
+        """
+        return self._devices[port]
+
+    async def start(self) -> None:
+        """Start the server and listen on a port for every device."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/v1/smartmeter", self._smartmeter)
+        app.router.add_get("/api/v1/status", self._status)
+        app.router.add_get("/api/v1/configuration", self._configuration)
+        app.router.add_get("/api/v2/watermeter/day", self._watermeter)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        now = self.clock()
+        for index in range(self.devices):
+            sock = socket.create_server((self.host, 0), family=family)
+            await web.SockSite(self._runner, sock).start()
+            rng = random.Random(None if self.seed is None else self.seed + index)  # noqa: S311
+            self._devices[sock.getsockname()[1]] = SimulatedDevice(
+                rng,
+                now,
+                self.history,
+                watermeter=rng.random() < self.watermeter,
+            )
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self._devices.clear()
+
+    async def __aenter__(self) -> Self:
+        """Async enter.
+
+        Returns
+        -------
+            The started simulator.
+
+        """
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        await self.close()
+
+    @web.middleware
+    async def _middleware(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        """Add latency and errors, and bring the device up to date.
+
+        Args:
+        ----
+            request: The incoming request.
+            handler: The handler of the endpoint.
+
+        Returns:
+        -------
+            The response of the endpoint.
+
+        Raises:
+        ------
+            HTTPInternalServerError: The request is picked to fail.
+
+        """
+        device = self._device(request)
+        device.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * self._random.uniform(0.5, 1.5))
+        if self._random.random() < self.error_rate:
+            raise web.HTTPInternalServerError
+        device.advance(self.clock())
+        return await handler(request)
+
+    def _device(self, request: web.Request) -> SimulatedDevice:
+        """Return the device a request was sent to, by the port it arrived on.
+
+        Args:
+        ----
+            request: The incoming request.
+
+        Returns:
+        -------
+            The simulated device listening on that port.
+
+        """
+        transport = request.transport
+        port = transport.get_extra_info("sockname")[1] if transport else 0
+        return self._devices[port]
+
+    async def _smartmeter(self, request: web.Request) -> web.Response:
+        """Serve the recorded smart meter readings, newest first by default."""
+        rows = self._device(request).smartmeter()
+        if "starttime" in request.query:
+            starttime = request.query["starttime"]
+            rows = [row for row in rows if row["TIMESTAMP_lOCAL"] >= starttime]
+        return _rows(request, rows)
+
+    async def _status(self, request: web.Request) -> web.Response:
+        """Serve the current phase values."""
+        return web.json_response(self._device(request).status())
+
+    async def _configuration(self, _request: web.Request) -> web.Response:
+        """Serve the configured prices."""
+        return web.json_response(
+            [
+                {"CONFIGURATION_ID": key, "LABEL": label, "PARAMETER": value}
+                for key, (label, value) in PRICES.items()
+            ]
+        )
+
+    async def _watermeter(self, request: web.Request) -> web.Response:
+        """Serve the water usage per day, or 404 without a water meter.
+
+        Raises
+        ------
+            HTTPNotFound: No water meter is connected to the device.
+
+        """
+        device = self._device(request)
+        if not device.watermeter:
+            raise web.HTTPNotFound
+        return _rows(request, device.watermeter_days())
+
+
+def _rows(request: web.Request, rows: list[dict[str, Any]]) -> web.Response:
+    """Return rows sorted and limited like the P1 Monitor API does.
+
+    Args:
+    ----
+        request: The request with the sort and limit options.
+        rows: The rows, oldest first.
+
+    Returns:
+    -------
+        The JSON response.
+
+    """
+    if request.query.get("sort", "desc") != "asc":
+        rows.reverse()
+    if "limit" in request.query:
+        rows = rows[: int(request.query["limit"])]
+    return web.json_response(rows)
@@ -0,0 +1,520 @@
+"""Append-only local storage of P1 Monitor readings."""
+
+from __future__ import annotations
+
+import math
+import mmap
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from collections.abc import AsyncIterable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Self
+
+from .exceptions import P1MonitorError
+from .models import EnergyTariff, Phases, SmartMeter, Snapshot, WaterMeter
+
+MAGIC = b"P1MS"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+UNSAFE = re.compile(r"[^\w.-]")
+
+
+@dataclass(frozen=True, slots=True)
+class Layout:
+    """Record layout of the readings of a single endpoint."""
+
+    model: type
+    fields: tuple[str, ...]
+    integers: frozenset[str] = frozenset()
+
+    @property
+    def record(self) -> struct.Struct:
+        """Return the binary format of a record: a timestamp and the fields."""
+        return struct.Struct(f"<q{len(self.fields)}d")
+
+
+LAYOUTS: dict[str, Layout] = {
+    "smartmeter": Layout(
+        SmartMeter,
+        (
+            "gas_consumption",
+            "energy_tariff_period",
+            "power_consumption",
+            "energy_consumption_high",
+            "energy_consumption_low",
+            "power_production",
+            "energy_production_high",
+            "energy_production_low",
+        ),
+        frozenset({"power_consumption", "power_production"}),
+    ),
+    "phases": Layout(
+        Phases,
+        tuple(
+            f"{quantity}_phase_l{phase}"
+            for quantity in ("voltage", "current", "power_consumed", "power_produced")
+            for phase in (1, 2, 3)
+        ),
+        frozenset(
+            f"{quantity}_phase_l{phase}"
+            for quantity in ("power_consumed", "power_produced")
+            for phase in (1, 2, 3)
+        ),
+    ),
+    "watermeter": Layout(
+        WaterMeter,
+        ("consumption_day", "consumption_total", "pulse_count"),
+        frozenset({"consumption_day", "pulse_count"}),
+    ),
+}
+
+ENDPOINTS = {layout.model: endpoint for endpoint, layout in LAYOUTS.items()}
+
+# The tariff is stored as a number, like every other field
+TARIFFS: dict[str, float] = {EnergyTariff.LOW: 0.0, EnergyTariff.HIGH: 1.0}
+
+
+def _encode(value: Any) -> float:
+    """Return the stored number of a field value.
+
+    Args:
+    ----
+        value: The value of a field of a data object.
+
+    Returns:
+    -------
+        The value as a float, NaN for a missing value.
+
+    """
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        return TARIFFS.get(value, math.nan)
+    return float(value)
+
+
+class _Timestamps:
+    """Read-only sequence of the timestamps in a memory-mapped file."""
+
+    __slots__ = ("stride", "values")
+
+    def __init__(self, values: memoryview, stride: int) -> None:
+        self.values = values
+        self.stride = stride
+
+    def __len__(self) -> int:
+        return len(self.values) // self.stride
+
+    def __getitem__(self, index: int) -> int:
+        return int(self.values[index * self.stride])
+
+
+class ReadingStore:
+    """Store of readings in compact, append-only, memory-mapped files.
+
+    Every host and endpoint gets its own file of fixed-size records, sorted by
+    timestamp. A reading that is not newer than the last stored reading of
+    its file is skipped, so repeated polls of an unchanged reading are stored
+    once. Range queries bisect the memory-mapped timestamps, so they only
+    read the requested part of a file. Only one process should write to a
+    store at a time.
+    """
+
+    __slots__ = ("_files", "_last", "directory")
+
+    def __init__(self, directory: str | Path) -> None:
+        """Initialize the store, creating the directory when needed.
+
+        Args:
+        ----
+            directory: The directory the files are stored in.
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files: dict[tuple[str, str], BinaryIO] = {}
+        self._last: dict[tuple[str, str], int] = {}
+
+    def path(self, host: str, endpoint: str) -> Path:
+        """Return the file of the readings of a host and endpoint.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: One of 'smartmeter', 'phases' or 'watermeter'.
+
+        Returns:
+        -------
+            The path of the file, which may not exist yet.
+
+        """
+        return self.directory / f"{UNSAFE.sub('_', host)}.{endpoint}.p1s"
+
+    def append(self, host: str, data: Any, timestamp: datetime | None = None) -> int:
+        """Store the output of a polling method of P1Monitor.
+
+        Nothing is stored when the data contains something that cannot be
+        stored, so the same data can be appended again after fixing it.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor the data is from.
+            data: A SmartMeter, Phases or WaterMeter object, a Snapshot, or
+                an iterable of them, for example a list of history rows.
+            timestamp: The moment of readings without a timestamp of their
+                own, like Phases. Defaults to now.
+
+        Returns:
+        -------
+            The number of readings that were stored.
+
+        Raises:
+        ------
+            TypeError: The data is not a reading that can be stored.
+
+        """
+        pending: dict[tuple[str, str], bytearray] = {}
+        last: dict[tuple[str, str], int] = {}
+        count = self._pack(host, data, timestamp, pending, last)
+        # A single write per file, also when a whole history is stored
+        for key, records in pending.items():
+            self._files[key].write(records)
+            self._last[key] = last[key]
+        return count
+
+    async def extend(
+        self,
+        host: str,
+        data: AsyncIterable[Any],
+        timestamp: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """Store the output of a history method of P1Monitor while it is received.
+
+        The readings are written every `batch_size` readings, so a long
+        history is never held in memory as a whole.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor the data is from.
+            data: The readings, for example client.smartmeter_history().
+            timestamp: The moment of readings without a timestamp of their
+                own, like Phases. Defaults to now.
+            batch_size: The number of readings written at once.
+
+        Returns:
+        -------
+            The number of readings that were stored.
+
+        Raises:
+        ------
+            TypeError: The data contains a reading that cannot be stored.
+
+        """
+        count = 0
+        batch = []
+        async for item in data:
+            batch.append(item)
+            if len(batch) == batch_size:
+                count += self.append(host, batch, timestamp)
+                batch = []
+        return count + self.append(host, batch, timestamp)
+
+    def _pack(
+        self,
+        host: str,
+        data: Any,
+        timestamp: datetime | None,
+        pending: dict[tuple[str, str], bytearray],
+        last: dict[tuple[str, str], int],
+    ) -> int:
+        """Pack the new readings in the data into records per file.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor the data is from.
+            data: The data to store.
+            timestamp: The moment of readings without a timestamp.
+            pending: The packed records per file, extended in place.
+            last: The timestamp of the last packed record per file, updated
+                in place.
+
+        Returns:
+        -------
+            The number of packed readings.
+
+        Raises:
+        ------
+            TypeError: The data is not a reading that can be stored.
+
+        """
+        if isinstance(data, Snapshot):
+            data = (data.smartmeter, data.phases, data.watermeter)
+        if not isinstance(data, (SmartMeter, Phases, WaterMeter)):
+            if isinstance(data, AsyncIterable):
+                msg = "Cannot append asynchronous iterables, use extend instead"
+                raise TypeError(msg)
+            # Strings and mappings are iterable, but never hold readings
+            if not isinstance(data, Iterable) or isinstance(
+                data, (str, bytes, bytearray, Mapping)
+            ):
+                msg = f"Cannot store {type(data).__name__} objects"
+                raise TypeError(msg)
+            return sum(
+                self._pack(host, item, timestamp, pending, last)
+                for item in data
+                if item is not None
+            )
+
+        endpoint = ENDPOINTS[type(data)]
+        layout = LAYOUTS[endpoint]
+        moment = getattr(data, "timestamp", None) or timestamp or datetime.now(UTC)
+        epoch = int(moment.timestamp())
+
+        key = (host, endpoint)
+        if key not in self._files:
+            self._open(key, layout)
+        if epoch <= last.get(key, self._last[key]):
+            return 0
+        values = [getattr(data, name) for name in layout.fields]
+        records = pending.setdefault(key, bytearray())
+        records += layout.record.pack(epoch, *map(_encode, values))
+        last[key] = epoch
+        return 1
+
+    def query(
+        self,
+        host: str,
+        endpoint: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[Any]:
+        """Return the stored readings of a host within a time range.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: One of 'smartmeter', 'phases' or 'watermeter'.
+            start: Only return readings from this moment on.
+            end: Only return readings up to and including this moment.
+
+        Returns:
+        -------
+            The readings as data objects, oldest first. Phases get no
+            timestamp, use query_timestamps for the matching timestamps.
+
+        """
+        return [
+            self._model(endpoint, epoch, values)
+            for epoch, values in self._records(host, endpoint, start, end)
+        ]
+
+    def query_timestamps(
+        self,
+        host: str,
+        endpoint: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[datetime]:
+        """Return the timestamps of the stored readings within a time range.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: One of 'smartmeter', 'phases' or 'watermeter'.
+            start: Only return readings from this moment on.
+            end: Only return readings up to and including this moment.
+
+        Returns:
+        -------
+            The timestamps, in the order of query.
+
+        """
+        return [
+            datetime.fromtimestamp(epoch, tz=UTC)
+            for epoch, _ in self._records(host, endpoint, start, end)
+        ]
+
+    def _records(
+        self,
+        host: str,
+        endpoint: str,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> list[tuple[int, tuple[float, ...]]]:
+        """Read the raw records of a file within a time range.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            endpoint: The endpoint of the readings.
+            start: The first moment of the range.
+            end: The last moment of the range.
+
+        Returns:
+        -------
+            The timestamp and field values of every record in the range.
+
+        """
+        layout = LAYOUTS[endpoint]
+        path = self.path(host, endpoint)
+        try:
+            with path.open("rb") as file:
+                size = path.stat().st_size
+                if size <= HEADER.size:
+                    return []
+                self._check_header(path, file.read(HEADER.size), layout)
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self._slice(mapped, layout, start, end)
+        except FileNotFoundError:
+            return []
+
+    def _slice(
+        self,
+        mapped: mmap.mmap,
+        layout: Layout,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> list[tuple[int, tuple[float, ...]]]:
+        """Bisect the memory-mapped records on the range and unpack them.
+
+        Args:
+        ----
+            mapped: The memory-mapped file.
+            layout: The record layout of the file.
+            start: The first moment of the range.
+            end: The last moment of the range.
+
+        Returns:
+        -------
+            The timestamp and field values of every record in the range.
+
+        """
+        record = layout.record
+        # A record that was only partly written is left out
+        count = (len(mapped) - HEADER.size) // record.size
+        view = memoryview(mapped)[HEADER.size : HEADER.size + count * record.size]
+        try:
+            timestamps = _Timestamps(view.cast("q"), record.size // 8)
+            first = 0 if start is None else bisect_left(timestamps, start.timestamp())
+            last = count if end is None else bisect_right(timestamps, end.timestamp())
+            return [
+                (values[0], values[1:])
+                for values in record.iter_unpack(
+                    view[first * record.size : last * record.size]
+                )
+            ]
+        finally:
+            view.release()
+
+    def _model(self, endpoint: str, epoch: int, values: Iterable[float]) -> Any:
+        """Build a data object from a stored record.
+
+        Args:
+        ----
+            endpoint: The endpoint of the record.
+            epoch: The timestamp of the record.
+            values: The stored field values.
+
+        Returns:
+        -------
+            The data object of the endpoint.
+
+        """
+        layout = LAYOUTS[endpoint]
+        fields: dict[str, Any] = {}
+        for name, value in zip(layout.fields, values, strict=True):
+            if math.isnan(value):
+                fields[name] = None
+            elif name == "energy_tariff_period":
+                fields[name] = EnergyTariff.HIGH if value else EnergyTariff.LOW
+            else:
+                fields[name] = int(value) if name in layout.integers else value
+        if layout.model is not Phases:
+            fields["timestamp"] = datetime.fromtimestamp(epoch, tz=UTC)
+        return layout.model(**fields)
+
+    def _open(self, key: tuple[str, str], layout: Layout) -> None:
+        """Open the file of a host and endpoint for appending.
+
+        The file is unbuffered, so the appended records are visible to
+        queries right away.
+
+        Args:
+        ----
+            key: The host and endpoint of the file.
+            layout: The record layout of the file.
+
+        """
+        path = self.path(*key)
+        file = path.open("a+b", buffering=0)
+        file.seek(0)
+        header = file.read(HEADER.size)
+        record = layout.record
+        if header:
+            self._check_header(path, header, layout)
+            size = file.seek(0, 2)
+            # Drop a record that was only partly written, for example on a crash
+            complete = HEADER.size + (size - HEADER.size) // record.size * record.size
+            if complete != size:
+                file.truncate(complete)
+            self._last[key] = -(2**63)
+            if complete > HEADER.size:
+                file.seek(complete - record.size)
+                self._last[key] = record.unpack(file.read(record.size))[0]
+        else:
+            file.write(HEADER.pack(MAGIC, VERSION, len(layout.fields)))
+            self._last[key] = -(2**63)
+        self._files[key] = file
+
+    @staticmethod
+    def _check_header(path: Path, header: bytes, layout: Layout) -> None:
+        """Check a file was written with the layout of its endpoint.
+
+        Args:
+        ----
+            path: The path of the file.
+            header: The first bytes of the file.
+            layout: The expected record layout.
+
+        Raises:
+        ------
+            P1MonitorError: The file is not a store file of this layout.
+
+        """
+        if len(header) < HEADER.size or HEADER.unpack(header) != (
+            MAGIC,
+            VERSION,
+            len(layout.fields),
+        ):
+            msg = f"{path} is not a reading store file of this version"
+            raise P1MonitorError(msg)
+
+    def close(self) -> None:
+        """Close the open files."""
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+    def __enter__(self) -> Self:
+        """Enter.
+
+        Returns
+        -------
+            The ReadingStore object.
+
+        """
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Exit.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        self.close()
@@ -0,0 +1,254 @@
+"""Synchronous Python client for the P1 Monitor API."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+
+from .fleet import P1MonitorFleet
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine, Iterable
+
+    from .fleet import FleetResult
+    from .models import Phases, Settings, SmartMeter, WaterMeter
+    from .timeouts import AdaptiveTimeouts
+
+T = TypeVar("T")
+
+
+class SyncP1Monitor:
+    """Blocking client for code without an event loop, like thread pools.
+
+    A background thread runs one event loop with a P1MonitorFleet, so every
+    call shares one connection-pooled session and the limits of the fleet,
+    from whichever thread it is made. Calls from many threads run
+    concurrently on the loop, a thread only waits for its own request.
+    Close the client to stop the thread.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        host: str | None = None,
+        port: int = 80,
+        *,
+        request_timeout: float = 10.0,
+        limit: int = 100,
+        limit_per_host: int = 2,
+        timeouts: AdaptiveTimeouts | None = None,
+    ) -> None:
+        """Initialize the client and start its event loop.
+
+        Args:
+        ----
+            host: The IP address or hostname of the default P1 Monitor.
+            port: The port of the default P1 Monitor, and of hosts without
+                a port.
+            request_timeout: An integer with the request timeout in seconds.
+            limit: Maximum number of requests in flight.
+            limit_per_host: Maximum number of requests in flight per device.
+            timeouts: Adaptive timeouts shared by all devices.
+
+        """
+        self.host = host
+        self.port = port
+        self.fleet = P1MonitorFleet(
+            [],
+            port=port,
+            request_timeout=request_timeout,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            timeouts=timeouts,
+        )
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="p1monitor", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the event loop and wait for its result.
+
+        Args:
+        ----
+            coroutine: The coroutine to run.
+
+        Returns:
+        -------
+            The result of the coroutine.
+
+        Raises:
+        ------
+            RuntimeError: The client is closed.
+
+        """
+        if self._loop.is_closed():
+            coroutine.close()
+            msg = "The client is closed"
+            raise RuntimeError(msg)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _request(self, host: str | None, port: int | None, endpoint: str) -> Any:
+        """Request an endpoint of a single device.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor, defaults to
+                the host of the client.
+            port: The port of the P1 Monitor, defaults to the client port.
+            endpoint: The P1Monitor method to call, for example 'smartmeter'.
+
+        Returns:
+        -------
+            The data object returned by the P1Monitor method.
+
+        Raises:
+        ------
+            ValueError: Neither the client nor the call has a host.
+
+        """
+        host = host or self.host
+        if host is None:
+            msg = "No host given, pass one to the client or to the call"
+            raise ValueError(msg)
+        result = self._run(
+            self.fleet.request(host, self.port if port is None else port, endpoint)
+        )
+        if result.error is not None:
+            raise result.error
+        return result.data
+
+    def smartmeter(
+        self, host: str | None = None, port: int | None = None
+    ) -> SmartMeter:
+        """Get the latest values from your smart meter.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor, defaults to
+                the host of the client.
+            port: The port of the P1 Monitor, defaults to the client port.
+
+        Returns:
+        -------
+            A SmartMeter data object from the P1 Monitor API.
+
+        """
+        data: SmartMeter = self._request(host, port, "smartmeter")
+        return data
+
+    def phases(self, host: str | None = None, port: int | None = None) -> Phases:
+        """Get the latest values from the phases of your smart meter.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor, defaults to
+                the host of the client.
+            port: The port of the P1 Monitor, defaults to the client port.
+
+        Returns:
+        -------
+            A Phases data object from the P1 Monitor API.
+
+        """
+        data: Phases = self._request(host, port, "phases")
+        return data
+
+    def watermeter(
+        self, host: str | None = None, port: int | None = None
+    ) -> WaterMeter:
+        """Get the latest values from your water meter.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor, defaults to
+                the host of the client.
+            port: The port of the P1 Monitor, defaults to the client port.
+
+        Returns:
+        -------
+            A WaterMeter data object from the P1 Monitor API.
+
+        """
+        data: WaterMeter = self._request(host, port, "watermeter")
+        return data
+
+    def settings(self, host: str | None = None, port: int | None = None) -> Settings:
+        """Receive the set price values for energy and gas.
+
+        Args:
+        ----
+            host: The IP address or hostname of the P1 Monitor, defaults to
+                the host of the client.
+            port: The port of the P1 Monitor, defaults to the client port.
+
+        Returns:
+        -------
+            A Settings data object from the P1 Monitor API.
+
+        """
+        data: Settings = self._request(host, port, "settings")
+        return data
+
+    def map_hosts(
+        self,
+        hosts: Iterable[str | tuple[str, int]],
+        endpoint: str = "smartmeter",
+    ) -> list[FleetResult]:
+        """Request an endpoint of many devices at once.
+
+        The requests run concurrently within the limits of the client, the
+        call blocks until every device answered or failed.
+
+        Args:
+        ----
+            hosts: The hosts, or (host, port) pairs, of the P1 Monitors.
+            endpoint: The P1Monitor method to call, for example 'smartmeter'.
+
+        Returns:
+        -------
+            A FleetResult for every device, in the order of `hosts`.
+
+        """
+        devices = [
+            (host, self.port) if isinstance(host, str) else host for host in hosts
+        ]
+
+        async def gather() -> list[FleetResult]:
+            return await asyncio.gather(
+                *(self.fleet.request(host, port, endpoint) for host, port in devices)
+            )
+
+        return self._run(gather())
+
+    def close(self) -> None:
+        """Close the session and stop the event loop."""
+        with self._lock:
+            if self._loop.is_closed():
+                return
+            self._run(self.fleet.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self) -> Self:
+        """Enter.
+
+        Returns
+        -------
+            The SyncP1Monitor object.
+
+        """
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Exit.
+
+        Args:
+        ----
+            _exc_info: Exec type.
+
+        """
+        self.close()
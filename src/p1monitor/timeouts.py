@@ -0,0 +1,210 @@
+"""Adaptive request timeouts and hedged requests for P1 Monitor."""
+
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING
+
+from .instrumentation import BUCKETS, Histogram
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    from aiohttp import ClientResponse
+
+
+class AdaptiveTimeouts:
+    """Request timeouts derived from the latency observed per device.
+
+    Until a device answered `samples` requests, its requests use the
+    `maximum` timeout. After that, the timeout is the p99 latency times the
+    `multiplier`, within `minimum` and `maximum`. A request that times out
+    counts as a measurement of the timeout, so a device that slows down
+    gets a longer timeout again. Every `window` measurements, the weight of
+    the older measurements is halved, so a long healthy history does not
+    keep the timeout short once a device slows down.
+
+    With `hedge`, a second request is sent when the first has not been
+    answered after the p95 latency of the device, and the first answer is
+    used. Only the latest values are requested this way, these requests are
+    idempotent GETs. Share one object between the clients of a fleet.
+    """
+
+    __slots__ = (
+        "bounds",
+        "hedge",
+        "histograms",
+        "maximum",
+        "minimum",
+        "multiplier",
+        "samples",
+        "window",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        multiplier: float = 4.0,
+        minimum: float = 0.5,
+        maximum: float = 10.0,
+        samples: int = 100,
+        window: int = 1000,
+        hedge: bool = False,
+        buckets: Iterable[float] = BUCKETS,
+    ) -> None:
+        """Initialize the timeouts.
+
+        Args:
+        ----
+            multiplier: The timeout as a multiple of the p99 latency.
+            minimum: The shortest timeout in seconds.
+            maximum: The longest timeout in seconds, also used for devices
+                without enough measurements.
+            samples: The number of measurements needed to adapt the timeout.
+            window: The number of measurements after which the older ones
+                count half, at least twice `samples`.
+            hedge: Whether to send a second request after the p95 latency.
+            buckets: The upper bounds of the latency histogram buckets.
+
+        """
+        self.multiplier = multiplier
+        self.minimum = minimum
+        self.maximum = maximum
+        self.samples = samples
+        self.window = max(window, 2 * samples)
+        self.hedge = hedge
+        self.bounds = tuple(buckets)
+        self.histograms: dict[tuple[str, int], Histogram] = {}
+
+    def observe(self, host: str, port: int, seconds: float) -> None:
+        """Record the latency of a request.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            port: The port of the P1 Monitor.
+            seconds: The time until the response headers were received.
+
+        """
+        histogram = self.histograms.get((host, port))
+        if histogram is None:
+            histogram = self.histograms[host, port] = Histogram(self.bounds)
+        histogram.observe(seconds)
+        if histogram.count >= self.window:
+            histogram.decay()
+
+    def timeout(self, host: str, port: int) -> float:
+        """Return the timeout for the next request to a device.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            port: The port of the P1 Monitor.
+
+        Returns:
+        -------
+            The timeout in seconds.
+
+        """
+        histogram = self.histograms.get((host, port))
+        if histogram is None or histogram.count < self.samples:
+            return self.maximum
+        timeout = histogram.quantile(0.99) * self.multiplier
+        return min(self.maximum, max(self.minimum, timeout))
+
+    def hedge_delay(self, host: str, port: int) -> float | None:
+        """Return how long to wait before sending a second request.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            port: The port of the P1 Monitor.
+
+        Returns:
+        -------
+            The p95 latency of the device in seconds, or None when hedging
+            is disabled or there are not enough measurements.
+
+        """
+        histogram = self.histograms.get((host, port))
+        if not self.hedge or histogram is None or histogram.count < self.samples:
+            return None
+        return histogram.quantile(0.95)
+
+    async def send(
+        self,
+        host: str,
+        port: int,
+        request: Callable[[float], Awaitable[ClientResponse]],
+    ) -> ClientResponse:
+        """Send a request with the adaptive timeout, hedged when enabled.
+
+        Args:
+        ----
+            host: The host of the P1 Monitor.
+            port: The port of the P1 Monitor.
+            request: Sends the request with the timeout it is called with.
+
+        Returns:
+        -------
+            The first response that was received.
+
+        Raises:
+        ------
+            P1MonitorConnectionError: Every attempt failed, the error of the
+                last attempt is raised.
+
+        """
+        timeout = self.timeout(host, port)
+        delay = self.hedge_delay(host, port)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            if delay is None or delay >= timeout:
+                response = await request(timeout)
+            else:
+                response = await _hedged(partial(request, timeout), delay)
+        except Exception as exception:
+            if isinstance(exception.__cause__, TimeoutError):
+                self.observe(host, port, timeout)
+            raise
+        self.observe(host, port, loop.time() - started)
+        return response
+
+
+async def _hedged(
+    attempt: Callable[[], Awaitable[ClientResponse]], delay: float
+) -> ClientResponse:
+    """Send a second attempt when the first is not answered within a delay.
+
+    Args:
+    ----
+        attempt: Sends a single attempt.
+        delay: The time to wait for the first attempt.
+
+    Returns:
+    -------
+        The response of the attempt that succeeded first.
+
+    """
+    pending = {asyncio.ensure_future(attempt())}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            pending.add(asyncio.ensure_future(attempt()))
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                # Both attempts may have been answered at the same moment
+                for task in succeeded[1:]:
+                    task.result().release()
+                return succeeded[0].result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,9 +1,56 @@
 """Asynchronous Python client for the P1 Monitor."""
 
+import asyncio
+import json
+import threading
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from aiohttp.web import Request
+from aresponses import Response
+
+from p1monitor.simulator import P1MonitorSimulator
+
 
 def load_fixtures(filename: str) -> str:
     """Load a fixture."""
     path = Path(__file__).parent / "fixtures" / filename
     return path.read_text()
+
+
+def history_handler(fixture: str) -> Callable[[Request], Awaitable[Response]]:
+    """Return a handler serving a history fixture like a P1 Monitor device."""
+    rows = json.loads(load_fixtures(fixture))
+
+    async def handler(request: Request) -> Response:
+        page = rows
+        if "starttime" in request.query:
+            page = [
+                row
+                for row in page
+                if row["TIMESTAMP_lOCAL"] >= request.query["starttime"]
+            ]
+        return Response(
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            text=json.dumps(page[: int(request.query["limit"])]),
+        )
+
+    return handler
+
+
+@contextmanager
+def serve(simulator: P1MonitorSimulator) -> Iterator[P1MonitorSimulator]:
+    """Run a simulator on its own event loop in a background thread."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(simulator.start(), loop).result()
+    try:
+        yield simulator
+    finally:
+        asyncio.run_coroutine_threadsafe(simulator.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,115 @@
+"""Test the energy and water rollups."""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from p1monitor import (
+    SmartMeter,
+    SmartMeterSeries,
+    WaterMeter,
+    WaterMeterSeries,
+    aggregation,
+    energy_rollup,
+    water_rollup,
+)
+from p1monitor.models import EnergyTariff
+
+from . import load_fixtures
+
+START = datetime(2021, 10, 2, tzinfo=UTC)
+
+
+@pytest.fixture(params=["numpy", "python"], autouse=True)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run every test with and without NumPy."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(aggregation, "np", None)
+    return str(request.param)
+
+
+def reading(
+    minute: int, high: float | None, low: float, power: int | None
+) -> SmartMeter:
+    """Return a smart meter reading at a minute after START."""
+    return SmartMeter(
+        gas_consumption=None,
+        energy_tariff_period=EnergyTariff.HIGH,
+        power_consumption=power,
+        energy_consumption_high=high,
+        energy_consumption_low=low,
+        power_production=0,
+        energy_production_high=10.0,
+        energy_production_low=5.0,
+        timestamp=START + timedelta(minutes=minute),
+    )
+
+
+def test_energy_rollup() -> None:
+    """Test counter increases per tariff and power per hour."""
+    readings = [
+        reading(0, 100.0, 50.0, 1000),
+        reading(30, 100.5, 50.0, 2000),
+        reading(60, 101.0, 50.25, 500),
+        reading(90, None, 50.25, None),
+        # The high counter was reset
+        reading(120, 1.0, 50.5, 3000),
+        reading(180, 1.5, 50.5, None),
+    ]
+    buckets = energy_rollup([*readings, SmartMeter(*[None] * 8)])
+
+    assert [bucket.start for bucket in buckets] == [
+        START,
+        START + timedelta(hours=1),
+        START + timedelta(hours=2),
+        START + timedelta(hours=3),
+    ]
+    assert [bucket.consumption[EnergyTariff.HIGH] for bucket in buckets] == (
+        pytest.approx([0.5, 0.5, 1.0, 0.5])
+    )
+    assert [bucket.consumption[EnergyTariff.LOW] for bucket in buckets] == (
+        pytest.approx([0.0, 0.25, 0.25, 0.0])
+    )
+    assert all(value == 0 for bucket in buckets for value in bucket.production.values())
+    assert [bucket.power_consumption_peak for bucket in buckets] == [
+        2000,
+        500,
+        3000,
+        None,
+    ]
+    assert [bucket.power_consumption_mean for bucket in buckets] == [
+        1500,
+        500,
+        3000,
+        None,
+    ]
+    assert buckets[0].power_production_peak == 0
+
+    daily = energy_rollup(readings, seconds=86400)
+    assert len(daily) == 1
+    assert daily[0].consumption[EnergyTariff.HIGH] == pytest.approx(2.5)
+
+
+def test_energy_rollup_series() -> None:
+    """Test a series gives the same rollup as the data objects."""
+    rows = json.loads(load_fixtures("smartmeter_history.json"))
+    buckets = energy_rollup(SmartMeterSeries.from_dict(rows), seconds=20)
+    assert buckets == energy_rollup(SmartMeter.from_rows(rows), seconds=20)
+    assert [bucket.power_consumption_peak for bucket in buckets] == [935, 955, 975]
+    assert buckets[0].power_production_mean == 0
+    assert energy_rollup([]) == []
+
+
+def test_water_rollup() -> None:
+    """Test the water usage in liters per day."""
+    rows = json.loads(load_fixtures("watermeter_history.json"))
+    buckets = water_rollup(WaterMeterSeries.from_dict(rows), offset=3600)
+    assert [bucket.start.hour for bucket in buckets] == [23] * 4
+    assert [bucket.consumption for bucket in buckets] == pytest.approx(
+        [0.0, 96.0, 0.0, 210.0]
+    )
+    assert water_rollup(WaterMeter.from_rows(rows), offset=3600) == buckets
+    assert water_rollup(WaterMeterSeries()) == []
@@ -0,0 +1,108 @@
+"""Test the phase imbalance, over-current and voltage sag analytics."""
+
+import json
+import math
+from dataclasses import replace
+from datetime import UTC, datetime
+
+import pytest
+
+from p1monitor import PhaseAnalyzer, Phases, PhaseSeries
+from p1monitor.balance import OVER_CURRENT, VOLTAGE_SAG
+
+from . import load_fixtures
+
+START = datetime.fromtimestamp(1633130812, tz=UTC)
+
+
+def test_series() -> None:
+    """Test the events and imbalance of a series of samples."""
+    series = PhaseSeries.from_dict(json.loads(load_fixtures("phases_history.json")))
+    analyzer = PhaseAnalyzer()
+    ended = analyzer.extend(series)
+
+    assert [(event.kind, event.phase) for event in ended] == [
+        (OVER_CURRENT, 2),
+        (VOLTAGE_SAG, 3),
+    ]
+    over_current, sag = ended
+    assert over_current.start == datetime.fromtimestamp(1633130822, tz=UTC)
+    assert over_current.end == datetime.fromtimestamp(1633130832, tz=UTC)
+    assert over_current.extreme == 27
+    assert over_current.samples == 2
+    assert sag.start == sag.end
+    assert sag.extreme == pytest.approx(205.3)
+    assert analyzer.events == ended
+    assert analyzer.active == []
+
+    # The missing sample is left out
+    assert analyzer.count == 5
+    assert analyzer.imbalance == pytest.approx((880 - 507.333) / 507.333, rel=1e-4)
+    assert analyzer.heaviest == 1
+    assert analyzer.imbalance_peak == pytest.approx((6120 - 2449.333) / 2449.333)
+    assert analyzer.imbalance_mean is not None
+    assert 0 < analyzer.imbalance_mean < 1.4
+
+
+def phases(voltage: float, current: float, consumed: int | None = 1000) -> Phases:
+    """Return a sample with a different voltage and current on L1."""
+    return Phases(
+        voltage_phase_l1=voltage,
+        voltage_phase_l2=230.0,
+        voltage_phase_l3=230.0,
+        current_phase_l1=current,
+        current_phase_l2=4.0,
+        current_phase_l3=4.0,
+        power_consumed_phase_l1=consumed,
+        power_consumed_phase_l2=1000,
+        power_consumed_phase_l3=0,
+        power_produced_phase_l1=0,
+        power_produced_phase_l2=0,
+        power_produced_phase_l3=1000,
+    )
+
+
+def test_add() -> None:
+    """Test single samples, with active events and missing values."""
+    analyzer = PhaseAnalyzer(current_limit=16)
+    assert analyzer.imbalance_mean is None
+
+    assert analyzer.add(phases(230.0, 20.0), START) == []
+    assert analyzer.imbalance == 0
+    assert analyzer.heaviest == 1
+    assert analyzer.add(phases(200.0, 30.0), START) == []
+    assert analyzer.add(phases(200.0, 18.0, consumed=None)) == []
+    # Only L2 and L3 are compared
+    assert analyzer.imbalance == 0
+    assert analyzer.heaviest == 2
+    assert [
+        (event.kind, event.extreme, event.samples) for event in analyzer.active
+    ] == [
+        (OVER_CURRENT, 30.0, 3),
+        (VOLTAGE_SAG, 200.0, 2),
+    ]
+    assert analyzer.active[0].end > START
+
+    sample = phases(220.0, 1.0)
+    sample.current_phase_l2 = sample.voltage_phase_l3 = None
+    ended = analyzer.add(sample, START)
+    assert [event.kind for event in ended] == [OVER_CURRENT, VOLTAGE_SAG]
+
+    # A zero load on every phase is balanced
+    idle = replace(
+        phases(230.0, 0.0, consumed=0),
+        power_consumed_phase_l2=0,
+        power_produced_phase_l3=0,
+    )
+    analyzer.add(idle)
+    assert analyzer.imbalance == 0
+
+
+def test_single_phase() -> None:
+    """Test the missing phases of a single-phase meter are left out."""
+    analyzer = PhaseAnalyzer()
+    analyzer.add(Phases.from_dict(json.loads(load_fixtures("phases.json"))))
+    assert analyzer.active == []
+    assert analyzer.imbalance is None
+    assert analyzer.heaviest is None
+    assert math.isclose(analyzer.sag_voltage, 207)
@@ -0,0 +1,139 @@
+"""Test the response cache."""
+
+# pylint: disable=protected-access
+import asyncio
+from collections.abc import Awaitable, Callable
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+from aiohttp.web import Request
+from aresponses import Response, ResponsesMockServer
+
+from p1monitor import P1Monitor, ResponseCache
+
+from . import load_fixtures
+
+
+def counting_handler(
+    fixture: str, calls: list[Request]
+) -> Callable[[Request], Awaitable[Response]]:
+    """Return a handler that records every request it serves."""
+
+    async def handler(request: Request) -> Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return Response(
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            text=load_fixtures(fixture),
+        )
+
+    return handler
+
+
+async def test_shared_request(aresponses: ResponsesMockServer) -> None:
+    """Test concurrent callers share a single request to the device."""
+    calls: list[Request] = []
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/configuration",
+        "GET",
+        counting_handler("settings.json", calls),
+        repeat=aresponses.INFINITY,
+    )
+    async with ClientSession() as session:
+        client = P1Monitor("192.168.1.2", session=session, cache=ResponseCache())
+        results = await asyncio.gather(*(client.settings() for _ in range(10)))
+        await client.settings()
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_ttl(aresponses: ResponsesMockServer) -> None:
+    """Test a response is requested again when it has expired."""
+    calls: list[Request] = []
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        counting_handler("smartmeter.json", calls),
+        repeat=aresponses.INFINITY,
+    )
+    async with ClientSession() as session:
+        client = P1Monitor("192.168.1.2", session=session, cache=ResponseCache())
+        with patch("p1monitor.cache.monotonic", return_value=100.0):
+            await client.smartmeter()
+            await client.smartmeter()
+        with patch("p1monitor.cache.monotonic", return_value=101.5):
+            await client.smartmeter()
+
+    assert len(calls) == 2
+
+
+async def test_disabled_ttl(aresponses: ResponsesMockServer) -> None:
+    """Test a TTL of zero disables caching of an endpoint."""
+    calls: list[Request] = []
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/status",
+        "GET",
+        counting_handler("phases.json", calls),
+        repeat=aresponses.INFINITY,
+    )
+    cache = ResponseCache(ttls={"v1/status": 0})
+    async with ClientSession() as session:
+        client = P1Monitor("192.168.1.2", session=session, cache=cache)
+        await client.phases()
+        await client.phases()
+
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+async def test_shared_cache(aresponses: ResponsesMockServer) -> None:
+    """Test clients sharing a cache never receive the data of another device."""
+    calls: list[Request] = []
+    for host in ("192.168.1.2", "192.168.1.3"):
+        aresponses.add(
+            host,
+            "/api/v1/configuration",
+            "GET",
+            counting_handler("settings.json", calls),
+            repeat=aresponses.INFINITY,
+        )
+    cache = ResponseCache()
+    async with ClientSession() as session:
+        for host in ("192.168.1.2", "192.168.1.3"):
+            await P1Monitor(host, session=session, cache=cache).settings()
+
+    assert [call.host for call in calls] == ["192.168.1.2", "192.168.1.3"]
+    assert len(cache) == 2
+
+
+async def test_eviction() -> None:
+    """Test the least recently used response is evicted first."""
+    cache = ResponseCache(maxsize=2)
+    fetched: list[str] = []
+
+    def fetcher(uri: str) -> Callable[[], Awaitable[str]]:
+        async def fetch() -> str:
+            fetched.append(uri)
+            return uri
+
+        return fetch
+
+    for uri in ("v1/smartmeter", "v1/status", "v1/smartmeter", "v1/configuration"):
+        await cache.get("192.168.1.2", 80, uri, None, fetcher(uri))
+    # v1/status was the least recently used and has been evicted
+    for uri in ("v1/smartmeter", "v1/configuration", "v1/status"):
+        await cache.get("192.168.1.2", 80, uri, None, fetcher(uri))
+
+    assert fetched == [
+        "v1/smartmeter",
+        "v1/status",
+        "v1/configuration",
+        "v1/status",
+    ]
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,147 @@
+"""Test collecting the latest values in worker processes."""
+
+# pylint: disable=protected-access
+import asyncio
+from datetime import UTC, datetime
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+from aiohttp.web import Request
+from aresponses import Response, ResponsesMockServer
+
+from p1monitor import (
+    P1Monitor,
+    P1MonitorCollector,
+    SmartMeterSeries,
+    WaterMeterSeries,
+)
+from p1monitor.collector import _decode_columns, _read
+from p1monitor.exceptions import (
+    P1MonitorConnectionError,
+    P1MonitorError,
+    P1MonitorNoDataError,
+)
+from p1monitor.simulator import P1MonitorSimulator
+
+from . import load_fixtures
+
+NOW = datetime(2021, 10, 4, 12, tzinfo=UTC).timestamp()
+
+
+async def test_collect() -> None:
+    """Test every device ends up in a batch, as a row or as an error."""
+    async with (
+        P1MonitorSimulator(
+            devices=12, watermeter=0.5, seed=1, clock=lambda: NOW
+        ) as simulator,
+        P1MonitorCollector(simulator.hosts, processes=2, batch_size=5) as collector,
+    ):
+        batches = [batch async for batch in collector.collect()]
+        assert sorted(len(batch.devices) for batch in batches) == [2, 5, 5]
+        assert all(not batch.errors for batch in batches)
+        devices = [device for batch in batches for device in batch.devices]
+        assert sorted(devices) == sorted(simulator.hosts)
+
+        batch = batches[0]
+        assert isinstance(batch.series, SmartMeterSeries)
+        assert list(batch.series.timestamps) == [int(NOW)] * len(batch.devices)
+        for name, total in batch.totals.items():
+            assert total == pytest.approx(batch.series.sum(name))
+        async with P1Monitor(*batch.devices[-1]) as client:
+            reading = await client.smartmeter()
+        assert batch.series.columns["power_consumption"][-1] == (
+            reading.power_consumption
+        )
+
+        batches = [batch async for batch in collector.collect("watermeter")]
+        errors = [error for batch in batches for error in batch.errors]
+        rows = sum(len(batch.devices) for batch in batches)
+        assert errors
+        assert rows + len(errors) == 12
+        assert all(
+            isinstance(result.error, P1MonitorConnectionError) for result in errors
+        )
+
+
+async def test_invalid(aresponses: ResponsesMockServer) -> None:
+    """Test bodies that cannot be decoded are returned as errors."""
+    for host, text in (
+        ("192.168.1.2", load_fixtures("smartmeter.json")),
+        ("192.168.1.3", "[]"),
+        ("192.168.1.4", "Not JSON"),
+        ("192.168.1.6", '{"error": "Unknown"}'),
+        ("192.168.1.7", '[{"CONSUMPTION_W": 935}]'),
+    ):
+        aresponses.add(
+            host,
+            "/api/v1/smartmeter",
+            "GET",
+            Response(text=text, status=200, content_type="application/json"),
+        )
+
+    async def failure(_: Request) -> Response:
+        await asyncio.sleep(0.3)
+        return Response(status=500)
+
+    aresponses.add("192.168.1.5", "/api/v1/smartmeter", "GET", failure)
+    hosts = [f"192.168.1.{number}" for number in range(2, 8)]
+    async with P1MonitorCollector(hosts, processes=1, batch_size=1) as collector:
+        batches = [batch async for batch in collector.collect()]
+    assert len(batches) == 6
+    # The other batches were decoded while the slow device was requested
+    assert batches[-1].errors[0].host == "192.168.1.5"
+    (batch,) = [batch for batch in batches if batch.devices]
+    assert batch.devices == [("192.168.1.2", 80)]
+    assert batch.totals["power_consumption"] == 935
+    errors = {
+        result.host: type(result.error) for batch in batches for result in batch.errors
+    }
+    assert errors == {
+        "192.168.1.3": P1MonitorNoDataError,
+        "192.168.1.4": P1MonitorError,
+        "192.168.1.5": P1MonitorConnectionError,
+        "192.168.1.6": P1MonitorError,
+        "192.168.1.7": P1MonitorError,
+    }
+
+    async with P1Monitor("192.168.1.2") as client:
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            await client.raw("status")
+
+
+async def test_unreachable() -> None:
+    """Test a batch without any response skips the worker processes."""
+    async with P1MonitorCollector([("127.0.0.1", 1)], processes=1) as collector:
+        (batch,) = [batch async for batch in collector.collect()]
+    assert batch.devices == []
+    assert len(batch.series) == 0
+    assert batch.totals["power_consumption"] == 0
+    assert isinstance(batch.errors[0].error, P1MonitorConnectionError)
+
+    async with P1MonitorCollector([]) as collector:
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            _ = [batch async for batch in collector.collect("phases")]
+
+
+def test_decode_columns() -> None:
+    """Test the worker writes the columns of the decoded rows."""
+    body = load_fixtures("watermeter.json").encode()
+    bodies = [body, b"[]", body, b"{", b'{"0": {}}', b"[1]", b'[{"WATERMETER": 1}]']
+    memory = SharedMemory(create=True, size=8 * 4 * len(bodies))
+    try:
+        positions, failures, totals = _decode_columns("watermeter", memory.name, bodies)
+        series = _read(WaterMeterSeries, memory, len(bodies), len(positions))
+    finally:
+        memory.close()
+        memory.unlink()
+    assert positions == [0, 2]
+    assert [(position, type(error)) for position, error in failures] == [
+        (1, P1MonitorNoDataError),
+        (3, P1MonitorError),
+        (4, P1MonitorError),
+        (5, P1MonitorError),
+        (6, P1MonitorError),
+    ]
+    assert list(series.timestamps) == [1644620400, 1644620400]
+    assert list(series.columns["consumption_day"]) == [128, 128]
+    assert totals["consumption_day"] == 256
@@ -0,0 +1,124 @@
+"""Test the cost calculation."""
+
+import json
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from p1monitor import (
+    CostCalculator,
+    Settings,
+    SmartMeter,
+    SmartMeterSeries,
+    aggregation,
+)
+from p1monitor.models import EnergyTariff
+
+from . import load_fixtures
+
+START = datetime(2021, 10, 2, tzinfo=UTC)
+SETTINGS = Settings(
+    gas_consumption_price=1.0,
+    energy_consumption_price_high=0.3,
+    energy_consumption_price_low=0.2,
+    energy_production_price_high=0.1,
+    energy_production_price_low=None,
+)
+
+
+@pytest.fixture(params=["numpy", "python"], autouse=True)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run every test with and without NumPy."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(aggregation, "np", None)
+    return str(request.param)
+
+
+def reading(minute: int, high: float | None, production: float) -> SmartMeter:
+    """Return a smart meter reading at a minute after START."""
+    return SmartMeter(
+        gas_consumption=10 + minute / 60,
+        energy_tariff_period=EnergyTariff.HIGH,
+        power_consumption=None,
+        energy_consumption_high=high,
+        energy_consumption_low=50.0 + minute / 30,
+        power_production=None,
+        energy_production_high=production,
+        energy_production_low=5.0 + minute / 30,
+        timestamp=START + timedelta(minutes=minute),
+    )
+
+
+READINGS = [
+    reading(0, 100.0, 10.0),
+    reading(30, 101.0, 10.5),
+    reading(60, None, 11.0),
+    reading(90, 103.0, 11.0),
+    # The high consumption counter was reset
+    reading(120, 2.0, 11.5),
+]
+
+
+def test_running_and_buckets() -> None:
+    """Test the cost per tariff, per bucket and in total."""
+    calculator = CostCalculator(SETTINGS, seconds=3600)
+    assert calculator.running is None
+    calculator.extend(READINGS)
+
+    running = calculator.running
+    assert running is not None
+    assert running.start == START
+    assert running.consumption[EnergyTariff.HIGH] == pytest.approx(5.0 * 0.3)
+    assert running.consumption[EnergyTariff.LOW] == pytest.approx(4.0 * 0.2)
+    assert running.production[EnergyTariff.HIGH] == pytest.approx(1.5 * 0.1)
+    assert running.production[EnergyTariff.LOW] == 0
+    assert running.gas == pytest.approx(2.0)
+    assert running.total == pytest.approx(1.5 + 0.8 + 2.0 - 0.15)
+
+    assert [bucket.start.hour for bucket in calculator.buckets] == [0, 1, 2]
+    assert [
+        bucket.consumption[EnergyTariff.HIGH] for bucket in calculator.buckets
+    ] == pytest.approx([0.3, 0.6, 0.6])
+    assert [bucket.gas for bucket in calculator.buckets] == pytest.approx(
+        [0.5, 1.0, 0.5]
+    )
+
+
+def test_incremental() -> None:
+    """Test single readings and batches continue where the last one ended."""
+    expected = CostCalculator(SETTINGS, seconds=3600)
+    expected.extend(READINGS)
+
+    calculator = CostCalculator(SETTINGS, seconds=3600)
+    for item in READINGS:
+        calculator.add(item)
+    calculator.add(SmartMeter(*[None] * 8))
+    assert calculator.buckets == pytest.approx(expected.buckets)
+
+    calculator = CostCalculator(SETTINGS, seconds=3600)
+    calculator.extend(READINGS[:3])
+    calculator.extend(READINGS[3:])
+    assert calculator.buckets == pytest.approx(expected.buckets)
+    assert calculator.running == pytest.approx(expected.running)
+
+
+def test_series() -> None:
+    """Test a series of the history is priced like its data objects."""
+    rows = json.loads(load_fixtures("smartmeter_history.json"))
+    settings = Settings.from_dict(json.loads(load_fixtures("settings.json")))
+    expected = CostCalculator(settings)
+    expected.extend(SmartMeter.from_rows(rows))
+
+    calculator = CostCalculator(settings)
+    calculator.extend(SmartMeterSeries.from_dict(rows))
+    calculator.extend(SmartMeterSeries())
+    assert calculator.buckets == expected.buckets
+    assert len(calculator.buckets) == 1
+
+    # A reading without any counter values is priced at zero
+    calculator = CostCalculator(settings)
+    calculator.extend([SmartMeter.from_row({"TIMESTAMP_UTC": 1633132800})])
+    assert calculator.running is not None
+    assert calculator.running.total == 0
@@ -0,0 +1,62 @@
+"""Test the incremental JSON decoding."""
+
+import json
+from collections.abc import AsyncIterator
+
+import orjson
+import pytest
+
+from p1monitor.decoding import iter_array, loads, select_loads
+from p1monitor.exceptions import P1MonitorError
+
+from . import load_fixtures
+
+
+async def chunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    """Yield data in chunks of a fixed size."""
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+async def test_iter_array(size: int) -> None:
+    """Test a JSON list is decoded the same, regardless of chunk sizes."""
+    data = load_fixtures("smartmeter_history.json").encode()
+    items = [item async for item in iter_array(chunked(data, size))]
+    assert len(items) == 5
+    assert items[-1]["CONSUMPTION_W"] == 975
+
+
+async def test_iter_array_split_values() -> None:
+    """Test values split over chunks are only decoded once complete."""
+    data = b'[{"W": 935.5, "KWH": 1e3}, {"W": 12}]'
+    items = [item async for item in iter_array(chunked(data, 1))]
+    assert items == [{"W": 935.5, "KWH": 1000.0}, {"W": 12}]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b'{"status": "ok"}', b'[{"a": 1}, {"b"', b"[935.5, 1]", b"[1e3]"],
+)
+async def test_iter_array_invalid(data: bytes) -> None:
+    """Test a response that is not a complete JSON list raises an error."""
+    with pytest.raises(P1MonitorError):
+        _ = [item async for item in iter_array(chunked(data, 3))]
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec", "json"])
+def test_select_loads(backend: str) -> None:
+    """Test every backend decodes a response to the same objects."""
+    data = load_fixtures("smartmeter.json").encode()
+    assert select_loads(backend)(data) == json.loads(data)
+
+
+def test_select_loads_default() -> None:
+    """Test the fastest installed backend is used by default."""
+    assert loads is orjson.loads
+
+
+def test_select_loads_unknown() -> None:
+    """Test an unknown backend raises an error."""
+    with pytest.raises(ValueError, match="simdjson"):
+        select_loads("simdjson")
@@ -0,0 +1,122 @@
+"""Test the fleet client."""
+
+# pylint: disable=protected-access
+import asyncio
+from collections.abc import Awaitable, Callable
+from unittest.mock import patch
+
+import pytest
+from aiohttp import ClientSession
+from aiohttp.web import Request
+from aresponses import Response, ResponsesMockServer
+
+from p1monitor import (
+    AdaptiveTimeouts,
+    P1Monitor,
+    P1MonitorFleet,
+    SmartMeter,
+    Snapshot,
+)
+from p1monitor.exceptions import P1MonitorConnectionError
+
+from . import load_fixtures
+
+
+async def test_poll(aresponses: ResponsesMockServer) -> None:
+    """Test every device is polled and failures are reported per device."""
+    for host in ("192.168.1.2", "192.168.1.3"):
+        aresponses.add(
+            host,
+            "/api/v1/smartmeter",
+            "GET",
+            aresponses.Response(
+                text=load_fixtures("smartmeter.json"),
+                status=200,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            ),
+        )
+    aresponses.add(
+        "192.168.1.4",
+        "/api/v1/smartmeter",
+        "GET",
+        aresponses.Response(status=500),
+    )
+
+    async with P1MonitorFleet(
+        ["192.168.1.2", "192.168.1.3", ("192.168.1.4", 80)], limit=2
+    ) as fleet:
+        results = {result.host: result async for result in fleet.poll()}
+
+    assert sorted(results) == ["192.168.1.2", "192.168.1.3", "192.168.1.4"]
+    assert isinstance(results["192.168.1.2"].data, SmartMeter)
+    assert isinstance(results["192.168.1.4"].error, P1MonitorConnectionError)
+    assert results["192.168.1.4"].data is None
+
+
+async def test_shared_session() -> None:
+    """Test all devices share the session and timeouts of the fleet."""
+    timeouts = AdaptiveTimeouts()
+    async with ClientSession() as session:
+        fleet = P1MonitorFleet(
+            ["192.168.1.2", "192.168.1.3"], session=session, timeouts=timeouts
+        )
+        assert fleet.client("192.168.1.2").session is session
+        assert fleet.client("192.168.1.2").timeouts is timeouts
+        assert fleet.client("192.168.1.3").session is session
+        assert fleet.client("192.168.1.2") is fleet.client("192.168.1.2", 80)
+        await fleet.close()
+        assert not session.closed
+
+
+async def test_unknown_endpoint() -> None:
+    """Test an unknown endpoint raises an error."""
+    async with P1MonitorFleet(["192.168.1.2"]) as fleet:
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            _ = [result async for result in fleet.poll("close")]
+
+
+async def test_snapshot_limit(aresponses: ResponsesMockServer) -> None:
+    """Test every request of a snapshot counts towards the fleet limit."""
+    in_flight: list[int] = [0, 0]
+
+    def handler(fixture: str) -> Callable[[Request], Awaitable[Response]]:
+        async def respond(_: Request) -> Response:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return Response(
+                status=200,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+                text=load_fixtures(fixture),
+            )
+
+        return respond
+
+    for path, fixture in (
+        ("/api/v1/smartmeter", "smartmeter.json"),
+        ("/api/v1/status", "phases.json"),
+        ("/api/v2/watermeter/day", "watermeter.json"),
+        ("/api/v1/configuration", "settings.json"),
+    ):
+        aresponses.add(
+            "192.168.1.2", path, "GET", handler(fixture), repeat=aresponses.INFINITY
+        )
+
+    async with ClientSession() as session:
+        fleet = P1MonitorFleet(["192.168.1.2"], limit=1, session=session)
+        results = [result async for result in fleet.poll("snapshot")]
+
+    assert isinstance(results[0].data, Snapshot)
+    assert results[0].data.errors == {}
+    assert in_flight[1] == 1
+
+
+async def test_limit_per_port() -> None:
+    """Test devices on the same host but another port have their own limit."""
+    fleet = P1MonitorFleet([("192.168.1.2", 80), ("192.168.1.2", 81)])
+    with patch.object(P1Monitor, "smartmeter", return_value=None):
+        await fleet.request("192.168.1.2", 80, "smartmeter")
+        await fleet.request("192.168.1.2", 81, "smartmeter")
+    assert sorted(fleet._semaphores) == [("192.168.1.2", 80), ("192.168.1.2", 81)]
+    await fleet.close()
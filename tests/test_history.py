@@ -0,0 +1,152 @@
+"""Test the incremental history sync."""
+
+import json
+from contextlib import aclosing
+from pathlib import Path
+
+import pytest
+from aiohttp.web import Request
+from aresponses import Response, ResponsesMockServer
+
+from p1monitor import (
+    CallbackCheckpoints,
+    Checkpoints,
+    FileCheckpoints,
+    HistorySync,
+    P1Monitor,
+)
+
+from . import history_handler
+
+
+def add_history(
+    aresponses: ResponsesMockServer, path: str, fixture: str
+) -> list[dict[str, str]]:
+    """Serve a history fixture and return the query of every request."""
+    handler = history_handler(fixture)
+    queries: list[dict[str, str]] = []
+
+    async def recording_handler(request: Request) -> Response:
+        queries.append(dict(request.query))
+        return await handler(request)
+
+    aresponses.add(
+        "192.168.1.2", path, "GET", recording_handler, repeat=aresponses.INFINITY
+    )
+    return queries
+
+
+async def test_sync(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test every sync only returns the rows after the previous one."""
+    queries = add_history(aresponses, "/api/v1/smartmeter", "smartmeter_history.json")
+    sync = HistorySync(p1monitor_client, page_size=2)
+
+    readings = [reading async for reading in sync.smartmeter(limit=2)]
+    assert [reading.power_consumption for reading in readings] == [935, 945]
+    assert "starttime" not in queries[0]
+    assert await sync.checkpoints.get("192.168.1.2", "smartmeter") == 1633130822
+
+    readings = [reading async for reading in sync.smartmeter()]
+    assert [reading.power_consumption for reading in readings] == [955, 965, 975]
+    assert await sync.checkpoints.get("192.168.1.2", "smartmeter") == 1633130852
+
+    queries.clear()
+    assert [reading async for reading in sync.smartmeter()] == []
+    assert "starttime" in queries[0]
+
+
+async def test_sync_stopped_early(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test the checkpoint covers the rows handled before iteration stopped."""
+    add_history(aresponses, "/api/v1/smartmeter", "smartmeter_history.json")
+    checkpoints = Checkpoints()
+    sync = HistorySync(p1monitor_client, checkpoints)
+
+    async with aclosing(sync.smartmeter()) as history:
+        async for reading in history:
+            if reading.power_consumption == 945:
+                break
+    # The row the iteration stopped at is returned again
+    assert await checkpoints.get("192.168.1.2", "smartmeter") == 1633130812
+    assert await checkpoints.get("192.168.1.2", "watermeter") is None
+
+    readings = [reading async for reading in sync.smartmeter()]
+    assert [reading.power_consumption for reading in readings] == [945, 955, 965, 975]
+
+
+async def test_sync_failed(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test a row whose handling raised is not checkpointed."""
+    add_history(aresponses, "/api/v1/smartmeter", "smartmeter_history.json")
+    sync = HistorySync(p1monitor_client)
+    handled: list[int | None] = []
+
+    async def store() -> None:
+        async with aclosing(sync.smartmeter()) as history:
+            async for reading in history:
+                if reading.power_consumption == 955:
+                    msg = "Disk full"
+                    raise RuntimeError(msg)
+                handled.append(reading.power_consumption)
+
+    with pytest.raises(RuntimeError, match="Disk full"):
+        await store()
+    assert handled == [935, 945]
+    assert await sync.checkpoints.get("192.168.1.2", "smartmeter") == 1633130822
+
+    readings = [reading async for reading in sync.smartmeter()]
+    assert [reading.power_consumption for reading in readings] == [955, 965, 975]
+
+
+async def test_file_checkpoints(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+    tmp_path: Path,
+) -> None:
+    """Test checkpoints in a file are kept when the sync is created again."""
+    add_history(aresponses, "/api/v2/watermeter/day", "watermeter_history.json")
+    path = tmp_path / "checkpoints.json"
+
+    sync = HistorySync(p1monitor_client, FileCheckpoints(path))
+    assert len([reading async for reading in sync.watermeter()]) == 4
+    assert json.loads(path.read_text()) == {"192.168.1.2/watermeter": 1644879600}
+
+    sync = HistorySync(p1monitor_client, FileCheckpoints(path))
+    assert [reading async for reading in sync.watermeter()] == []
+
+
+async def test_callback_checkpoints(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test checkpoints are loaded and saved by plain and async callables."""
+    add_history(aresponses, "/api/v2/watermeter/day", "watermeter_history.json")
+    saved: dict[tuple[str, str], int] = {("192.168.1.2", "watermeter"): 1644706800}
+
+    async def save(host: str, endpoint: str, timestamp: int) -> None:
+        saved[host, endpoint] = timestamp
+
+    checkpoints = CallbackCheckpoints(lambda *key: saved.get(key), save)
+    readings = [
+        reading
+        async for reading in HistorySync(p1monitor_client, checkpoints).watermeter()
+    ]
+    assert [reading.consumption_day for reading in readings] == [None, 210.0]
+    assert saved == {("192.168.1.2", "watermeter"): 1644879600}
+
+    async def load(host: str, endpoint: str) -> int | None:
+        return saved.get((host, endpoint))
+
+    checkpoints = CallbackCheckpoints(
+        load,
+        lambda host, endpoint, timestamp: saved.update({(host, endpoint): timestamp}),
+    )
+    await checkpoints.set("192.168.1.2", "smartmeter", 1633130852)
+    assert await checkpoints.get("192.168.1.2", "smartmeter") == 1633130852
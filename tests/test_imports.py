@@ -0,0 +1,43 @@
+"""Test importing the package."""
+
+import subprocess
+import sys
+from importlib import import_module, metadata
+
+import pytest
+
+import p1monitor
+from p1monitor.p1monitor import default_headers
+
+# Dependencies that would slow down importing the package
+HEAVY = ("aiohttp", "yarl", "numpy", "importlib.metadata")
+
+
+def test_lazy() -> None:
+    """Test importing the package does not load the heavy dependencies."""
+    code = f"import sys, p1monitor; print([m for m in {HEAVY!r} if m in sys.modules])"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_names() -> None:
+    """Test every name of the package is imported on first use."""
+    assert p1monitor.P1Monitor.__module__ == "p1monitor.p1monitor"
+    assert p1monitor.P1MonitorError.__module__ == "p1monitor.exceptions"
+    assert {*p1monitor.__all__} <= {*dir(p1monitor)}
+    for name in p1monitor.__all__:
+        assert getattr(p1monitor, name).__name__ == name
+    with pytest.raises(AttributeError, match="has no attribute 'Missing'"):
+        _ = p1monitor.Missing
+
+
+def test_user_agent() -> None:
+    """Test the version in the User-Agent is the installed version."""
+    version = metadata.version("p1monitor")
+    assert default_headers()["User-Agent"] == f"PythonP1Monitor/{version}"
+    module = import_module("p1monitor.p1monitor")
+    assert version == module.VERSION
+    with pytest.raises(AttributeError, match="has no attribute 'Missing'"):
+        _ = module.Missing
@@ -0,0 +1,83 @@
+"""Test the request instrumentation."""
+
+import math
+from types import SimpleNamespace
+
+import pytest
+from aresponses import ResponsesMockServer
+
+from p1monitor import Histogram, Instrumentation, P1Monitor
+
+from . import load_fixtures
+
+
+def test_histogram() -> None:
+    """Test quantiles are estimated within the matching bucket."""
+    histogram = Histogram((0.1, 0.2, 0.4))
+    assert math.isnan(histogram.quantile(0.5))
+    assert math.isnan(histogram.mean)
+
+    for value in (0.05, 0.15, 0.15, 0.3):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == pytest.approx(0.15)
+    assert histogram.quantile(1.0) == 0.4
+    assert histogram.mean == pytest.approx(0.1625)
+
+    histogram.observe(5)
+    assert histogram.quantile(0.99) == 0.4
+
+
+async def test_instrumentation(aresponses: ResponsesMockServer) -> None:
+    """Test every phase of a request is recorded and exported."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("smartmeter.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+        repeat=2,
+    )
+    exported: list[tuple[str, str, str, float]] = []
+    instrumentation = Instrumentation(
+        exporters=[lambda *measurement: exported.append(measurement)]
+    )
+    async with P1Monitor(host="192.168.1.2", instrumentation=instrumentation) as client:
+        await client.smartmeter()
+        await client.smartmeter()
+
+    phases = {phase for _, _, phase in instrumentation.histograms}
+    assert {"first_byte", "body", "decode", "parse"} <= phases
+    summary = instrumentation.summary()
+    # The second response is unchanged, so it is not decoded and parsed again
+    assert summary["192.168.1.2", "v1/smartmeter", "body"]["count"] == 2
+    assert summary["192.168.1.2", "v1/smartmeter", "decode"]["count"] == 1
+    assert summary["192.168.1.2", "v1/smartmeter", "parse"]["count"] == 1
+    assert len(exported) == sum(h.count for h in instrumentation.histograms.values())
+    assert all(seconds >= 0 for *_, seconds in exported)
+
+
+async def test_without_request_context() -> None:
+    """Test requests of a shared session without P1 Monitor context are ignored."""
+    instrumentation = Instrumentation()
+    config = instrumentation.trace_config()
+    assert config.on_request_end.frozen
+    instrumentation._since(  # pylint: disable=protected-access
+        SimpleNamespace(trace_request_ctx=None, sent=0.0), "sent", "first_byte"
+    )
+    assert not instrumentation.histograms
+
+
+def test_decay() -> None:
+    """Test decaying halves the counts and keeps the mean."""
+    histogram = Histogram((0.1, 0.2, 0.4))
+    for value in (0.05, 0.05, 0.05, 0.05, 0.3):
+        histogram.observe(value)
+    histogram.decay()
+    assert histogram.counts == [2, 0, 1, 0]
+    assert histogram.count == 3
+    assert histogram.mean == pytest.approx(0.5 / 5)
+    Histogram().decay()
@@ -1,5 +1,8 @@
 """Test the models."""
 
+import json
+from typing import Any
+
 import pytest
 from aiohttp import ClientSession
 from aresponses import ResponsesMockServer
@@ -12,8 +15,10 @@ from p1monitor import (
     Phases,
     Settings,
     SmartMeter,
+    Snapshot,
     WaterMeter,
 )
+from p1monitor.models import EnergyTariff, PositionIndex, search
 
 from . import load_fixtures
 
@@ -133,3 +138,111 @@ async def test_settings(
     )
     settings: Settings = await p1monitor_client.settings()
     assert settings == snapshot
+
+
+async def test_missing_status_id(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test a missing STATUS_ID raises a clear error instead of crashing."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/status",
+        "GET",
+        aresponses.Response(
+            text='[{"LABEL": "Test", "SECURITY": 0, "STATUS": "1.0", "STATUS_ID": 1}]',
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+    )
+    with pytest.raises(P1MonitorNoDataError, match="STATUS_ID 103"):
+        await p1monitor_client.phases()
+
+
+def test_position_index() -> None:
+    """Test the position index built from a configuration response."""
+    data = json.loads(load_fixtures("settings.json"))
+    values = PositionIndex.from_dict(data, "conf")
+    assert values.get(15) == 0.86687
+    assert values.get(15) == search(15, data, "conf")
+    with pytest.raises(P1MonitorNoDataError, match="CONFIGURATION_ID 9999"):
+        values.get(9999)
+
+
+@pytest.mark.parametrize(
+    ("model", "fixture"),
+    [
+        (SmartMeter, "smartmeter.json"),
+        (Phases, "phases.json"),
+        (Settings, "settings.json"),
+        (WaterMeter, "watermeter.json"),
+    ],
+)
+def test_slots(model: Any, fixture: str) -> None:
+    """Test the models store their fields in slots, without an instance dict."""
+    data = model.from_dict(json.loads(load_fixtures(fixture)))
+    assert not hasattr(data, "__dict__")
+    with pytest.raises(AttributeError):
+        data.unknown = 1
+
+
+@pytest.mark.parametrize(
+    ("model", "fixture"),
+    [
+        (SmartMeter, "smartmeter_history.json"),
+        (WaterMeter, "watermeter_history.json"),
+    ],
+)
+def test_from_rows(model: Any, fixture: str) -> None:
+    """Test every row of a response is converted in one call."""
+    rows = json.loads(load_fixtures(fixture))
+    data = model.from_rows(rows)
+    assert data == [model.from_row(row) for row in rows]
+    assert len(data) == len(rows)
+    assert model.from_rows([{}]) == [model.from_row({})]
+    assert model.from_rows([]) == []
+
+
+def test_energy_tariff() -> None:
+    """Test only the 'P' tariff code is the high tariff."""
+    for code, tariff in (("P", EnergyTariff.HIGH), ("D", EnergyTariff.LOW)):
+        assert SmartMeter.from_row({"TARIFCODE": code}).energy_tariff_period == tariff
+        assert SmartMeter.from_rows([{"TARIFCODE": code}])[0].energy_tariff_period == (
+            tariff
+        )
+    assert SmartMeter.from_row({}).energy_tariff_period == EnergyTariff.LOW
+
+
+async def test_snapshot(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test a snapshot reports a failing endpoint without aborting the others."""
+    for path, fixture in (
+        ("/api/v1/smartmeter", "smartmeter.json"),
+        ("/api/v1/status", "phases.json"),
+        ("/api/v1/configuration", "settings.json"),
+    ):
+        aresponses.add(
+            "192.168.1.2",
+            path,
+            "GET",
+            aresponses.Response(
+                text=load_fixtures(fixture),
+                status=200,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            ),
+        )
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v2/watermeter/day",
+        "GET",
+        aresponses.Response(status=404),
+    )
+    snapshot: Snapshot = await p1monitor_client.snapshot()
+    assert isinstance(snapshot.smartmeter, SmartMeter)
+    assert isinstance(snapshot.phases, Phases)
+    assert isinstance(snapshot.settings, Settings)
+    assert snapshot.watermeter is None
+    assert list(snapshot.errors) == ["watermeter"]
+    assert isinstance(snapshot.errors["watermeter"], P1MonitorConnectionError)
@@ -2,16 +2,19 @@
 
 # pylint: disable=protected-access
 import asyncio
+import json
+from datetime import UTC, datetime
 from unittest.mock import patch
 
 import pytest
-from aiohttp import ClientError, ClientResponse, ClientSession
+from aiohttp import ClientError, ClientResponse, ClientSession, TCPConnector
+from aiohttp.web import Request
 from aresponses import Response, ResponsesMockServer
 
-from p1monitor import P1Monitor
+from p1monitor import P1Monitor, SmartMeter
 from p1monitor.exceptions import P1MonitorConnectionError, P1MonitorError
 
-from . import load_fixtures
+from . import history_handler, load_fixtures
 
 
 async def test_json_request(
@@ -34,6 +37,30 @@ async def test_json_request(
     await p1monitor_client.close()
 
 
+async def test_json_loads(aresponses: ResponsesMockServer) -> None:
+    """Test responses are decoded with the selected JSON backend."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixtures("smartmeter.json"),
+        ),
+    )
+    decoded: list[bytes] = []
+
+    def loads(data: bytes) -> object:
+        decoded.append(data)
+        return json.loads(data)
+
+    async with P1Monitor(host="192.168.1.2", json_loads=loads) as client:
+        smartmeter = await client.smartmeter()
+    assert smartmeter.power_consumption == 935
+    assert decoded == [load_fixtures("smartmeter.json").encode()]
+
+
 async def test_different_port(aresponses: ResponsesMockServer) -> None:
     """Test different port is handled correctly."""
     aresponses.add(
@@ -68,6 +95,33 @@ async def test_internal_session(aresponses: ResponsesMockServer) -> None:
         await p1monitor._request("test")
 
 
+async def test_connection_reuse(aresponses: ResponsesMockServer) -> None:
+    """Test the own session keeps connections open and caches DNS lookups."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/test",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "ok"}',
+        ),
+        repeat=2,
+    )
+    async with P1Monitor("192.168.1.2", limit_per_host=2) as p1monitor:
+        await p1monitor._request("test")
+        url = p1monitor._urls["test"]
+        await p1monitor._request("test")
+        assert p1monitor._urls["test"] is url
+        assert str(url) == "http://192.168.1.2/api/test"
+
+        assert p1monitor.session is not None
+        connector = p1monitor.session.connector
+        assert isinstance(connector, TCPConnector)
+        assert connector.limit_per_host == 2
+        assert connector.use_dns_cache
+
+
 async def test_timeout(aresponses: ResponsesMockServer) -> None:
     """Test request timeout from P1 Monitor."""
 
@@ -118,3 +172,210 @@ async def test_client_error() -> None:
             pytest.raises(P1MonitorConnectionError),
         ):
             assert await client._request("test")
+
+
+async def test_smartmeter_history(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test the smart meter history is paged through without duplicates."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        history_handler("smartmeter_history.json"),
+        repeat=aresponses.INFINITY,
+    )
+    readings = [
+        reading async for reading in p1monitor_client.smartmeter_history(page_size=2)
+    ]
+    assert [reading.power_consumption for reading in readings] == [
+        935,
+        945,
+        955,
+        965,
+        975,
+    ]
+    assert readings[0].timestamp == datetime(2021, 10, 1, 23, 26, 52, tzinfo=UTC)
+
+
+async def test_smartmeter_history_range(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test the smart meter history respects the end time and limit."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        history_handler("smartmeter_history.json"),
+        repeat=aresponses.INFINITY,
+    )
+    end = datetime(2021, 10, 1, 23, 27, 12, tzinfo=UTC)
+    readings = [
+        reading
+        async for reading in p1monitor_client.smartmeter_history(end=end, page_size=2)
+    ]
+    assert [reading.timestamp for reading in readings][-1] == end
+    assert len(readings) == 3
+
+    readings = [
+        reading
+        async for reading in p1monitor_client.smartmeter_history(limit=3, page_size=2)
+    ]
+    assert len(readings) == 3
+
+
+async def test_history_series(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test the history is collected into columnar series."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        history_handler("smartmeter_history.json"),
+        repeat=aresponses.INFINITY,
+    )
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v2/watermeter/day",
+        "GET",
+        history_handler("watermeter_history.json"),
+        repeat=aresponses.INFINITY,
+    )
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/phase",
+        "GET",
+        history_handler("phases_history.json"),
+        repeat=aresponses.INFINITY,
+    )
+    smartmeter = await p1monitor_client.smartmeter_series(page_size=2)
+    assert len(smartmeter) == 5
+    assert smartmeter.sum("power_consumption") == 4775
+
+    watermeter = await p1monitor_client.watermeter_series(limit=3)
+    assert len(watermeter) == 3
+    assert list(watermeter.timestamps) == [1644620400, 1644706800, 1644793200]
+
+    phases = await p1monitor_client.phases_series(page_size=4)
+    assert len(phases) == 6
+    assert phases.mean("current_phase_l2") == 12
+
+    readings = [reading async for reading in p1monitor_client.watermeter_history()]
+    assert [reading.consumption_day for reading in readings] == [
+        128.0,
+        96.0,
+        None,
+        210.0,
+    ]
+
+
+async def test_smartmeter_history_start(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test rows before the start are skipped, whatever the device sends."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        history_handler("smartmeter_history.json"),
+        repeat=aresponses.INFINITY,
+    )
+    start = datetime(2021, 10, 1, 23, 27, 12, tzinfo=UTC)
+    readings = [
+        reading
+        async for reading in p1monitor_client.smartmeter_history(
+            start=start, page_size=2
+        )
+    ]
+    assert [reading.power_consumption for reading in readings] == [955, 965, 975]
+    assert readings[0].timestamp == start
+
+
+async def test_smartmeter_history_stuck(
+    aresponses: ResponsesMockServer,
+    p1monitor_client: P1Monitor,
+) -> None:
+    """Test paging raises instead of dropping rows when it cannot continue."""
+    # The repeated local hour when daylight saving time ends
+    rows = [
+        {
+            "CONSUMPTION_W": 935,
+            "TIMESTAMP_UTC": 1635642000 + i * 3600,
+            "TIMESTAMP_lOCAL": "2021-10-31 02:00:00",
+        }
+        for i in range(2)
+    ]
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps(rows),
+        ),
+        repeat=aresponses.INFINITY,
+    )
+    history = p1monitor_client.smartmeter_history(page_size=2)
+    assert (await anext(history)).timestamp == datetime(2021, 10, 31, 1, tzinfo=UTC)
+    assert (await anext(history)).timestamp == datetime(2021, 10, 31, 2, tzinfo=UTC)
+    with pytest.raises(P1MonitorError, match="increase the page size"):
+        await anext(history)
+
+
+async def test_unchanged_response(aresponses: ResponsesMockServer) -> None:
+    """Test an unchanged response returns the previously built object."""
+    for fixture in ("smartmeter.json", "smartmeter.json", "smartmeter_history.json"):
+        aresponses.add(
+            "192.168.1.2",
+            "/api/v1/smartmeter",
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixtures(fixture),
+            ),
+        )
+    async with ClientSession() as session:
+        client = P1Monitor("192.168.1.2", session=session)
+        with patch.object(
+            SmartMeter, "from_dict", side_effect=SmartMeter.from_dict
+        ) as from_dict:
+            first = await client.smartmeter()
+            assert await client.smartmeter() is first
+            assert from_dict.call_count == 1
+
+            changed = await client.smartmeter()
+            assert changed is not first
+            assert changed.power_consumption == 935
+            assert from_dict.call_count == 2
+
+
+async def test_not_modified(aresponses: ResponsesMockServer) -> None:
+    """Test validators of the device are used for conditional requests."""
+
+    async def handler(request: Request) -> Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return Response(status=304)
+        return Response(
+            status=200,
+            headers={"Content-Type": "application/json", "ETag": '"v1"'},
+            text=load_fixtures("phases.json"),
+        )
+
+    aresponses.add(
+        "192.168.1.2", "/api/v1/status", "GET", handler, repeat=aresponses.INFINITY
+    )
+    async with ClientSession() as session:
+        client = P1Monitor("192.168.1.2", session=session)
+        first = await client.phases()
+        assert await client.phases() is first
+
+        client = P1Monitor("192.168.1.2", session=session, change_detection=False)
+        assert await client.phases() == first
+        assert await client.phases() is not first
@@ -0,0 +1,141 @@
+"""Test the polling scheduler."""
+
+import asyncio
+from typing import Any, cast
+
+import pytest
+
+from p1monitor import P1Monitor, P1MonitorScheduler, PollResult
+from p1monitor.exceptions import P1MonitorConnectionError, P1MonitorError
+
+
+class FakeClient:
+    """P1Monitor stand-in recording when each endpoint is called."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0) -> None:
+        """Initialize the fake client."""
+        self.delay = delay
+        self.failures = failures
+        self.calls: list[str] = []
+        self.active = 0
+        self.overlap = False
+
+    async def smartmeter(self) -> str:
+        """Return a reading after the configured delay."""
+        self.calls.append("smartmeter")
+        self.active += 1
+        self.overlap |= self.active > 1
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.failures:
+            self.failures -= 1
+            msg = "Timeout occurred while connecting to P1 Monitor device"
+            raise P1MonitorConnectionError(msg)
+        return "reading"
+
+    async def settings(self) -> str:
+        """Return settings, failing like an unsupported endpoint."""
+        self.calls.append("settings")
+        msg = "No configuration in the P1 Monitor response"
+        raise P1MonitorError(msg)
+
+
+def scheduler(client: FakeClient, **kwargs: Any) -> P1MonitorScheduler:
+    """Return a scheduler without jitter around a fake client."""
+    kwargs.setdefault("jitter", 0.0)
+    return P1MonitorScheduler(cast("P1Monitor", client), **kwargs)
+
+
+async def test_results() -> None:
+    """Test every endpoint is polled at its own interval."""
+    client = FakeClient()
+    results: list[PollResult] = []
+    async for result in scheduler(
+        client, intervals={"smartmeter": 0.01, "settings": 10}
+    ).results():
+        results.append(result)
+        if len(results) == 4:
+            break
+
+    assert [result.endpoint for result in results].count("settings") == 1
+    assert isinstance(
+        next(result for result in results if result.endpoint == "settings").error,
+        P1MonitorError,
+    )
+    assert {result.data for result in results if result.endpoint == "smartmeter"} == {
+        "reading"
+    }
+
+
+async def test_callback() -> None:
+    """Test results are passed to the callback in run mode."""
+    client = FakeClient()
+    results: list[PollResult] = []
+    done = asyncio.Event()
+
+    async def callback(result: PollResult) -> None:
+        results.append(result)
+        if len(results) == 3:
+            done.set()
+
+    task = asyncio.create_task(
+        scheduler(client, intervals={"smartmeter": 0.01}, callback=callback).run()
+    )
+    await asyncio.wait_for(done.wait(), 1)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert [result.data for result in results] == ["reading"] * 3
+
+
+async def test_run_without_callback() -> None:
+    """Test run mode requires a callback."""
+    with pytest.raises(ValueError, match="callback"):
+        await scheduler(FakeClient()).run()
+
+
+async def test_skip_ticks() -> None:
+    """Test a slow device skips ticks instead of overlapping requests."""
+    client = FakeClient(delay=0.035)
+    results: list[PollResult] = []
+    async for result in scheduler(client, intervals={"smartmeter": 0.01}).results():
+        results.append(result)
+        if len(results) == 3:
+            break
+
+    assert not client.overlap
+    assert results[0].skipped == 0
+    assert results[1].skipped >= 2
+
+
+async def test_backoff() -> None:
+    """Test connection errors back off exponentially, up to a maximum."""
+    polling = scheduler(FakeClient(), backoff_max=5)
+    assert polling.backoff(1, 1) == 2
+    assert polling.backoff(1, 2) == 4
+    assert polling.backoff(1, 10) == 5
+
+    client = FakeClient(failures=2)
+    results: list[PollResult] = []
+    async for result in scheduler(client, intervals={"smartmeter": 0.01}).results():
+        results.append(result)
+        if result.data is not None:
+            break
+    assert [type(result.error) for result in results] == [
+        P1MonitorConnectionError,
+        P1MonitorConnectionError,
+        type(None),
+    ]
+
+
+async def test_polling_error() -> None:
+    """Test unexpected errors end the iterator instead of being swallowed."""
+
+    class BrokenClient(FakeClient):
+        async def smartmeter(self) -> str:
+            raise RuntimeError
+
+    with pytest.raises(ExceptionGroup):
+        async for _ in scheduler(BrokenClient()).results():
+            pass  # pragma: no cover
@@ -0,0 +1,108 @@
+"""Test the columnar time series."""
+
+import json
+import math
+
+import pytest
+
+from p1monitor import SmartMeterSeries, WaterMeterSeries, series
+
+from . import load_fixtures
+
+
+@pytest.fixture(params=["numpy", "array"], autouse=True)
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run every test with and without NumPy."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(series, "np", None)
+    return str(request.param)
+
+
+@pytest.fixture(name="smartmeter")
+def smartmeter_series() -> SmartMeterSeries:
+    """Return a series of the smart meter history fixture."""
+    return SmartMeterSeries.from_dict(
+        json.loads(load_fixtures("smartmeter_history.json"))
+    )
+
+
+@pytest.fixture(name="watermeter")
+def watermeter_series() -> WaterMeterSeries:
+    """Return a series of the water meter history fixture."""
+    return WaterMeterSeries.from_dict(
+        json.loads(load_fixtures("watermeter_history.json"))
+    )
+
+
+def test_columns(smartmeter: SmartMeterSeries) -> None:
+    """Test the fields are stored as compact arrays."""
+    assert len(smartmeter) == 5
+    assert "power_consumption" in list(smartmeter)
+    assert smartmeter.columns["power_consumption"].typecode == "d"
+    assert smartmeter.timestamps.typecode == "q"
+    assert list(smartmeter["power_consumption"]) == [935, 945, 955, 965, 975]
+
+
+def test_sum_mean(watermeter: WaterMeterSeries) -> None:
+    """Test missing values are ignored when summing and averaging."""
+    assert watermeter.sum("consumption_day") == 434.0
+    assert watermeter.mean("consumption_day") == pytest.approx(434.0 / 3)
+    assert math.isnan(WaterMeterSeries().mean("consumption_day"))
+
+
+def test_diff(smartmeter: SmartMeterSeries) -> None:
+    """Test the differences between consecutive readings."""
+    assert [round(value, 3) for value in smartmeter.diff("gas_consumption")] == [
+        0.001
+    ] * 4
+
+
+@pytest.mark.parametrize(
+    ("how", "expected"),
+    [
+        ("first", [935, 945, 965]),
+        ("last", [935, 955, 975]),
+        ("sum", [935, 1900, 1940]),
+        ("mean", [935, 950, 970]),
+        ("min", [935, 945, 965]),
+        ("max", [935, 955, 975]),
+    ],
+)
+def test_resample(smartmeter: SmartMeterSeries, how: str, expected: list[int]) -> None:
+    """Test the readings are grouped into time buckets."""
+    resampled = smartmeter.resample(20, how)
+    assert isinstance(resampled, SmartMeterSeries)
+    assert list(resampled.timestamps) == [1633130800, 1633130820, 1633130840]
+    assert list(resampled["power_consumption"]) == expected
+
+
+def test_resample_missing(watermeter: WaterMeterSeries) -> None:
+    """Test buckets without values are NaN."""
+    resampled = watermeter.resample(86400, "mean")
+    assert len(resampled) == 4
+    assert math.isnan(resampled["consumption_day"][2])
+    assert len(WaterMeterSeries().resample(86400)) == 0
+
+
+def test_resample_invalid(smartmeter: SmartMeterSeries) -> None:
+    """Test an unknown aggregation raises an error."""
+    with pytest.raises(ValueError, match="Unknown aggregation"):
+        smartmeter.resample(60, "median")
+
+
+def test_append_after_read(smartmeter: SmartMeterSeries) -> None:
+    """Test reading a column does not block appending to the series."""
+    values = smartmeter["power_consumption"]
+    smartmeter.append({"TIMESTAMP_UTC": 1633130862, "CONSUMPTION_W": 985})
+    assert len(values) == 5
+    assert len(smartmeter["power_consumption"]) == 6
+    assert math.isnan(smartmeter["gas_consumption"][-1])
+
+
+def test_resample_offset(smartmeter: SmartMeterSeries) -> None:
+    """Test buckets are aligned to UTC, or to the given offset."""
+    # 2021-10-01 23:26:52 UTC is 2021-10-02 01:26:52 in the Netherlands
+    assert list(smartmeter.resample(86400).timestamps) == [1633046400]
+    assert list(smartmeter.resample(86400, offset=7200).timestamps) == [1633125600]
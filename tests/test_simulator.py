@@ -0,0 +1,108 @@
+"""Test the P1 Monitor simulator."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from p1monitor import P1Monitor, P1MonitorFleet, Phases, Settings, SmartMeter
+from p1monitor.exceptions import P1MonitorConnectionError
+from p1monitor.simulator import RECORD_INTERVAL, P1MonitorSimulator
+
+NOW = datetime(2021, 10, 4, 12, tzinfo=UTC).timestamp()
+
+
+class Clock:
+    """Clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Start the clock at NOW."""
+        self.now = NOW
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+async def test_endpoints() -> None:
+    """Test every endpoint parses and the readings evolve over time."""
+    clock = Clock()
+    async with P1MonitorSimulator(seed=1, clock=clock) as simulator:
+        ((host, port),) = simulator.hosts
+        async with P1Monitor(host=host, port=port, cache=None) as client:
+            first = await client.smartmeter()
+            assert isinstance(first, SmartMeter)
+            assert first.timestamp == datetime.fromtimestamp(NOW, tz=UTC)
+            assert isinstance(await client.phases(), Phases)
+            settings = await client.settings()
+            assert isinstance(settings, Settings)
+            assert settings.gas_consumption_price == 0.86687
+
+            clock.now += 3600
+            second = await client.smartmeter()
+            assert second.timestamp == datetime.fromtimestamp(NOW + 3600, tz=UTC)
+            assert second.gas_consumption is not None
+            assert first.gas_consumption is not None
+            assert second.gas_consumption > first.gas_consumption
+
+            water = await client.watermeter()
+            assert water.consumption_total is not None
+            assert water.consumption_day is not None
+            assert simulator.device(port).requests == 5
+
+
+async def test_history() -> None:
+    """Test the recorded readings page like the history of a device."""
+    clock = Clock()
+    async with P1MonitorSimulator(history=30, seed=1, clock=clock) as simulator:
+        ((host, port),) = simulator.hosts
+        async with P1Monitor(host=host, port=port) as client:
+            readings = [
+                reading async for reading in client.smartmeter_history(page_size=7)
+            ]
+            assert len(readings) == 30
+            timestamps = [reading.timestamp for reading in readings]
+            assert timestamps[0] == datetime.fromtimestamp(
+                NOW - 29 * RECORD_INTERVAL, tz=UTC
+            )
+            assert timestamps[-1] == datetime.fromtimestamp(NOW, tz=UTC)
+            assert len(set(timestamps)) == 30
+
+            start = datetime.fromtimestamp(NOW - 5 * RECORD_INTERVAL, tz=UTC)
+            recent = [r async for r in client.smartmeter_history(start=start)]
+            assert len(recent) == 6
+
+            # After a long idle time only the kept readings are recorded
+            clock.now += 86400
+            readings = [r async for r in client.smartmeter_history()]
+            assert len(readings) == 30
+            assert readings[0].timestamp == datetime.fromtimestamp(
+                NOW + 86400 - 29 * RECORD_INTERVAL, tz=UTC
+            )
+            days = [day async for day in client.watermeter_history()]
+            assert len(days) == 2
+
+
+async def test_failures() -> None:
+    """Test the errors and absent water meters are served."""
+    async with P1MonitorSimulator(watermeter=0, latency=0.001) as simulator:
+        ((host, port),) = simulator.hosts
+        async with P1Monitor(host=host, port=port) as client:
+            with pytest.raises(P1MonitorConnectionError, match="No water meter"):
+                await client.watermeter()
+            simulator.error_rate = 1
+            with pytest.raises(P1MonitorConnectionError):
+                await client.smartmeter()
+
+
+async def test_devices() -> None:
+    """Test every device listens on its own port."""
+    simulator = P1MonitorSimulator(devices=20, seed=1)
+    await simulator.start()
+    async with P1MonitorFleet(simulator.hosts) as fleet:
+        results = [result async for result in fleet.poll("snapshot")]
+    assert len(results) == 20
+    assert all(result.error is None for result in results)
+    assert {port for _, port in simulator.hosts} == {result.port for result in results}
+    await simulator.close()
+    await simulator.close()
+    assert simulator.hosts == []
@@ -0,0 +1,140 @@
+"""Test the local reading store."""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from p1monitor import (
+    P1MonitorError,
+    Phases,
+    ReadingStore,
+    Settings,
+    SmartMeter,
+    Snapshot,
+    WaterMeter,
+)
+from p1monitor.models import EnergyTariff
+
+from . import load_fixtures
+
+START = datetime(2021, 10, 2, tzinfo=UTC)
+
+
+def smartmeter(minute: int, power: int | None = 935) -> SmartMeter:
+    """Return a smart meter reading at a minute after START."""
+    return SmartMeter(
+        gas_consumption=2273.447,
+        energy_tariff_period=EnergyTariff.HIGH,
+        power_consumption=power,
+        energy_consumption_high=2996.141 + minute / 1000,
+        energy_consumption_low=2709.353,
+        power_production=0,
+        energy_production_high=4330.753,
+        energy_production_low=1502.478,
+        timestamp=START + timedelta(minutes=minute),
+    )
+
+
+def test_append_query(tmp_path: Path) -> None:
+    """Test readings are stored once, in order, and queried by range."""
+    with ReadingStore(tmp_path) as store:
+        assert store.append("192.168.1.2", [smartmeter(i) for i in range(10)]) == 10
+        # Repeated and older readings are skipped
+        assert store.append("192.168.1.2", smartmeter(9)) == 0
+        assert store.append("192.168.1.2", smartmeter(3)) == 0
+        assert store.append("192.168.1.2", smartmeter(10, power=None)) == 1
+
+        assert store.query("192.168.1.2", "smartmeter") == [
+            *(smartmeter(i) for i in range(10)),
+            smartmeter(10, power=None),
+        ]
+        readings = store.query(
+            "192.168.1.2",
+            "smartmeter",
+            start=START + timedelta(minutes=2),
+            end=START + timedelta(minutes=4),
+        )
+        assert readings == [smartmeter(2), smartmeter(3), smartmeter(4)]
+        assert store.query("192.168.1.2", "smartmeter", start=START.replace(2022)) == []
+        assert store.query("192.168.1.3", "smartmeter") == []
+
+
+def test_reopen(tmp_path: Path) -> None:
+    """Test a store continues after the last reading of an existing file."""
+    with ReadingStore(tmp_path) as store:
+        store.append("192.168.1.2", [smartmeter(0), smartmeter(1)])
+    # A record that was only partly written is dropped
+    path = ReadingStore(tmp_path).path("192.168.1.2", "smartmeter")
+    with path.open("ab") as file:
+        file.write(b"\x00" * 10)
+
+    with ReadingStore(tmp_path) as store:
+        assert store.append("192.168.1.2", smartmeter(1)) == 0
+        assert store.append("192.168.1.2", smartmeter(2)) == 1
+        assert len(store.query("192.168.1.2", "smartmeter")) == 3
+    assert path.stat().st_size == 8 + 3 * 72
+
+
+def test_snapshot(tmp_path: Path) -> None:
+    """Test every reading of a snapshot is stored in the file of its endpoint."""
+    phases = Phases.from_dict(json.loads(load_fixtures("phases.json")))
+    watermeter = WaterMeter.from_dict(json.loads(load_fixtures("watermeter.json")))
+    snapshot = Snapshot(smartmeter=smartmeter(0), phases=phases, watermeter=watermeter)
+
+    with ReadingStore(tmp_path) as store:
+        assert store.append("p1mon.local", snapshot, timestamp=START) == 3
+        assert store.query("p1mon.local", "phases") == [phases]
+        assert store.query_timestamps("p1mon.local", "phases") == [START]
+        assert store.query("p1mon.local", "watermeter") == [watermeter]
+        assert store.query("p1mon.local", "smartmeter") == [smartmeter(0)]
+
+
+def test_invalid(tmp_path: Path) -> None:
+    """Test data and files that cannot be used raise an error."""
+    store = ReadingStore(tmp_path)
+    settings = Settings.from_dict(json.loads(load_fixtures("settings.json")))
+    with pytest.raises(TypeError, match="Settings"):
+        store.append("192.168.1.2", settings)
+
+    store.path("192.168.1.2", "watermeter").write_bytes(b"not a store file")
+    watermeter = WaterMeter(1, 1.0, 1, timestamp=START)
+    with pytest.raises(P1MonitorError, match="not a reading store file"):
+        store.query("192.168.1.2", "watermeter")
+    with pytest.raises(P1MonitorError, match="not a reading store file"):
+        store.append("192.168.1.2", watermeter)
+    store.close()
+
+
+def test_failed_append(tmp_path: Path) -> None:
+    """Test nothing is stored, or skipped later, when an append fails."""
+    settings = Settings.from_dict(json.loads(load_fixtures("settings.json")))
+    with ReadingStore(tmp_path) as store:
+        with pytest.raises(TypeError, match="Settings"):
+            store.append("192.168.1.2", [smartmeter(0), settings])
+        assert store.query("192.168.1.2", "smartmeter") == []
+        assert store.append("192.168.1.2", smartmeter(0)) == 1
+        assert store.query("192.168.1.2", "smartmeter") == [smartmeter(0)]
+
+        for data in ("192.168.1.2", b"readings", {"power": 935}):
+            with pytest.raises(TypeError, match="Cannot store"):
+                store.append("192.168.1.2", data)
+
+
+async def test_extend(tmp_path: Path) -> None:
+    """Test the readings of an asynchronous history are stored in batches."""
+
+    async def history() -> AsyncIterator[SmartMeter]:
+        for minute in range(10):
+            yield smartmeter(minute)
+
+    with ReadingStore(tmp_path) as store:
+        with pytest.raises(TypeError, match="use extend"):
+            store.append("192.168.1.2", history())
+        assert await store.extend("192.168.1.2", history(), batch_size=3) == 10
+        assert await store.extend("192.168.1.2", history()) == 0
+        assert store.query("192.168.1.2", "smartmeter") == [
+            smartmeter(minute) for minute in range(10)
+        ]
@@ -0,0 +1,95 @@
+"""Test streaming the smart meter and phase values."""
+
+import asyncio
+from contextlib import aclosing
+from datetime import UTC, datetime
+
+import pytest
+
+from p1monitor import P1Monitor, Phases, SmartMeter
+from p1monitor.exceptions import P1MonitorConnectionError
+from p1monitor.simulator import RECORD_INTERVAL, P1MonitorSimulator
+
+NOW = datetime(2021, 10, 4, 12, tzinfo=UTC).timestamp()
+
+
+class Clock:
+    """Clock moving a recording interval forward every time it is read."""
+
+    def __init__(self, step: int = RECORD_INTERVAL) -> None:
+        """Start the clock at NOW."""
+        self.now = NOW
+        self.step = step
+
+    def __call__(self) -> float:
+        """Return the current time and move forward."""
+        self.now += self.step
+        return self.now
+
+
+async def test_stream() -> None:
+    """Test every change of both endpoints is streamed."""
+    async with (
+        P1MonitorSimulator(seed=1, clock=Clock()) as simulator,
+        P1Monitor(*simulator.hosts[0]) as client,
+    ):
+        models: list[SmartMeter | Phases] = []
+        async with aclosing(client.stream(interval=0.001)) as stream:
+            async for model in stream:
+                models.append(model)
+                if len(models) == 20:
+                    break
+        assert {type(model) for model in models} == {SmartMeter, Phases}
+        readings = [model for model in models if isinstance(model, SmartMeter)]
+        timestamps = [reading.timestamp for reading in readings]
+        assert len(set(timestamps)) == len(readings)
+
+
+async def test_unchanged() -> None:
+    """Test unchanged readings are not streamed again."""
+    async with (
+        P1MonitorSimulator(seed=1, clock=Clock(0)) as simulator,
+        P1Monitor(*simulator.hosts[0]) as client,
+    ):
+        stream = client.stream(interval=0.001, endpoints=["smartmeter"])
+        first = await anext(stream)
+        assert isinstance(first, SmartMeter)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(anext(stream), 0.05)
+        await stream.aclose()
+        assert simulator.device(simulator.hosts[0][1]).requests > 5
+
+
+async def test_slow_consumer() -> None:
+    """Test a slow consumer only gets the latest values."""
+    async with (
+        P1MonitorSimulator(seed=1, clock=Clock()) as simulator,
+        P1Monitor(*simulator.hosts[0]) as client,
+    ):
+        stream = client.stream(interval=0.001, endpoints=["smartmeter"])
+        first = await anext(stream)
+        await asyncio.sleep(0.1)
+        second = await anext(stream)
+        await stream.aclose()
+        assert isinstance(first, SmartMeter)
+        assert isinstance(second, SmartMeter)
+        requests = simulator.device(simulator.hosts[0][1]).requests
+        assert requests > 5
+        # Every request recorded one new reading, the ones between were dropped
+        assert first.timestamp is not None
+        assert second.timestamp is not None
+        skipped = (second.timestamp - first.timestamp).seconds // RECORD_INTERVAL
+        assert skipped > 2
+
+
+async def test_errors() -> None:
+    """Test a failing request ends the stream with its error."""
+    async with (
+        P1MonitorSimulator(error_rate=1) as simulator,
+        P1Monitor(*simulator.hosts[0]) as client,
+    ):
+        with pytest.raises(P1MonitorConnectionError):
+            _ = [model async for model in client.stream(interval=0.001)]
+
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            _ = [model async for model in client.stream(endpoints=["settings"])]
@@ -0,0 +1,79 @@
+"""Test the synchronous client."""
+
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from p1monitor import Phases, Settings, SmartMeter, Snapshot, SyncP1Monitor, WaterMeter
+from p1monitor.exceptions import P1MonitorConnectionError
+from p1monitor.simulator import P1MonitorSimulator
+
+from . import serve
+
+
+def test_endpoints() -> None:
+    """Test the blocking calls return the data objects or raise the error."""
+    with (
+        serve(P1MonitorSimulator(seed=1)) as simulator,
+        SyncP1Monitor(*simulator.hosts[0]) as client,
+    ):
+        assert isinstance(client.smartmeter(), SmartMeter)
+        assert isinstance(client.phases(), Phases)
+        assert isinstance(client.watermeter(), WaterMeter)
+        assert isinstance(client.settings(), Settings)
+
+        simulator.error_rate = 1
+        with pytest.raises(P1MonitorConnectionError):
+            client.smartmeter()
+
+    with SyncP1Monitor() as client, pytest.raises(ValueError, match="No host"):
+        client.smartmeter()
+
+
+def test_map_hosts() -> None:
+    """Test many devices are requested at once, in the order of the hosts."""
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        closed = server.getsockname()[1]
+    with (
+        serve(P1MonitorSimulator(devices=5, seed=1)) as simulator,
+        SyncP1Monitor(port=closed) as client,
+    ):
+        hosts: list[str | tuple[str, int]] = [*simulator.hosts, "127.0.0.1"]
+        results = client.map_hosts(hosts)
+        assert [(result.host, result.port) for result in results] == [
+            *simulator.hosts,
+            ("127.0.0.1", closed),
+        ]
+        assert all(result.error is None for result in results[:-1])
+        assert isinstance(results[-1].error, P1MonitorConnectionError)
+        snapshots = client.map_hosts(simulator.hosts, "snapshot")
+        assert all(isinstance(result.data, Snapshot) for result in snapshots)
+
+        # Every device can also be requested on its own
+        host, port = simulator.hosts[1]
+        assert isinstance(client.phases(host, port), Phases)
+
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            client.map_hosts(hosts, "status")
+
+
+def test_threads() -> None:
+    """Test worker threads share the session of the client."""
+    with (
+        serve(P1MonitorSimulator(seed=1)) as simulator,
+        SyncP1Monitor(*simulator.hosts[0], limit_per_host=4) as client,
+        ThreadPoolExecutor(8) as executor,
+    ):
+        futures = [executor.submit(client.smartmeter) for _ in range(40)]
+        assert all(isinstance(future.result(), SmartMeter) for future in futures)
+        assert simulator.device(simulator.hosts[0][1]).requests == 40
+        session = client.fleet.session
+        assert session is not None
+        assert len(client.fleet._clients) == 1
+
+    # Closing twice is fine, but the client can no longer be used
+    client.close()
+    assert session.closed
+    with pytest.raises(RuntimeError, match="closed"):
+        client.settings()
@@ -0,0 +1,188 @@
+"""Test the adaptive timeouts and hedged requests."""
+
+# pylint: disable=protected-access
+import asyncio
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from aiohttp import ClientResponse, ClientSession
+from aresponses import ResponsesMockServer
+
+from p1monitor import AdaptiveTimeouts, P1Monitor, SmartMeter
+from p1monitor.exceptions import P1MonitorConnectionError
+
+from . import load_fixtures
+
+HOST = ("192.168.1.2", 80)
+
+
+def trained(**kwargs: Any) -> AdaptiveTimeouts:
+    """Return timeouts with 20 measurements of 10 ms for HOST."""
+    timeouts = AdaptiveTimeouts(samples=20, **kwargs)
+    for _ in range(20):
+        timeouts.observe(*HOST, 0.01)
+    return timeouts
+
+
+def test_timeout() -> None:
+    """Test the timeout follows the p99 latency within the limits."""
+    timeouts = AdaptiveTimeouts(multiplier=3, minimum=0.001, maximum=5, samples=20)
+    assert timeouts.timeout(*HOST) == 5
+    for _ in range(19):
+        timeouts.observe(*HOST, 0.01)
+    assert timeouts.timeout(*HOST) == 5
+    timeouts.observe(*HOST, 0.01)
+    assert timeouts.timeout(*HOST) == pytest.approx(0.0298, abs=0.0001)
+    assert timeouts.timeout("192.168.1.3", 80) == 5
+    assert timeouts.hedge_delay(*HOST) is None
+
+    assert trained().timeout(*HOST) == 0.5
+    hedged = trained(hedge=True)
+    assert hedged.hedge_delay(*HOST) == pytest.approx(0.00975)
+    assert hedged.hedge_delay("192.168.1.3", 80) is None
+
+
+def responder(*delays: float, error: Exception | None = None) -> tuple[list[Mock], Any]:
+    """Return the responses and a request answering after the delays.
+
+    The status of a response is its delay in milliseconds.
+    """
+    responses: list[Mock] = []
+    pending = list(delays)
+
+    async def request(_: float) -> ClientResponse:
+        delay = pending.pop(0)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        response = Mock(spec=ClientResponse, status=round(delay * 1000))
+        responses.append(response)
+        return response
+
+    return responses, request
+
+
+async def test_hedged() -> None:
+    """Test a second attempt is sent after the p95 latency."""
+    timeouts = trained(hedge=True)
+    responses, request = responder(0.2, 0.0)
+    response = await timeouts.send(*HOST, request)
+    assert response.status == 0
+    await asyncio.sleep(0.25)
+    # The slow attempt was cancelled
+    assert len(responses) == 1
+    assert timeouts.histograms[HOST].count == 21
+
+    # A fast answer needs no second attempt
+    responses, request = responder(0.0, 0.0)
+    assert (await timeouts.send(*HOST, request)).status == 0
+    assert len(responses) == 1
+
+    # The first attempt still wins when it is answered before the second
+    responses, request = responder(0.02, 0.2)
+    assert (await timeouts.send(*HOST, request)).status == 20
+
+
+async def test_hedged_failure() -> None:
+    """Test the error is raised when both attempts fail."""
+    timeouts = trained(hedge=True)
+    error = P1MonitorConnectionError("Boom")
+    error.__cause__ = TimeoutError()
+    _, request = responder(0.03, 0.0, error=error)
+    with pytest.raises(P1MonitorConnectionError):
+        await timeouts.send(*HOST, request)
+    # The timeout counts as a measurement
+    assert timeouts.histograms[HOST].count == 21
+    assert timeouts.histograms[HOST].sum == pytest.approx(0.7)
+
+    _, request = responder(0.0, error=P1MonitorConnectionError("Boom"))
+    with pytest.raises(P1MonitorConnectionError):
+        await timeouts.send(*HOST, request)
+    assert timeouts.histograms[HOST].count == 21
+
+
+async def test_hedged_simultaneous() -> None:
+    """Test the other response is released when both arrive together."""
+    timeouts = trained(hedge=True)
+    answered = asyncio.Event()
+    responses: list[Mock] = []
+
+    async def request(_: float) -> ClientResponse:
+        response = Mock(spec=ClientResponse)
+        responses.append(response)
+        await answered.wait()
+        return response
+
+    task = asyncio.create_task(timeouts.send(*HOST, request))
+    await asyncio.sleep(0.05)
+    answered.set()
+    response = await task
+    assert len(responses) == 2
+    released = [item for item in responses if item is not response]
+    assert len(released) == 1
+    released[0].release.assert_called_once()
+
+
+async def test_client(aresponses: ResponsesMockServer) -> None:
+    """Test the client sends its requests with the adaptive timeout."""
+    aresponses.add(
+        "192.168.1.2",
+        "/api/v1/smartmeter",
+        "GET",
+        aresponses.Response(
+            text=load_fixtures("smartmeter.json"),
+            status=200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        ),
+        repeat=2,
+    )
+
+    async def slow(_: Any) -> Any:
+        await asyncio.sleep(0.2)
+        return aresponses.Response(status=200)
+
+    aresponses.add("192.168.1.2", "/api/v1/smartmeter", "GET", slow)
+    aresponses.add(
+        "192.168.1.2",
+        "/api/test",
+        "POST",
+        aresponses.Response(
+            text="{}",
+            status=200,
+            headers={"Content-Type": "application/json"},
+        ),
+    )
+
+    timeouts = AdaptiveTimeouts(samples=2, minimum=0.05, maximum=0.1)
+    async with ClientSession() as session:
+        client = P1Monitor(host="192.168.1.2", session=session, timeouts=timeouts)
+        assert isinstance(await client.smartmeter(), SmartMeter)
+        assert isinstance(await client.smartmeter(), SmartMeter)
+        assert timeouts.histograms[HOST].count == 2
+        assert 0.05 <= timeouts.timeout(*HOST) <= 0.1
+        with pytest.raises(P1MonitorConnectionError, match="Timeout"):
+            await client.smartmeter()
+        assert timeouts.histograms[HOST].count == 3
+
+        # Only GET requests go through the adaptive timeouts
+        assert await client._request("test", method="POST") == {}
+        assert timeouts.histograms[HOST].count == 3
+
+
+def test_slowdown() -> None:
+    """Test a device that slows down after a long fast history gets a longer timeout."""
+    timeouts = AdaptiveTimeouts(samples=20, window=200)
+    for _ in range(100_000):
+        timeouts.observe(*HOST, 0.004)
+    histogram = timeouts.histograms[HOST]
+    assert 100 <= histogram.count < 200
+    assert histogram.mean == pytest.approx(0.004)
+    assert timeouts.timeout(*HOST) == 0.5
+
+    # Every request to the slowed down device times out
+    failures = 0
+    while timeouts.timeout(*HOST) < 1:
+        timeouts.observe(*HOST, timeouts.timeout(*HOST))
+        failures += 1
+    assert failures < 10